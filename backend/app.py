@@ -1,15 +1,20 @@
 from __future__ import annotations
 
-from datetime import datetime, timedelta
 from flask import Flask, jsonify, request
 from flask_cors import CORS
 import json
 
-from providers.market_data import fetch_price_history
+from providers.hedging import ProviderTimeout
+from providers.market_data import market_data_stats
 from services.analysis_service import analyze_portfolio
+from services.batch_service import analyze_batch
 from services.stress_service import analyze_with_shock
 from services.store_singleton import analysis_store
 from services.forecast_service import forecast_portfolio
+from services.window_service import rolling_window_metrics, window_metrics
+from services.append_service import append_analysis
+from services.holdings_service import validate_holding, validate_holdings_batch
+from services.cache_warmer import start_cache_warmer, warmup_status
 
 
 def create_app() -> Flask:
@@ -23,88 +28,48 @@ def create_app() -> Flask:
         resources={r"/api/*": {"origins": [o.strip() for o in ALLOWED_ORIGINS]}}
     )
 
+    # Prefetch popular tickers into the price cache without blocking readiness
+    start_cache_warmer()
+
     @app.route("/api/health", methods=["GET", "OPTIONS"])
     def health():
         if request.method == "OPTIONS":
             return "", 200
-        return jsonify({"status": "ok"})
+        return jsonify({"status": "ok", "warmup": warmup_status()})
     
     @app.route("/api/store/stats", methods=["GET", "OPTIONS"])
     def store_stats():
         if request.method == "OPTIONS":
             return "", 200
         return jsonify(analysis_store.stats())
+
+    @app.route("/api/market_data/stats", methods=["GET", "OPTIONS"])
+    def market_data_stats_route():
+        if request.method == "OPTIONS":
+            return "", 200
+        return jsonify(market_data_stats())
     
     @app.route("/api/holdings/validate", methods=["POST", "OPTIONS"])
-    def validate_holding():
+    def validate_holding_route():
         if request.method == "OPTIONS":
             return "", 200
         payload = request.get_json(silent=True) or {}
-
-        ticker = str(payload.get("ticker", "")).strip().upper()
-        requested_date = str(payload.get("buy_date", "")).strip()
-        lookahead_days = int(payload.get("lookahead_days", 7))
-
-        if not ticker:
-            return jsonify({"valid": False, "reason": "ticker is required"}), 400
-        if not requested_date:
-            return jsonify({"valid": False, "reason": "buy_date is required"}), 400
-
         try:
-            d0 = datetime.strptime(requested_date, "%Y-%m-%d")
-        except ValueError:
-            return jsonify({"valid": False, "reason": "buy_date must be YYYY-MM-DD"}), 400
-
-        if lookahead_days < 1:
-            lookahead_days = 1
-
-        start = d0.strftime("%Y-%m-%d")
-        end = (d0 + timedelta(days=lookahead_days)).strftime("%Y-%m-%d")
+            return jsonify(validate_holding(payload)), 200
+        except ValueError as e:
+            return jsonify({"valid": False, "reason": str(e)}), 400
 
+    @app.route("/api/holdings/validate_batch", methods=["POST", "OPTIONS"])
+    def validate_holdings_batch_route():
+        if request.method == "OPTIONS":
+            return "", 200
+        payload = request.get_json(silent=True) or {}
         try:
-            ph = fetch_price_history([ticker], start=start, end=end)
-            prices = ph.prices
-
-            if prices.empty or ticker not in prices.columns:
-                return jsonify({
-                    "valid": False,
-                    "ticker": ticker,
-                    "requested_date": requested_date,
-                    "reason": "no price data returned in lookahead window",
-                }), 200
-
-            s = prices[ticker].dropna()
-            if s.empty:
-                return jsonify({
-                    "valid": False,
-                    "ticker": ticker,
-                    "requested_date": requested_date,
-                    "reason": "no valid prices returned in lookahead window",
-                }), 200
-
-            as_of_dt = s.index[0]
-            as_of = as_of_dt.strftime("%Y-%m-%d")
-            px = float(s.iloc[0])
-
-            note = None
-            if as_of != requested_date:
-                note = f"Market closed on {requested_date}; used next trading day {as_of} for that {ticker} trade."
-
-            return jsonify({
-                "valid": True,
-                "ticker": ticker,
-                "requested_date": requested_date,
-                "as_of": as_of,
-                "price": round(px, 6),
-                "note": note,
-            }), 200
+            return jsonify(validate_holdings_batch(payload)), 200
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
         except Exception:
-            return jsonify({
-                "valid": False,
-                "ticker": ticker,
-                "requested_date": requested_date,
-                "reason": "Unspecified provider error. Check ticker.",
-            }), 200
+            return jsonify({"error": "Internal server error"}), 500
 
     @app.route("/api/analyze", methods=["POST", "OPTIONS"])
     def analyze():
@@ -125,9 +90,25 @@ def create_app() -> Flask:
             return jsonify(result)
         except ValueError as e:
             return jsonify({"error": str(e)}), 400
+        except ProviderTimeout as e:
+            return jsonify({"error": str(e)}), 504
         except Exception:
             return jsonify({"error": "Internal server error"}), 500
         
+    @app.route("/api/analyze_batch", methods=["POST", "OPTIONS"])
+    def analyze_batch_route():
+        if request.method == "OPTIONS":
+            return "", 200
+        payload = request.get_json(silent=True) or {}
+        try:
+            return jsonify(analyze_batch(payload))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        except ProviderTimeout as e:
+            return jsonify({"error": str(e)}), 504
+        except Exception:
+            return jsonify({"error": "Internal server error"}), 500
+
     @app.route("/api/analyze_shock", methods=["POST", "OPTIONS"])
     def analyze_shock():
         if request.method == "OPTIONS":
@@ -138,9 +119,49 @@ def create_app() -> Flask:
             return jsonify(result)
         except ValueError as e:
             return jsonify({"error": str(e)}), 400
+        except ProviderTimeout as e:
+            return jsonify({"error": str(e)}), 504
         except Exception:
             return jsonify({"error": "Internal server error"}), 500
         
+    @app.route("/api/analysis/window", methods=["POST", "OPTIONS"])
+    def analysis_window():
+        if request.method == "OPTIONS":
+            return "", 200
+        payload = request.get_json(silent=True) or {}
+        try:
+            return jsonify(window_metrics(payload))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        except Exception:
+            return jsonify({"error": "Internal server error"}), 500
+
+    @app.route("/api/analysis/rolling", methods=["POST", "OPTIONS"])
+    def analysis_rolling():
+        if request.method == "OPTIONS":
+            return "", 200
+        payload = request.get_json(silent=True) or {}
+        try:
+            return jsonify(rolling_window_metrics(payload))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        except Exception:
+            return jsonify({"error": "Internal server error"}), 500
+
+    @app.route("/api/analysis/append", methods=["POST", "OPTIONS"])
+    def analysis_append():
+        if request.method == "OPTIONS":
+            return "", 200
+        payload = request.get_json(silent=True) or {}
+        try:
+            return jsonify(append_analysis(payload))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        except ProviderTimeout as e:
+            return jsonify({"error": str(e)}), 504
+        except Exception:
+            return jsonify({"error": "Internal server error"}), 500
+
     @app.route("/api/forecast", methods=["POST", "OPTIONS"])
     def forecast():
         if request.method == "OPTIONS":
@@ -0,0 +1,61 @@
+"""
+Batch portfolio evaluation: K weight vectors over one price window.
+
+Compares batch_portfolio_metrics against calling _analyze_from_prices once per
+weight vector (measured on a small K and extrapolated).
+
+Usage (from backend/):
+  python benchmarks/bench_batch.py --tickers 50 --years 10 --k 100 1000 10000
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from engines.batch_engine import batch_portfolio_metrics  # noqa: E402
+from engines.portfolio_engine import prices_to_returns_array  # noqa: E402
+from providers.synthetic_provider import SyntheticProvider  # noqa: E402
+from services.analysis_service import _analyze_from_prices  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tickers", type=int, default=50)
+    parser.add_argument("--years", type=int, default=10)
+    parser.add_argument("--k", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    tickers = [f"SYN{i:04d}" for i in range(args.tickers)]
+    prices = SyntheticProvider(seed=42).get_closes(tickers, f"{2024 - args.years}-01-01", "2024-01-01")
+    asset_r, rows = prices_to_returns_array(prices.to_numpy())
+    dates = prices.index[rows]
+    rng = np.random.default_rng(0)
+
+    sample = rng.random((20, len(tickers)))
+    t0 = time.perf_counter()
+    for w in sample:
+        _analyze_from_prices(prices, dict(zip(tickers, w)), 100_000.0)
+    per_call = (time.perf_counter() - t0) / len(sample)
+
+    print(f"prices: {prices.shape[0]} days x {prices.shape[1]} tickers")
+    print(f"{'K':>8} {'batch ms':>10} {'per-call loop ms (est.)':>24} {'speedup':>9}")
+    for k in args.k:
+        weights = rng.random((k, len(tickers)))
+        batch_portfolio_metrics(asset_r, weights, dates)  # warm-up
+        t0 = time.perf_counter()
+        for _ in range(args.repeat):
+            batch_portfolio_metrics(asset_r, weights, dates)
+        sec = (time.perf_counter() - t0) / args.repeat
+        loop = per_call * k
+        print(f"{k:>8} {sec * 1e3:10.1f} {loop * 1e3:24.1f} {loop / sec:8.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Peak memory and time of the default (float64 DataFrame) pipeline vs compact mode.
+
+Runs _analyze_from_prices and each stress scenario + re-analysis on a wide synthetic
+universe, once with compact=False and once with compact=True. Peak memory is the
+tracemalloc high-water mark above the input prices (NumPy/pandas buffers are traced).
+
+Usage (from backend/):
+  python benchmarks/bench_compact.py --tickers 2000 --years 10 --repeat 3
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from engines.price_matrix import PriceMatrix  # noqa: E402
+from engines.scenario_engine import (  # noqa: E402
+    apply_price_shock,
+    apply_price_shock_matrix,
+    apply_regime_shift,
+    apply_regime_shift_matrix,
+    apply_shock_with_linear_rebound,
+    apply_shock_with_linear_rebound_matrix,
+)
+from providers.synthetic_provider import SyntheticProvider  # noqa: E402
+from services.analysis_service import _analyze_from_matrix, _analyze_from_prices  # noqa: E402
+
+
+def _measure(fn, repeat: int) -> tuple[float, float]:
+    fn()  # warm-up
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    sec = (time.perf_counter() - t0) / repeat
+
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return sec, peak / 2**20
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tickers", type=int, default=2000)
+    parser.add_argument("--years", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    tickers = [f"SYN{i:05d}" for i in range(args.tickers)]
+    prices = SyntheticProvider(seed=42).get_closes(tickers, f"{2024 - args.years}-01-01", "2024-01-01")
+    weights = {t: 1.0 for t in tickers}
+    shock_date = f"{2024 - args.years // 2}-03-02"
+    cash = 100_000.0
+
+    def full(shock):
+        def run():
+            _analyze_from_prices(prices, weights, cash)
+            if shock is not None:
+                _analyze_from_prices(shock(prices), weights, cash)
+        return run
+
+    def compact(shock):
+        def run():
+            pm = PriceMatrix.from_frame(prices)
+            _analyze_from_matrix(pm, weights, cash)
+            if shock is not None:
+                _analyze_from_matrix(shock(pm), weights, cash)
+        return run
+
+    cases = [
+        ("analyze", None, None),
+        (
+            "analyze + permanent shock",
+            lambda p: apply_price_shock(p, shock_date, -0.2),
+            lambda m: apply_price_shock_matrix(m, shock_date, -0.2),
+        ),
+        (
+            "analyze + linear rebound",
+            lambda p: apply_shock_with_linear_rebound(p, shock_date, -0.2, 20),
+            lambda m: apply_shock_with_linear_rebound_matrix(m, shock_date, -0.2, 20),
+        ),
+        (
+            "analyze + regime shift",
+            lambda p: apply_regime_shift(p, shock_date, 1.5, -0.0005),
+            lambda m: apply_regime_shift_matrix(m, shock_date, 1.5, -0.0005),
+        ),
+    ]
+
+    print(f"prices: {prices.shape[0]} days x {prices.shape[1]} tickers ({prices.to_numpy().nbytes / 2**20:.1f} MiB float64)")
+    print(f"{'case':<28} {'float64 ms':>11} {'compact ms':>11} {'float64 MiB':>12} {'compact MiB':>12}")
+    for name, shock, shock_m in cases:
+        sec_f, mib_f = _measure(full(shock), args.repeat)
+        sec_c, mib_c = _measure(compact(shock_m), args.repeat)
+        print(f"{name:<28} {sec_f * 1e3:11.1f} {sec_c * 1e3:11.1f} {mib_f:12.1f} {mib_c:12.1f}")
+
+
+if __name__ == "__main__":
+    main()
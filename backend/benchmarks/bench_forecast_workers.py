@@ -0,0 +1,59 @@
+"""
+Streaming Monte Carlo throughput vs process-pool worker count.
+
+Each run simulates the same seeded paths (sharded by seed substream) and merges the
+workers' sketches, so every worker count yields the same bands; the table reports
+paths per second, the speedup over one worker, and checks that the merged counts match.
+Speedup is bounded by the physical cores available (os.cpu_count() is printed).
+
+Usage (from backend/):
+  python benchmarks/bench_forecast_workers.py --days 252 --simulations 200000 --workers 1 2 4 8
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from engines.streaming_engine import simulate_into_sketch_parallel  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--days", type=int, default=252)
+    parser.add_argument("--simulations", type=int, default=200_000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    s0, mu, sigma, T, N, n = 100_000.0, 0.08, 0.2, args.days / 252, args.days, args.simulations
+
+    print(f"days={args.days} simulations={n} cpu_count={os.cpu_count()}")
+    print(f"{'workers':>8} {'seconds':>9} {'paths/s':>11} {'speedup':>9} {'same counts':>12}")
+    base_time = base_counts = None
+    for workers in args.workers:
+        # One pool per worker count (the service's shared pool is fixed at FORECAST_WORKERS)
+        with ProcessPoolExecutor(max_workers=workers, mp_context=get_context("spawn")) as pool:
+            # warm-up: start the workers (spawned processes import numpy) outside the timing
+            simulate_into_sketch_parallel(s0, mu, sigma, T, N, min(n, 1024 * workers), args.seed, workers, pool)
+
+            t0 = time.perf_counter()
+            sketch = simulate_into_sketch_parallel(s0, mu, sigma, T, N, n, args.seed, workers, pool)
+            elapsed = time.perf_counter() - t0
+
+        if base_time is None:
+            base_time, base_counts = elapsed, sketch.counts
+        same = bool(np.array_equal(sketch.counts, base_counts))
+        print(f"{workers:>8} {elapsed:9.2f} {n / elapsed:11,.0f} {base_time / elapsed:8.2f}x {str(same):>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Monte Carlo GBM path generation: per-step scalar loop vs the vectorized engine.
+
+Both consume the same global RNG stream, so with the same seed they produce the same
+paths; the table reports the max relative difference next to the timings.
+
+Usage (from backend/):
+  python benchmarks/bench_gbm.py --days 252 --simulations 1000 10000
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from engines.stochastic_engine import simulate_many_paths, simulate_many_paths_scalar  # noqa: E402
+
+
+def _timeit(fn, repeat: int) -> tuple[float, np.ndarray]:
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        np.random.seed(0)
+        out = fn()
+    return (time.perf_counter() - t0) / repeat, out
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--days", type=int, default=252)
+    parser.add_argument("--simulations", type=int, nargs="+", default=[1_000, 10_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    s0, mu, sigma, T, N = 100_000.0, 0.08, 0.2, args.days / 252, args.days
+
+    print(f"days={args.days}")
+    print(f"{'paths':>8} {'scalar ms':>11} {'vector ms':>11} {'speedup':>9} {'max rel diff':>13}")
+    for n in args.simulations:
+        repeat = 1 if n * N > 1_000_000 else args.repeat
+        t_scalar, scalar = _timeit(lambda: simulate_many_paths_scalar(s0, mu, sigma, T, N, n), repeat)
+        t_vector, vector = _timeit(lambda: simulate_many_paths(s0, mu, sigma, T, N, n), args.repeat)
+        diff = float(np.max(np.abs(vector / scalar - 1.0)))
+        print(f"{n:>8} {t_scalar * 1e3:11.1f} {t_vector * 1e3:11.1f} {t_scalar / t_vector:8.1f}x {diff:13.1e}")
+
+
+if __name__ == "__main__":
+    main()
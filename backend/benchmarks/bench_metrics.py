@@ -0,0 +1,72 @@
+"""
+Fused single-pass metrics vs the previous four separate pandas metric functions.
+
+The previous implementations (equity curve + cummax drawdown, two std() calls,
+excess-return Series) are inlined below as the reference.
+
+Usage (from backend/):
+  python benchmarks/bench_metrics.py --points 1000 10000 100000 1000000 10000000
+"""
+from __future__ import annotations
+
+import argparse
+import math
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from engines.analytics_engine import fused_metrics_array  # noqa: E402
+
+
+def legacy_metrics(port_r: pd.Series, starting_cash: float) -> dict[str, float]:
+    curve = (1.0 + port_r).cumprod() * starting_cash
+    days = (curve.index[-1] - curve.index[0]).days
+    ann = (float(curve.iloc[-1]) / float(curve.iloc[0])) ** (1.0 / (days / 365.25)) - 1.0
+    vol = float(port_r.std(ddof=1)) * math.sqrt(252)
+    mdd = float((curve / curve.cummax() - 1.0).min())
+    excess = port_r - 0.0
+    std = excess.std(ddof=1)
+    sharpe = float(excess.mean() / std * (252 ** 0.5))
+    return {"annualized_return": ann, "annualized_volatility": vol, "max_drawdown": mdd, "sharpe_ratio": sharpe}
+
+
+def _timeit(fn, repeat: int) -> float:
+    fn()
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - t0) / repeat
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--points", type=int, nargs="+", default=[1_000, 10_000, 100_000, 1_000_000, 10_000_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+
+    print(f"{'points':>10} {'legacy ms':>11} {'fused ms':>10} {'speedup':>9} {'max rel diff':>13}")
+    for n in args.points:
+        # Daily dates stop at 2262 in pandas, so very long series use minute stamps
+        idx = pd.date_range("2000-01-01", periods=n, freq="D" if n <= 50_000 else "min")
+        port_r = pd.Series(rng.normal(0.0, 1e-4 if n > 50_000 else 0.01, n), index=idx)
+        values = port_r.to_numpy()
+
+        legacy = legacy_metrics(port_r, 100_000.0)
+        fused = fused_metrics_array(values, 100_000.0, idx)
+        diff = max(abs(fused[k] - v) / max(abs(v), 1e-12) for k, v in legacy.items())
+
+        repeat = max(1, args.repeat if n <= 1_000_000 else 1)
+        t_legacy = _timeit(lambda: legacy_metrics(port_r, 100_000.0), repeat)
+        t_fused = _timeit(lambda: fused_metrics_array(values, 100_000.0, idx), repeat)
+        print(f"{n:>10} {t_legacy * 1e3:11.2f} {t_fused * 1e3:10.2f} {t_legacy / t_fused:8.1f}x {diff:13.1e}")
+
+
+if __name__ == "__main__":
+    main()
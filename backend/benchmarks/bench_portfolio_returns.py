@@ -0,0 +1,77 @@
+"""
+portfolio_returns speed vs the previous pandas implementation across universe widths.
+
+The previous implementation (copy + fillna, per-column weight alignment, (r * w).sum)
+is inlined below as the reference.
+
+Usage (from backend/):
+  python benchmarks/bench_portfolio_returns.py --days 2520 --columns 10 100 1000 5000
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from engines.portfolio_engine import portfolio_returns  # noqa: E402
+
+
+def legacy_portfolio_returns(asset_returns: pd.DataFrame, weights: dict[str, float]) -> pd.Series:
+    w = pd.Series({k.upper(): float(v) for k, v in weights.items()}, dtype="float64")
+    cols = [c for c in asset_returns.columns if c.upper() in set(w.index)]
+    w = w.reindex([c.upper() for c in cols])
+    w = w / float(w.sum())
+    r = asset_returns[cols].copy().fillna(0.0)
+    w_aligned = pd.Series([w[c.upper()] for c in cols], index=cols, dtype="float64")
+    port_r = (r * w_aligned).sum(axis=1)
+    port_r.name = "portfolio_return"
+    return port_r
+
+
+def _timeit(fn, repeat: int) -> float:
+    fn()
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - t0) / repeat
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--days", type=int, default=2520)
+    parser.add_argument("--columns", type=int, nargs="+", default=[10, 100, 1000, 5000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    idx = pd.bdate_range("2010-01-01", periods=args.days)
+
+    print(f"days={args.days}")
+    print(f"{'columns':>8} {'legacy ms':>11} {'kernel ms':>11} {'speedup':>9}")
+    for n in args.columns:
+        data = rng.normal(0.0003, 0.01, size=(args.days, n))
+        data[rng.random(data.shape) < 0.01] = np.nan
+        asset_r = pd.DataFrame(data, index=idx, columns=[f"T{i:05d}" for i in range(n)])
+        weights = {c: float(w) for c, w in zip(asset_r.columns, rng.random(n))}
+
+        np.testing.assert_allclose(
+            portfolio_returns(asset_r, weights).to_numpy(),
+            legacy_portfolio_returns(asset_r, weights).to_numpy(),
+            rtol=1e-10,
+            atol=1e-15,
+        )
+
+        repeat = max(1, args.repeat if n <= 1000 else args.repeat // 2)
+        legacy = _timeit(lambda: legacy_portfolio_returns(asset_r, weights), repeat)
+        kernel = _timeit(lambda: portfolio_returns(asset_r, weights), repeat)
+        print(f"{n:>8} {legacy * 1e3:11.2f} {kernel * 1e3:11.2f} {legacy / kernel:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Network-free throughput benchmark for the analysis services.
+
+Runs analyze_portfolio, analyze_with_shock and forecast_portfolio against the
+deterministic synthetic provider.
+
+Usage (from backend/):
+  python benchmarks/bench_services.py --tickers 10 --years 5 --repeat 20
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from providers.market_data import set_provider  # noqa: E402
+from providers.synthetic_provider import SyntheticProvider  # noqa: E402
+from services.analysis_service import analyze_portfolio  # noqa: E402
+from services.stress_service import analyze_with_shock  # noqa: E402
+from services.forecast_service import forecast_portfolio  # noqa: E402
+
+
+def _timeit(fn, repeat: int) -> tuple[float, object]:
+    out = fn()  # warm-up (fills provider caches)
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        out = fn()
+    return (time.perf_counter() - t0) / repeat, out
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tickers", type=int, default=10)
+    parser.add_argument("--years", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--simulations", type=int, default=1000)
+    args = parser.parse_args()
+
+    set_provider(SyntheticProvider(seed=42))
+
+    tickers = [f"SYN{i:04d}" for i in range(args.tickers)]
+    start, end = f"{2024 - args.years}-01-01", "2024-01-01"
+    holdings = [{"ticker": t, "weight": 1.0 / len(tickers)} for t in tickers]
+    base = {"portfolio": {"starting_cash": 100_000, "holdings": holdings}, "date_range": {"start": start, "end": end}}
+
+    rows = []
+
+    sec, analysis = _timeit(lambda: analyze_portfolio(base), args.repeat)
+    rows.append(("analyze_portfolio", sec))
+
+    shock = {**base, "shock": {"type": "linear_rebound", "date": f"{2024 - args.years + 1}-03-02", "pct": -0.2}}
+    sec, _ = _timeit(lambda: analyze_with_shock(shock), args.repeat)
+    rows.append(("analyze_with_shock", sec))
+
+    fc = {"analysis_id": analysis["analysis_id"], "forecast": {"type": "deterministic", "days": 252}}
+    sec, _ = _timeit(lambda: forecast_portfolio(fc), args.repeat)
+    rows.append(("forecast_portfolio (deterministic)", sec))
+
+    fc_s = {
+        "analysis_id": analysis["analysis_id"],
+        "forecast": {"type": "stochastic", "days": 252, "simulations": args.simulations},
+    }
+    sec, _ = _timeit(lambda: forecast_portfolio(fc_s), max(1, args.repeat // 10))
+    rows.append((f"forecast_portfolio (stochastic, n={args.simulations})", sec))
+
+    print(f"tickers={args.tickers} years={args.years}")
+    for name, sec in rows:
+        print(f"{name:<45} {sec * 1e3:10.2f} ms/call  {1.0 / sec:10.1f} calls/s")
+
+
+if __name__ == "__main__":
+    main()
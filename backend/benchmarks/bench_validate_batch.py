@@ -0,0 +1,72 @@
+"""
+Compare /api/holdings/validate_batch against N single /api/holdings/validate calls.
+
+Uses the synthetic provider with an artificial per-call latency to stand in for
+the network round trip to the market data vendor.
+
+Usage (from backend/):
+  python benchmarks/bench_validate_batch.py --holdings 40 --latency-ms 150
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app import create_app  # noqa: E402
+from providers.market_data import set_provider  # noqa: E402
+from providers.synthetic_provider import SyntheticProvider  # noqa: E402
+
+
+class SlowSyntheticProvider(SyntheticProvider):
+    def __init__(self, latency_s: float, **kwargs):
+        super().__init__(**kwargs)
+        self.latency_s = latency_s
+        self.calls = 0
+
+    def get_closes(self, tickers, start, end):
+        self.calls += 1
+        time.sleep(self.latency_s)
+        return super().get_closes(tickers, start, end)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--holdings", type=int, default=40)
+    parser.add_argument("--latency-ms", type=float, default=150.0)
+    args = parser.parse_args()
+
+    provider = SlowSyntheticProvider(args.latency_ms / 1000.0, seed=1)
+    set_provider(provider)
+    client = create_app().test_client()
+
+    dates = pd.bdate_range("2024-03-01", periods=args.holdings, freq="3B")
+    holdings = [{"ticker": f"SYN{i:03d}", "buy_date": d.strftime("%Y-%m-%d")} for i, d in enumerate(dates)]
+
+    provider.calls = 0
+    t0 = time.perf_counter()
+    singles = [client.post("/api/holdings/validate", json=h).get_json() for h in holdings]
+    single_s = time.perf_counter() - t0
+    single_calls = provider.calls
+
+    provider.calls = 0
+    t0 = time.perf_counter()
+    batch = client.post("/api/holdings/validate_batch", json={"holdings": holdings}).get_json()
+    batch_s = time.perf_counter() - t0
+    batch_calls = provider.calls
+
+    assert batch["results"] == singles, "batch and single results differ"
+
+    print(f"holdings={args.holdings} provider latency={args.latency_ms:.0f} ms")
+    print(f"{'N x /validate':<20} {single_s * 1e3:10.1f} ms  provider calls={single_calls}")
+    print(f"{'/validate_batch':<20} {batch_s * 1e3:10.1f} ms  provider calls={batch_calls}")
+    print(f"speedup: {single_s / batch_s:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
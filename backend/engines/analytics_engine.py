@@ -2,8 +2,14 @@ from __future__ import annotations
 import math
 from typing import Any
 
+import numpy as np
 import pandas as pd
 
+from engines.running_metrics import RunningMetrics
+
+# Rows per block of the fused metrics pass (~512 KB of float64, stays cache-resident)
+_FUSED_BLOCK = 65_536
+
 # Small math helpers
 def _safe_float(x: Any, default: float = 0.0) -> float:
     try:
@@ -43,8 +49,8 @@ def annualized_volatility(portfolio_returns: pd.Series, periods_per_year: int =
     """
     if portfolio_returns.empty:
         return 0.0
-    daily_std = float(portfolio_returns.std(ddof=1))
-    return daily_std * math.sqrt(periods_per_year)
+    r = portfolio_returns.to_numpy(dtype="float64", na_value=np.nan)
+    return fused_metrics_array(r, periods_per_year=periods_per_year)["annualized_volatility"]
 
 
 def max_drawdown(curve: pd.Series) -> float:
@@ -53,9 +59,7 @@ def max_drawdown(curve: pd.Series) -> float:
     """
     if curve.empty:
         return 0.0
-    running_max = curve.cummax()
-    drawdowns = (curve / running_max) - 1.0
-    return float(drawdowns.min())
+    return max_drawdown_array(curve.to_numpy(dtype="float64", na_value=np.nan))
 
 
 def annualized_return(curve: pd.Series) -> float:
@@ -92,20 +96,111 @@ def sharpe_ratio(
     """
     if portfolio_returns.empty:
         return 0.0
+    r = portfolio_returns.to_numpy(dtype="float64", na_value=np.nan)
+    return fused_metrics_array(
+        r, risk_free_rate_annual=risk_free_rate_annual, periods_per_year=periods_per_year
+    )["sharpe_ratio"]
+
+
+def fused_metrics_array(
+    portfolio_returns: np.ndarray,
+    starting_cash: float = 1.0,
+    dates: pd.DatetimeIndex | None = None,
+    risk_free_rate_annual: float = 0.0,
+    periods_per_year: int = 252,
+) -> dict[str, float]:
+    """
+    All headline metrics from one pass over a returns array, in cache-sized blocks:
+
+      - mean / M2 (Welford, merged across blocks with Chan's formula)  -> volatility, Sharpe
+      - compounded value V_t = starting_cash * Π(1 + r)                 -> annualized return
+      - running peak and min(V / peak - 1)                              -> max drawdown
+
+    NaN returns are skipped (as pandas does). `dates` (same length as the returns) is
+    only needed for the annualized return, which is 0.0 without it. Returns
+    {annualized_return, annualized_volatility, max_drawdown, sharpe_ratio, count, final_value}.
+    """
+    r = np.asarray(portfolio_returns)
+    acc = RunningMetrics(last_value=float(starting_cash))
+    for lo in range(0, r.size, _FUSED_BLOCK):
+        block = r[lo : lo + _FUSED_BLOCK]
+        block_dates = None if dates is None else dates[lo : lo + _FUSED_BLOCK]
+        ok = ~np.isnan(block)
+        if not ok.all():
+            block = block[ok]
+            block_dates = None if block_dates is None else block_dates[ok]
+        acc.update(block, block_dates)
+
+    return {
+        **acc.metrics(risk_free_rate_annual, periods_per_year),
+        "count": acc.count,
+        "final_value": acc.last_value,
+    }
+
 
-    # Convert annual risk-free rate to daily
-    rf_daily = risk_free_rate_annual / periods_per_year
+# ================Compact (ndarray) metrics======================
+# Counterparts of the functions above for the compact pipeline. Inputs may be float32;
+# every reduction accumulates in float64 so results track the float64 path closely.
 
-    excess_returns = portfolio_returns - rf_daily
-    std = excess_returns.std(ddof=1)
+def equity_curve_array(portfolio_returns: np.ndarray, starting_cash: float) -> np.ndarray:
+    """V_t = starting_cash * Π(1 + r_t), compounded in float64."""
+    r = np.asarray(portfolio_returns)
+    if r.size == 0:
+        return np.empty(0, dtype="float64")
+    return np.cumprod(1.0 + r.astype("float64"), dtype="float64") * float(starting_cash)
 
-    if std == 0 or pd.isna(std):
+
+def annualized_volatility_array(portfolio_returns: np.ndarray, periods_per_year: int = 252) -> float:
+    """std(daily_returns, ddof=1) * sqrt(252); NaN for a single observation, like pandas."""
+    r = np.asarray(portfolio_returns)
+    if r.size == 0:
+        return 0.0
+    return fused_metrics_array(r, periods_per_year=periods_per_year)["annualized_volatility"]
+
+
+def max_drawdown_array(curve: np.ndarray) -> float:
+    """min(equity / running_max - 1), one blocked pass carrying the peak (NaN points skipped)."""
+    curve = np.asarray(curve)
+    worst, peak = 1.0, -math.inf
+    for lo in range(0, curve.size, _FUSED_BLOCK):
+        block = curve[lo : lo + _FUSED_BLOCK].astype("float64", copy=False)
+        block = block[~np.isnan(block)]
+        if block.size == 0:
+            continue
+        running_max = np.maximum.accumulate(np.maximum(block, peak))
+        worst = min(worst, float((block / running_max).min()))
+        peak = float(running_max[-1])
+    return worst - 1.0
+
+
+def annualized_return_array(curve: np.ndarray, dates: pd.DatetimeIndex) -> float:
+    """(end/start)^(1/years) - 1 with years = calendar days / 365.25."""
+    curve = np.asarray(curve, dtype="float64")
+    if curve.size == 0:
+        return 0.0
+
+    start_val, end_val = float(curve[0]), float(curve[-1])
+    if start_val <= 0:
+        return 0.0
+
+    days = (dates[-1] - dates[0]).days
+    if days <= 0:
         return 0.0
+    return (end_val / start_val) ** (1.0 / (days / 365.25)) - 1.0
 
-    sharpe_daily = excess_returns.mean() / std
-    sharpe_annual = sharpe_daily * (periods_per_year ** 0.5)
 
-    return float(sharpe_annual)
+def sharpe_ratio_array(
+    portfolio_returns: np.ndarray,
+    risk_free_rate_annual: float = 0.0,
+    periods_per_year: int = 252,
+) -> float:
+    """Annualized mean(R_p - R_f) / std(R_p - R_f)."""
+    r = np.asarray(portfolio_returns)
+    if r.size < 2:
+        return 0.0
+    return fused_metrics_array(
+        r, risk_free_rate_annual=risk_free_rate_annual, periods_per_year=periods_per_year
+    )["sharpe_ratio"]
 
 
 # ====================Forecasting analysis metrics======================
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import math
+
+import numpy as np
+import pandas as pd
+
+
+# Cap on T x K elements per block of portfolio returns (~32 MB of float64), so very
+# large sweeps are evaluated in a few big matrix products instead of one huge one.
+_BLOCK_ELEMENTS = 4_000_000
+
+
+def normalize_weight_matrix(weights: np.ndarray) -> np.ndarray:
+    """
+    Normalize each row of a K x N weight matrix to sum to 1.0 (same rule as portfolio_returns).
+    """
+    w = np.asarray(weights, dtype="float64")
+    if w.ndim != 2:
+        raise ValueError("weights must be a K x N matrix.")
+
+    totals = w.sum(axis=1)
+    bad = np.flatnonzero((totals == 0) | ~np.isfinite(totals))
+    if bad.size:
+        shown = ", ".join(str(i) for i in bad[:10])
+        raise ValueError(f"Weights sum to 0 (or are not finite) for portfolio row(s): {shown}.")
+    return w / totals[:, None]
+
+
+def batch_portfolio_metrics(
+    asset_returns: np.ndarray,
+    weights: np.ndarray,
+    dates: pd.DatetimeIndex,
+    risk_free_rate_annual: float = 0.0,
+    periods_per_year: int = 252,
+) -> dict[str, np.ndarray]:
+    """
+    Metrics for K portfolios over the same returns window, vectorized over K.
+
+    asset_returns: T x N daily returns (NaN treated as 0.0, as in portfolio_returns)
+    weights:       K x N weights, normalized per row
+    dates:         length-T index of the return dates (for annualized return)
+
+    Per portfolio k (r_k = R @ w_k):
+      annualized_volatility = sqrt(w_k' C w_k) * sqrt(252), C = sample covariance of R (ddof=1)
+      sharpe_ratio          = (mean(R) @ w_k - rf) / sqrt(w_k' C w_k) * sqrt(252)
+      annualized_return     = (V_end / V_start)^(365.25 / days) - 1, V = Π(1 + r_k)
+      max_drawdown          = min(V / running_max(V) - 1)
+
+    Mean/variance come from N x N moments, so they never touch the T x K return matrix.
+    The path metrics use one matrix product per block of portfolios, then walk the T
+    days once with length-K vector ops (running value, peak and worst ratio), which
+    is much faster than cumprod/cummax along the strided axis.
+
+    Each returns a length-K float64 array matching the single-portfolio functions in
+    analytics_engine, except that a one-day window gives volatility 0.0 (not NaN).
+    """
+    r = np.nan_to_num(np.asarray(asset_returns, dtype="float64"), nan=0.0, posinf=np.inf, neginf=-np.inf)
+    w = normalize_weight_matrix(weights)
+    n_days, n_assets = r.shape
+    if w.shape[1] != n_assets:
+        raise ValueError(f"weights have {w.shape[1]} columns but there are {n_assets} assets.")
+
+    k = w.shape[0]
+    out = {
+        name: np.zeros(k, dtype="float64")
+        for name in ("annualized_return", "annualized_volatility", "max_drawdown", "sharpe_ratio")
+    }
+    if n_days == 0 or k == 0:
+        return out
+
+    # --- Moment metrics: K quadratic forms over the N x N covariance ---
+    if n_days > 1:
+        cov = np.atleast_2d(np.cov(r, rowvar=False, ddof=1))
+        var = np.maximum(np.einsum("kn,nm,km->k", w, cov, w), 0.0)
+        std = np.sqrt(var)
+        out["annualized_volatility"] = std * math.sqrt(periods_per_year)
+
+        excess_mean = w @ r.mean(axis=0) - risk_free_rate_annual / periods_per_year
+        with np.errstate(divide="ignore", invalid="ignore"):
+            sharpe = excess_mean / std * (periods_per_year ** 0.5)
+        # Treat numerically-zero variance (e.g. constant returns) as zero, like a 0 std
+        flat = std <= 1e-12 * np.maximum(np.abs(excess_mean), 1e-300)
+        out["sharpe_ratio"] = np.where(flat | ~np.isfinite(std), 0.0, sharpe)
+    # A single daily return has no sample std: volatility and Sharpe stay 0.0 (NaN is not valid JSON)
+
+    # --- Path metrics: one product per block, then one pass over the days ---
+    days = (dates[-1] - dates[0]).days
+    block = max(1, _BLOCK_ELEMENTS // n_days)
+    for lo in range(0, k, block):
+        hi = min(lo + block, k)
+        growth = r @ w[lo:hi].T  # T x block
+        growth += 1.0
+
+        value = growth[0].copy()  # growth of 1.0; starting cash cancels out
+        start_val = value.copy()
+        peak = value.copy()
+        worst = np.ones_like(value)
+        ratio = np.empty_like(value)
+        for row in growth[1:]:
+            np.multiply(value, row, out=value)
+            np.maximum(peak, value, out=peak)
+            np.divide(value, peak, out=ratio)
+            np.minimum(worst, ratio, out=worst)
+
+        out["max_drawdown"][lo:hi] = worst - 1.0
+        if days > 0:
+            with np.errstate(divide="ignore", invalid="ignore"):
+                ann = (value / start_val) ** (365.25 / days) - 1.0
+            out["annualized_return"][lo:hi] = np.where(start_val > 0, ann, 0.0)
+
+    return out
@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+
+# Buy-and-hold (shares) valuation.
+#
+# A portfolio is a ledger of trades (date row, asset column, shares). Positions are
+# constant between trade dates, so the holdings value is one matrix-vector product per
+# segment between trades (prices[seg] @ positions) rather than anything per day, and
+# cash/contributions are cumulative sums over the trade costs.
+
+
+@dataclass(frozen=True)
+class Ledger:
+    """Trades resolved against a price matrix: parallel arrays, one entry per trade."""
+
+    rows: np.ndarray  # int, price row the trade executes on
+    cols: np.ndarray  # int, asset column
+    shares: np.ndarray  # float64, shares bought (> 0) or sold (< 0)
+    prices: np.ndarray  # float64, execution price (close on that row)
+
+
+def build_ledger(
+    prices: np.ndarray,
+    dates: pd.DatetimeIndex,
+    tickers: list[str] | tuple[str, ...],
+    trades: list[dict[str, Any]],
+) -> tuple[Ledger, list[dict[str, Any]]]:
+    """
+    Resolve {ticker, shares, buy_date?} trades to rows/columns of `prices`.
+
+    - No buy_date, or one on/before the first row: executes on the first row.
+    - Otherwise: the first row on/after buy_date where the ticker has a price
+      (same "next trading day" rule as /api/holdings/validate).
+
+    Returns (ledger, executed) where `executed` lists {ticker, shares, requested_date,
+    date, price, value} per trade, in input order. Raises ValueError if a trade
+    cannot be priced inside the window.
+    """
+    col_of = {str(t).upper(): i for i, t in enumerate(tickers)}
+    n_days = len(dates)
+    if n_days == 0:
+        raise ValueError("No price data available to value share holdings.")
+
+    rows, cols, shares, px, executed = [], [], [], [], []
+    for tr in trades:
+        ticker = str(tr["ticker"]).upper()
+        if ticker not in col_of:
+            raise ValueError(f"Ticker {ticker} not found in market data columns.")
+        col = col_of[ticker]
+
+        requested = tr.get("buy_date")
+        start = 0 if not requested else int(dates.searchsorted(pd.Timestamp(requested), side="left"))
+        if start >= n_days:
+            raise ValueError(f"buy_date {requested} for {ticker} is after the selected window.")
+
+        if requested:
+            valid = np.flatnonzero(~np.isnan(prices[start:, col]))
+            if valid.size == 0:
+                raise ValueError(f"No valid price for {ticker} on or after {requested} in the selected window.")
+            row = start + int(valid[0])
+        else:
+            row = 0
+
+        price = float(prices[row, col])
+        if not np.isfinite(price) or price <= 0:
+            raise ValueError(f"Missing/invalid price for {ticker} on {dates[row].strftime('%Y-%m-%d')}.")
+
+        n_shares = float(tr["shares"])
+        rows.append(row)
+        cols.append(col)
+        shares.append(n_shares)
+        px.append(price)
+        executed.append(
+            {
+                "ticker": ticker,
+                "shares": round(n_shares, 6),
+                "requested_date": requested,
+                "date": dates[row].strftime("%Y-%m-%d"),
+                "price": round(price, 6),
+                "value": round(n_shares * price, 2),
+            }
+        )
+
+    ledger = Ledger(
+        rows=np.asarray(rows, dtype=np.intp),
+        cols=np.asarray(cols, dtype=np.intp),
+        shares=np.asarray(shares, dtype="float64"),
+        prices=np.asarray(px, dtype="float64"),
+    )
+    return ledger, executed
+
+
+def forward_fill(prices: np.ndarray) -> np.ndarray:
+    """Last known price per column (NaN before a column's first price)."""
+    prices = np.asarray(prices)
+    n_days, n_assets = prices.shape
+    last = np.where(np.isnan(prices), 0, np.arange(n_days)[:, None])
+    np.maximum.accumulate(last, axis=0, out=last)
+    return prices[last, np.arange(n_assets)]
+
+
+def holdings_value(prices: np.ndarray, ledger: Ledger, cash: float = 0.0) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Daily portfolio value and external contributions for a trade ledger.
+
+      positions_t = Σ shares of trades with row <= t
+      V_t         = positions_t · P_t (last known prices) + cash_t
+
+    Purchases are paid from cash while it lasts; anything beyond that is an external
+    contribution (flow_t), and sale proceeds go back to cash:
+      contributed_t = running_max(max(Σ cost_{<=t} - cash, 0))
+      cash_t        = cash + contributed_t - Σ cost_{<=t}
+      flow_t        = contributed_t - contributed_{t-1}
+
+    Returns (value, flows), both length T float64.
+    """
+    prices = np.asarray(prices)
+    n_days, n_assets = prices.shape
+
+    costs = ledger.shares * ledger.prices
+    cum_cost = np.cumsum(np.bincount(ledger.rows, weights=costs, minlength=n_days))
+    contributed = np.maximum.accumulate(np.maximum(cum_cost - float(cash), 0.0))
+    cash_balance = float(cash) + contributed - cum_cost
+    flows = np.diff(contributed, prepend=0.0)
+
+    # Positions change only on trade rows: one product per segment between them
+    filled = np.nan_to_num(forward_fill(prices), nan=0.0)
+    order = np.argsort(ledger.rows, kind="stable")
+    trade_rows = ledger.rows[order]
+    seg_starts, first_trade = np.unique(trade_rows, return_index=True)
+    seg_ends = np.append(seg_starts[1:], n_days)
+    trade_ends = np.append(first_trade[1:], len(trade_rows))
+
+    invested = np.zeros(n_days, dtype="float64")
+    positions = np.zeros(n_assets, dtype="float64")
+    for s, e, a, b in zip(seg_starts, seg_ends, first_trade, trade_ends):
+        np.add.at(positions, ledger.cols[order[a:b]], ledger.shares[order[a:b]])
+        invested[s:e] = filled[s:e] @ positions
+
+    return invested + cash_balance, flows
+
+
+def buy_and_hold_returns(value: np.ndarray, flows: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Time-weighted daily returns of a valued ledger:
+
+      r_t = (V_t - flow_t) / V_{t-1} - 1
+
+    The series starts the day after the portfolio first has value, so contributions
+    never show up as gains. Returns (returns, rows) where rows index the value array.
+    """
+    live = np.flatnonzero(value > 0)
+    if live.size == 0:
+        return np.empty(0, dtype="float64"), np.empty(0, dtype=np.intp)
+
+    first = int(live[0])
+    prev = value[first:-1]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        r = (value[first + 1 :] - flows[first + 1 :]) / prev - 1.0
+    r = np.where(prev > 0, r, 0.0)  # fully liquidated with no cash: flat
+    return r, np.arange(first + 1, len(value), dtype=np.intp)
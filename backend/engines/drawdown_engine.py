@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+
+# Drawdown episodes from one running-max array.
+#
+# A row is under water when V_t < running_max(V)_t. Each maximal run of under-water
+# rows is one episode: it starts the row after its peak, its trough is the lowest
+# point in the run (the peak is constant inside it), and it recovers on the first
+# row back at the peak. Runs are found from the edges of the under-water mask
+# (run-length segmentation) and reduced with ufunc.reduceat, so nothing loops per day.
+
+
+def drawdown_episodes(curve: np.ndarray, dates: pd.DatetimeIndex, top_n: int = 5) -> list[dict[str, Any]]:
+    """
+    The `top_n` deepest drawdown episodes of an equity curve, deepest first.
+
+    Each episode: peak_date, trough_date, recovery_date (None while still under water),
+    depth = V_trough / V_peak - 1, and lengths in trading days:
+      length          peak -> recovery (or -> last row if not recovered)
+      decline_length  peak -> trough
+      recovery_length trough -> recovery (None if not recovered)
+    plus days_under_water, the calendar days spanned by `length`.
+    """
+    v = np.asarray(curve, dtype="float64")
+    n = v.size
+    if n < 2 or top_n <= 0:
+        return []
+
+    peak = np.maximum.accumulate(v)
+    under = v < peak
+    edges = np.diff(under.astype(np.int8), prepend=0, append=0)
+    starts = np.flatnonzero(edges == 1)  # first under-water row of each run
+    ends = np.flatnonzero(edges == -1)  # row after the run (== n if never recovered)
+    if starts.size == 0:
+        return []
+
+    # Under-water rows in order; run k occupies offsets[k] : offsets[k] + lengths[k] of them
+    rows = np.flatnonzero(under)
+    dd = v[rows] / peak[rows] - 1.0
+    lengths = ends - starts
+    offsets = np.cumsum(lengths) - lengths
+    run_id = np.repeat(np.arange(starts.size), lengths)
+
+    depth = np.minimum.reduceat(dd, offsets)
+    at_min = dd == depth[run_id]
+    _, first_min = np.unique(run_id[at_min], return_index=True)
+    troughs = rows[at_min][first_min]
+
+    order = np.argsort(depth, kind="stable")[:top_n]
+    episodes = []
+    for k in order:
+        peak_row, trough_row = int(starts[k]) - 1, int(troughs[k])
+        recovered = bool(ends[k] < n)
+        last_row = int(ends[k]) if recovered else n - 1
+        episodes.append(
+            {
+                "peak_date": dates[peak_row].strftime("%Y-%m-%d"),
+                "trough_date": dates[trough_row].strftime("%Y-%m-%d"),
+                "recovery_date": dates[last_row].strftime("%Y-%m-%d") if recovered else None,
+                "depth": float(depth[k]),
+                "length": last_row - peak_row,
+                "decline_length": trough_row - peak_row,
+                "recovery_length": last_row - trough_row if recovered else None,
+                "days_under_water": int((dates[last_row] - dates[peak_row]).days),
+            }
+        )
+    return episodes
+
+
+def underwater_durations(paths: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Per-path drawdown durations for an n_paths x steps array, vectorized over paths.
+
+    For each step, the run length under water so far is t - (last step at the running
+    max), from one maximum.accumulate over the at-peak step indices. Returns
+      longest:  longest run of consecutive steps under water, per path
+      fraction: share of steps spent under water, per path
+    """
+    paths = np.asarray(paths, dtype="float64")
+    if paths.ndim != 2 or paths.shape[1] == 0:
+        empty = np.zeros(paths.shape[0] if paths.ndim == 2 else 0)
+        return empty, empty.copy()
+
+    under = paths < np.maximum.accumulate(paths, axis=1)
+    steps = np.arange(paths.shape[1])
+    last_peak = np.maximum.accumulate(np.where(under, 0, steps), axis=1)
+    longest = (steps - last_peak).max(axis=1)
+    return longest.astype("float64"), under.mean(axis=1)
@@ -7,6 +7,7 @@ from services.store_singleton import analysis_store
 from engines.analytics_engine import equity_curve
 from engines.analytics_engine import forecast_summary
 from engines.forecast_estimators import estimate_drift
+from engines.trading_calendar import future_sessions
 
 
 def _forecast_from_returns(
@@ -39,7 +40,7 @@ def _forecast_from_returns(
     r_hat, trend_meta = estimate_drift(port_r, mode, window=window, alpha=alpha, lam=lam) # Estimate drift using specified method
 
     last_date = hist_curve.index[-1]
-    future_idx = pd.bdate_range(last_date + pd.Timedelta(days=1), periods=forecast_days)
+    future_idx = future_sessions(last_date, forecast_days)  # real exchange sessions
 
     cur = float(hist_curve.iloc[-1])
     vals = []
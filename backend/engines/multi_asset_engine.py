@@ -0,0 +1,232 @@
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from typing import Any, Iterator
+
+import numpy as np
+import pandas as pd
+
+from engines.stochastic_engine import (
+    PATHS_PER_STREAM,
+    path_streams,
+    resolve_seed,
+    summarize_drawdown_metrics,
+    summarize_path_metrics,
+    summarize_terminal_metrics,
+)
+from engines.streaming_engine import ForecastSketch
+
+
+# Upper bound on simulated values (paths x days x assets) held at once; a substream's
+# PATHS_PER_STREAM paths are drawn in row blocks below it (~32 MB of float64).
+MAX_BLOCK_ELEMENTS = 4_000_000
+
+
+@dataclass(frozen=True)
+class AssetMoments:
+    """
+    Sufficient statistics of daily asset returns for AssetModel (NaN returns count as
+    0.0): count, per-asset mean and the K x K co-moment matrix m2 = sum (r - mean)(r - mean)^T.
+    O(K^2) memory regardless of the history length; extended with new days in O(new days).
+    """
+
+    tickers: tuple[str, ...]
+    count: int
+    mean: np.ndarray
+    m2: np.ndarray
+
+    @classmethod
+    def from_returns(cls, asset_returns: pd.DataFrame) -> "AssetMoments":
+        k = asset_returns.shape[1]
+        empty = cls(tuple(str(c) for c in asset_returns.columns), 0, np.zeros(k), np.zeros((k, k)))
+        return empty.extend(asset_returns)
+
+    def extend(self, asset_returns: pd.DataFrame) -> "AssetMoments":
+        """
+        New moments with `asset_returns` (same tickers, in date order) folded in, merged
+        as in Chan et al. (cf. RunningMetrics.update):
+          delta = mean_b - mean,  n' = n + k
+          mean' = mean + delta * k / n'
+          M2'   = M2 + M2_b + delta delta^T * n * k / n'
+        """
+        r = asset_returns.reindex(columns=list(self.tickers)).to_numpy(dtype="float64", na_value=np.nan)
+        r = np.nan_to_num(r, nan=0.0)
+        k = r.shape[0]
+        if k == 0:
+            return self
+        batch_mean = r.mean(axis=0)
+        centered = r - batch_mean
+        n = self.count + k
+        delta = batch_mean - self.mean
+        return AssetMoments(
+            self.tickers,
+            n,
+            self.mean + delta * (k / n),
+            self.m2 + centered.T @ centered + np.outer(delta, delta) * (self.count * k / n),
+        )
+
+
+@dataclass(frozen=True)
+class AssetModel:
+    """
+    Correlated multi-asset GBM fitted to daily asset returns (NaN returns count as 0.0,
+    as in portfolio_returns), annualized with `periods_per_year`:
+
+    - mu:   mean(r) * periods                 per-asset drift (as estimate_drift "mean")
+    - cov:  cov(r, ddof=1) * periods          covariance (as estimate_volatility "historical")
+    - chol: lower-triangular L, L L^T = cov   factored once, reused by every simulation
+
+    For weights w the portfolio moments w·mu and sqrt(w' cov w) equal the single-series
+    estimates on the weighted portfolio returns.
+    """
+
+    tickers: tuple[str, ...]
+    mu: np.ndarray
+    cov: np.ndarray
+    chol: np.ndarray
+
+    @classmethod
+    def from_returns(cls, asset_returns: pd.DataFrame, periods_per_year: int = 252) -> "AssetModel":
+        r = np.nan_to_num(asset_returns.to_numpy(dtype="float64", na_value=np.nan), nan=0.0)
+        if r.shape[0] < 2 or r.shape[1] == 0:
+            raise ValueError("Not enough asset return data for the multi-asset model.")
+        mu = r.mean(axis=0) * periods_per_year
+        cov = np.atleast_2d(np.cov(r, rowvar=False)) * periods_per_year
+        return cls(tuple(str(c) for c in asset_returns.columns), mu, cov, _cholesky(cov))
+
+    @classmethod
+    def from_moments(cls, moments: AssetMoments, periods_per_year: int = 252) -> "AssetModel":
+        """Same fit as from_returns, from the running moments of the returns."""
+        if moments.count < 2 or not moments.tickers:
+            raise ValueError("Not enough asset return data for the multi-asset model.")
+        mu = moments.mean * periods_per_year
+        cov = moments.m2 / (moments.count - 1) * periods_per_year
+        return cls(moments.tickers, mu, cov, _cholesky(cov))
+
+    def portfolio_moments(self, weights: np.ndarray) -> tuple[float, float]:
+        """(annualized drift, annualized volatility) of the weighted portfolio."""
+        w = np.asarray(weights, dtype="float64")
+        return float(w @ self.mu), math.sqrt(max(float(w @ self.cov @ w), 0.0))
+
+
+def _cholesky(cov: np.ndarray) -> np.ndarray:
+    """
+    Cholesky factor of a covariance matrix. Sample covariances can be singular
+    (duplicate or constant assets, fewer days than assets); those get the smallest
+    diagonal ridge (1e-12 x mean variance, growing x100) that makes them factor.
+    """
+    try:
+        return np.linalg.cholesky(cov)
+    except np.linalg.LinAlgError:
+        pass
+    k = cov.shape[0]
+    scale = max(float(np.trace(cov)) / k, 1e-16)
+    for exponent in range(-12, 0, 2):
+        try:
+            return np.linalg.cholesky(cov + 10.0**exponent * scale * np.eye(k))
+        except np.linalg.LinAlgError:
+            continue
+    raise ValueError("Asset covariance matrix is not positive semi-definite.")
+
+
+def simulate_asset_returns(model: AssetModel, T: float, N: int, n: int, rng: np.random.Generator) -> np.ndarray:
+    """
+    (n, N, K) per-step simple returns of K correlated GBM assets:
+
+      x = (mu - diag(cov) / 2) dt + sqrt(dt) z L^T,   z ~ N(0, I) of shape (n, N, K)
+      r = exp(x) - 1
+
+    The correlation is one batched (n N x K) @ (K x K) product.
+    """
+    dt = T / N
+    x = rng.standard_normal((n, N, len(model.tickers)))
+    x = x @ (model.chol.T * math.sqrt(dt))
+    x += (model.mu - 0.5 * np.diag(model.cov)) * dt
+    np.exp(x, out=x)
+    x -= 1.0
+    return x
+
+
+def simulate_portfolio_paths(
+    model: AssetModel,
+    weights: np.ndarray,
+    s0: float,
+    T: float,
+    N: int,
+    n: int,
+    rng: np.random.Generator,
+) -> np.ndarray:
+    """
+    (n, N + 1) portfolio value paths held at constant `weights` (rebalanced every step,
+    like the weights-mode analysis): V_t = s0 * prod_{u<=t} (1 + r_u · w). Column 0 is s0.
+    """
+    paths = np.empty((n, N + 1))
+    paths[:, 0] = 1.0
+    paths[:, 1:] = simulate_asset_returns(model, T, N, n, rng) @ weights
+    paths[:, 1:] += 1.0
+    np.cumprod(paths, axis=1, out=paths)
+    paths *= s0
+    return paths
+
+
+def _portfolio_blocks(
+    model: AssetModel,
+    weights: np.ndarray,
+    s0: float,
+    T: float,
+    N: int,
+    n: int,
+    seed: int,
+) -> Iterator[tuple[int, np.ndarray]]:
+    """
+    (first path index, paths) blocks in path order. Each seed substream covers
+    PATHS_PER_STREAM paths; its rows are drawn in blocks of at most MAX_BLOCK_ELEMENTS
+    values, which continue the same Generator stream, so the block size never changes the paths.
+    """
+    rows = max(1, MAX_BLOCK_ELEMENTS // max(N * len(model.tickers), 1))
+    for i, rng in enumerate(path_streams(seed, n)):
+        stream_lo = i * PATHS_PER_STREAM
+        stream_hi = min(stream_lo + PATHS_PER_STREAM, n)
+        for lo in range(stream_lo, stream_hi, rows):
+            size = min(rows, stream_hi - lo)
+            yield lo, simulate_portfolio_paths(model, weights, s0, T, N, size, rng)
+
+
+def run_multi_asset_forecast(
+    model: AssetModel,
+    weights: np.ndarray,
+    s0: float,
+    T: float,
+    N: int,
+    n: int,
+    seed: int | None = None,
+    streaming: bool = False,
+) -> dict[str, Any]:
+    """
+    Multi-asset counterpart of run_stochastic_forecast (same output keys): correlated
+    asset paths from `model`, aggregated to the portfolio by normalized `weights`
+    (aligned to model.tickers). streaming=True summarizes through a ForecastSketch on
+    the portfolio's moments instead of keeping the paths.
+    """
+    seed = resolve_seed(seed)
+    weights = np.asarray(weights, dtype="float64")
+    blocks = _portfolio_blocks(model, weights, s0, T, N, n, seed)
+
+    if streaming:
+        mu_p, sigma_p = model.portfolio_moments(weights)
+        sketch = ForecastSketch(s0, mu_p, sigma_p, T, N)
+        for _, block in blocks:
+            sketch.add_paths(block)
+        return {"seed": seed, "paths": None, **sketch.summary()}
+
+    paths = np.empty((n, N + 1))
+    for lo, block in blocks:
+        paths[lo : lo + block.shape[0]] = block
+    return {
+        "seed": seed,
+        "paths": paths,
+        "terminal": summarize_terminal_metrics(paths),
+        "drawdown": summarize_drawdown_metrics(paths),
+        "path_metrics": summarize_path_metrics(paths),
+    }
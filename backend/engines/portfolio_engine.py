@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import numpy as np
 import pandas as pd
 
 
@@ -22,31 +23,83 @@ def portfolio_returns(asset_returns: pd.DataFrame, weights: dict[str, float]) ->
 
     - We normalize weights to sum to 1.0 
     - Missing return values are treated as 0.0 for that day for that asset.
+
+    Thin wrapper over portfolio_returns_array (one NaN->0 pass + one matrix-vector product).
     """
     if asset_returns.empty:
         return pd.Series(dtype="float64", name="portfolio_return")
 
-    # Normalize tickers and build a Series of weights
-    w = pd.Series({k.upper(): float(v) for k, v in weights.items()}, dtype="float64")
-
     # Keep only tickers we actually have return columns for
-    cols = [c for c in asset_returns.columns if c.upper() in set(w.index)]
-    if not cols:
+    tickers = {k.upper() for k in weights}
+    held = [i for i, c in enumerate(asset_returns.columns) if str(c).upper() in tickers]
+    if not held:
         raise ValueError("None of the portfolio tickers exist in the market data.")
 
-    w = w.reindex([c.upper() for c in cols])
+    values = asset_returns.to_numpy(dtype="float64", na_value=np.nan)
+    columns = asset_returns.columns
+    if len(held) < len(columns):
+        values, columns = values[:, held], columns[held]
+
+    port_r = portfolio_returns_array(values, portfolio_weight_vector(list(columns), weights))
+    return pd.Series(port_r, index=asset_returns.index, name="portfolio_return")
+
+
+# ================Compact (ndarray) pipeline======================
+# Same math as above on contiguous (dates x tickers) arrays; dates travel separately
+# (see engines.price_matrix.PriceMatrix). The array dtype is preserved, so float32
+# inputs stay float32 end to end.
+
+def prices_to_returns_array(prices: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Array form of prices_to_returns.
+
+    Returns (returns, rows): returns[k] is the return into price row rows[k].
+    Rows where every asset is NaN are dropped, as with dropna(how="all").
+    """
+    prices = np.asarray(prices)
+    n_rows, n_cols = prices.shape
+    if n_rows < 2:
+        return np.empty((0, n_cols), dtype=prices.dtype), np.empty(0, dtype=np.intp)
+
+    returns = np.empty((n_rows - 1, n_cols), dtype=prices.dtype)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        np.divide(prices[1:], prices[:-1], out=returns)
+    returns -= 1.0
+
+    keep = ~np.isnan(returns).all(axis=1)
+    rows = np.flatnonzero(keep) + 1
+    if not keep.all():
+        returns = returns[keep]
+    return returns, rows
+
+
+def portfolio_weight_vector(columns: list[str] | tuple[str, ...], weights: dict[str, float]) -> np.ndarray:
+    """
+    Normalized weight vector aligned to `columns` (case-insensitive match).
+
+    Columns without a weight get 0.0. Raises the same errors as portfolio_returns.
+    """
+    w_by_ticker = {k.upper(): float(v) for k, v in weights.items()}
+    w = np.array([w_by_ticker.get(str(c).upper(), 0.0) for c in columns], dtype="float64")
+
+    if not any(str(c).upper() in w_by_ticker for c in columns):
+        raise ValueError("None of the portfolio tickers exist in the market data.")
 
-    # Normalize to sum to 1
     total = float(w.sum())
     if total == 0:
         raise ValueError("Weights sum to 0.")
-    w = w / total
+    return w / total
+
 
-    # Apply weights and sum across columns
-    r = asset_returns[cols].copy().fillna(0.0)
-    # Align weights to the DataFrame columns
-    w_aligned = pd.Series([w[c.upper()] for c in cols], index=cols, dtype="float64")
+def portfolio_returns_array(asset_returns: np.ndarray, weights: np.ndarray) -> np.ndarray:
+    """
+    Array form of portfolio_returns: one NaN->0 pass and one matrix-vector product.
+
+    portfolio_return[t] = sum_i (w_i * r_i[t]);  `weights` must already be normalized.
+    """
+    asset_returns = np.asarray(asset_returns)
+    if asset_returns.size == 0:
+        return np.empty(asset_returns.shape[0], dtype=asset_returns.dtype)
 
-    port_r = (r * w_aligned).sum(axis=1)
-    port_r.name = "portfolio_return"
-    return port_r
\ No newline at end of file
+    r = np.nan_to_num(asset_returns, nan=0.0, posinf=np.inf, neginf=-np.inf)
+    return r @ np.asarray(weights, dtype=r.dtype)
@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+
+COMPACT_DTYPE = np.float32
+
+
+@dataclass(frozen=True)
+class PriceMatrix:
+    """
+    Compact price panel: contiguous (dates x tickers) ndarray plus a separate date index.
+
+    Used by the opt-in compact pipeline so prices/returns travel through the engines
+    as float32 arrays instead of float64 DataFrames.
+    """
+
+    values: np.ndarray  # shape (T, N), C-contiguous
+    dates: pd.DatetimeIndex  # length T
+    tickers: tuple[str, ...]  # length N
+
+    @classmethod
+    def from_frame(cls, prices: pd.DataFrame, dtype=COMPACT_DTYPE) -> "PriceMatrix":
+        values = np.ascontiguousarray(prices.to_numpy(dtype=dtype, na_value=np.nan))
+        return cls(values=values, dates=pd.DatetimeIndex(prices.index), tickers=tuple(str(c) for c in prices.columns))
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame(self.values, index=self.dates, columns=list(self.tickers))
+
+    def with_values(self, values: np.ndarray) -> "PriceMatrix":
+        return PriceMatrix(values=values, dates=self.dates, tickers=self.tickers)
+
+    @property
+    def empty(self) -> bool:
+        return self.values.size == 0
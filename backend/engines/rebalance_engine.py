@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+
+# Rebalancing policies:
+# - daily: reset to target weights every close (what portfolio_returns assumes)
+# - monthly / quarterly / annual: reset at the last trading day of each period
+# - threshold: reset when any asset drifts more than `threshold` from its target weight
+# - none: buy at target weights on day one and let them drift
+#
+# Between rebalances the asset growth is read off one global log-cumsum,
+#   G_t = exp(L_t - L_{s-1}),  L_t = Σ_{u<=t} log(1 + r_u)
+# so every segment is evaluated at once instead of compounding day by day.
+
+POLICIES = ("daily", "monthly", "quarterly", "annual", "threshold", "none")
+
+_PERIOD_FREQ = {"monthly": "M", "quarterly": "Q", "annual": "Y"}
+_THRESHOLD_CHUNK = 64  # rows scanned per step while looking for the next drift breach
+
+
+@dataclass(frozen=True)
+class RebalancePolicy:
+    """Rebalancing rule plus proportional transaction cost (in basis points of traded value)."""
+
+    kind: str = "daily"
+    threshold: float = 0.05
+    cost_bps: float = 0.0
+
+    @classmethod
+    def from_payload(cls, raw: dict[str, Any] | str | None) -> "RebalancePolicy | None":
+        """Parse {"type", "threshold"?, "cost_bps"?} (or a bare policy name); None if absent."""
+        if raw is None or raw == {}:
+            return None
+        if isinstance(raw, str):
+            raw = {"type": raw}
+        if not isinstance(raw, dict):
+            raise ValueError("rebalance must be an object like {\"type\": \"monthly\"}.")
+
+        kind = str(raw.get("type", "")).strip().lower()
+        if kind not in POLICIES:
+            raise ValueError(f"Unknown rebalance.type '{kind}'. Use one of: {', '.join(POLICIES)}.")
+
+        threshold = float(raw.get("threshold", 0.05))
+        if kind == "threshold" and not 0 < threshold < 1:
+            raise ValueError("rebalance.threshold must be between 0 and 1.")
+
+        cost_bps = float(raw.get("cost_bps", 0.0))
+        if cost_bps < 0:
+            raise ValueError("rebalance.cost_bps must be >= 0.")
+
+        return cls(kind=kind, threshold=threshold, cost_bps=cost_bps)
+
+    def to_dict(self) -> dict[str, Any]:
+        out: dict[str, Any] = {"type": self.kind, "cost_bps": self.cost_bps}
+        if self.kind == "threshold":
+            out["threshold"] = self.threshold
+        return out
+
+
+def calendar_rebalance_rows(dates: pd.DatetimeIndex, kind: str) -> np.ndarray:
+    """
+    Rows that close a calendar period (the last trading day of each month/quarter/year).
+
+    The final row is never a rebalance; "daily" is every row but the last, "none" is empty.
+    """
+    n = len(dates)
+    if kind == "daily":
+        return np.arange(max(n - 1, 0), dtype=np.intp)
+    if kind == "none" or n < 2:
+        return np.empty(0, dtype=np.intp)
+
+    periods = dates.to_period(_PERIOD_FREQ[kind]).asi8
+    return np.flatnonzero(periods[:-1] != periods[1:]).astype(np.intp)
+
+
+def threshold_rebalance_rows(log_growth: np.ndarray, weights: np.ndarray, threshold: float) -> np.ndarray:
+    """
+    Rows where drifted weights first leave the band |h_i - w_i| > threshold.
+
+    Loops over rebalance events (plus one step per _THRESHOLD_CHUNK rows without a
+    breach), never over individual days.
+    """
+    n = log_growth.shape[0]
+    rows: list[int] = []
+    start = 0
+    while start < n - 1:
+        base = log_growth[start - 1] if start > 0 else 0.0
+        hit = None
+        for lo in range(start, n - 1, _THRESHOLD_CHUNK):
+            hi = min(lo + _THRESHOLD_CHUNK, n - 1)
+            held = np.exp(log_growth[lo:hi] - base) * weights
+            drift = np.abs(held / held.sum(axis=1, keepdims=True) - weights).max(axis=1)
+            breach = np.flatnonzero(drift > threshold)
+            if breach.size:
+                hit = lo + int(breach[0])
+                break
+        if hit is None:
+            break
+        rows.append(hit)
+        start = hit + 1
+    return np.asarray(rows, dtype=np.intp)
+
+
+def rebalanced_returns(
+    asset_returns: np.ndarray,
+    dates: pd.DatetimeIndex,
+    weights: np.ndarray,
+    policy: RebalancePolicy,
+) -> tuple[np.ndarray, dict[str, Any]]:
+    """
+    Daily portfolio returns under a rebalancing policy.
+
+    asset_returns: T x N daily returns (NaN treated as 0.0, as in portfolio_returns)
+    weights:       length-N target weights (normalized)
+
+    For a segment starting at row s (the day after a rebalance) with value V_{s-1}:
+      V_t = V_{s-1} * Σ_i w_i * G_{t,i}
+    At a rebalance close e, trading back to target costs
+      cost = cost_bps / 1e4 * Σ_i |w_i - h_i|,  h = drifted weights at e
+    of the portfolio value. The first allocation is not charged.
+
+    Returns (returns, summary) with summary = {policy, rebalances, turnover, cost}.
+    """
+    r = np.nan_to_num(np.asarray(asset_returns, dtype="float64"), nan=0.0, posinf=np.inf, neginf=-np.inf)
+    w = np.asarray(weights, dtype="float64")
+    n = r.shape[0]
+    summary: dict[str, Any] = {**policy.to_dict(), "rebalances": 0, "turnover": 0.0, "cost": 0.0}
+    if n == 0:
+        return np.empty(0, dtype="float64"), summary
+
+    with np.errstate(divide="ignore"):
+        log_growth = np.cumsum(np.log1p(r), axis=0)
+
+    if policy.kind == "threshold":
+        ends = threshold_rebalance_rows(log_growth, w, policy.threshold)
+    else:
+        ends = calendar_rebalance_rows(dates, policy.kind)
+
+    # Segment id per row; each segment's growth is measured from the row before it starts
+    seg = np.zeros(n, dtype=np.intp)
+    seg[ends + 1] = 1
+    seg = np.cumsum(seg)
+    starts = np.concatenate(([0], ends + 1))
+    base = np.vstack((np.zeros((1, r.shape[1])), log_growth[starts[1:] - 1]))
+
+    held = np.exp(log_growth - base[seg]) * w  # value per asset, per unit at segment start
+    growth = held.sum(axis=1)
+
+    # Turnover and cost at each rebalance close
+    drifted = held[ends] / growth[ends, None]
+    turnover = np.abs(drifted - w).sum(axis=1)
+    keep = 1.0 - policy.cost_bps / 1e4 * turnover
+
+    # Value at each segment start = product of completed segment growths (after costs)
+    seg_mult = np.concatenate(([1.0], np.cumprod(growth[ends] * keep)))
+    value = seg_mult[seg] * growth
+    value[ends] *= keep
+
+    returns = np.empty(n, dtype="float64")
+    returns[0] = value[0] - 1.0
+    returns[1:] = value[1:] / value[:-1] - 1.0
+
+    summary.update(
+        rebalances=int(ends.size),
+        turnover=float(turnover.sum()),
+        cost=float((1.0 - keep).sum()),
+    )
+    return returns, summary
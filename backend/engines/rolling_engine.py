@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import math
+
+import numpy as np
+
+
+# Rolling metrics over a daily return series, all O(n) per window length:
+# - mean / std from prefix sums of (r - m) and (r - m)^2 (m = series mean, to avoid cancellation)
+# - trailing return and drawdown from the window peak from log-equity L_t = Σ_{u<=t} log(1 + r_u)
+# - the trailing peak of L from a van Herk/Gil-Werman sliding max
+#
+# Prefix sums and log-equity are built once and shared by every window length.
+
+ROLLING_FIELDS = ("volatility", "sharpe_ratio", "return", "drawdown_from_window_peak")
+
+
+def sliding_max(x: np.ndarray, window: int) -> np.ndarray:
+    """
+    out[k] = max(x[k : k + window]) for k = 0 .. n - window, in O(n).
+
+    van Herk/Gil-Werman: split x into blocks of `window`; every window spans at most
+    two blocks, so its max is max(suffix max of the first block at k, prefix max of
+    the next block at k + window - 1). Both are one vectorized accumulate, which
+    replaces the per-element monotonic deque.
+    """
+    x = np.asarray(x, dtype="float64")
+    n = x.size
+    if window < 1 or window > n:
+        return np.empty(0, dtype="float64")
+
+    pad = (-n) % window
+    blocks = np.concatenate((x, np.full(pad, -np.inf))).reshape(-1, window)
+    prefix = np.maximum.accumulate(blocks, axis=1).ravel()
+    suffix = np.maximum.accumulate(blocks[:, ::-1], axis=1)[:, ::-1].ravel()
+    return np.maximum(suffix[: n - window + 1], prefix[window - 1 : n])
+
+
+def rolling_metrics(
+    returns: np.ndarray,
+    windows: list[int] | tuple[int, ...],
+    risk_free_rate_annual: float = 0.0,
+    periods_per_year: int = 252,
+) -> dict[int, dict[str, np.ndarray]]:
+    """
+    Trailing-window series for each window length w (window = the last w returns).
+
+    For the window ending at row t (t >= w - 1):
+      volatility   = std(r, ddof=1) * sqrt(252)
+      sharpe_ratio = (mean(r) - rf) / std(r) * sqrt(252)   (0.0 when std is 0)
+      return       = V_t / V_{t-w} - 1                     (total, not annualized)
+      drawdown_from_window_peak = V_t / max(V over the window) - 1
+
+    drawdown_from_window_peak is where the window ends relative to its highest value,
+    not the worst peak-to-trough drawdown inside the window (which can be deeper when
+    the curve has partly recovered by t).
+
+    Returns {w: {field: array of length n - w + 1}}; row t of the input maps to
+    index t - (w - 1). Windows longer than the series give empty arrays.
+    """
+    r = np.nan_to_num(np.asarray(returns, dtype="float64"), nan=0.0)
+    n = r.size
+
+    shift = float(r.mean()) if n else 0.0
+    d = r - shift
+    s1 = np.concatenate(([0.0], np.cumsum(d)))
+    s2 = np.concatenate(([0.0], np.cumsum(d * d)))
+    with np.errstate(divide="ignore"):
+        log_eq = np.concatenate(([0.0], np.cumsum(np.log1p(r))))  # log_eq[t + 1] = L_t
+
+    rf_daily = risk_free_rate_annual / periods_per_year
+    out: dict[int, dict[str, np.ndarray]] = {}
+    for w in windows:
+        if w < 2 or w > n:
+            out[w] = {field: np.empty(0, dtype="float64") for field in ROLLING_FIELDS}
+            continue
+
+        w1 = s1[w:] - s1[:-w]
+        w2 = s2[w:] - s2[:-w]
+        mean = shift + w1 / w
+        std = np.sqrt(np.maximum((w2 - w1 * w1 / w) / (w - 1), 0.0))
+
+        excess = mean - rf_daily
+        with np.errstate(divide="ignore", invalid="ignore"):
+            sharpe = excess / std * math.sqrt(periods_per_year)
+        flat = std <= 1e-12 * np.maximum(np.abs(excess), 1e-300)
+
+        with np.errstate(invalid="ignore"):
+            trailing = np.expm1(log_eq[w:] - log_eq[:-w])
+            drawdown = np.expm1(log_eq[w:] - sliding_max(log_eq[1:], w))
+
+        out[w] = {
+            "volatility": std * math.sqrt(periods_per_year),
+            "sharpe_ratio": np.where(flat, 0.0, sharpe),
+            "return": trailing,
+            "drawdown_from_window_peak": drawdown,
+        }
+    return out
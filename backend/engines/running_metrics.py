@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+
+@dataclass
+class RunningMetrics:
+    """
+    Sufficient statistics of a daily return series and its equity curve, so the
+    analysis metrics can be extended with new days in O(new days).
+
+    - count, mean, m2: Welford/Chan moments of the returns   -> volatility, Sharpe
+    - start_value/start_date, last_value/last_date           -> annualized return
+    - peak, worst_drawdown: running max of the curve and min(V / peak - 1) -> max drawdown
+
+    metrics() matches the analytics_engine functions on the full series.
+    """
+
+    count: int = 0
+    mean: float = 0.0
+    m2: float = 0.0
+    start_value: float = 0.0
+    start_date: pd.Timestamp | None = None
+    last_value: float = 0.0
+    last_date: pd.Timestamp | None = None
+    peak: float = 0.0
+    worst_drawdown: float = 0.0
+
+    @classmethod
+    def from_returns(cls, returns: pd.Series, starting_cash: float) -> "RunningMetrics":
+        running = cls(last_value=float(starting_cash))
+        running.update(returns.to_numpy(dtype="float64"), pd.DatetimeIndex(returns.index))
+        return running
+
+    def update(self, returns: np.ndarray, dates: pd.DatetimeIndex | None = None) -> np.ndarray:
+        """
+        Fold in new daily returns (in date order) and return their equity curve values.
+
+        Moments merge as in Chan et al.: for a batch with (k, mean_b, M2_b),
+          delta = mean_b - mean,  n' = n + k
+          mean' = mean + delta * k / n'
+          M2'   = M2 + M2_b + delta^2 * n * k / n'
+
+        Without `dates` the annualized return is not tracked (metrics() reports 0.0).
+        """
+        r = np.asarray(returns, dtype="float64")
+        if r.size == 0:
+            return np.empty(0, dtype="float64")
+
+        k = r.size
+        first = self.count == 0
+        batch_mean = float(r.mean())
+        batch_m2 = float(np.dot(r - batch_mean, r - batch_mean))
+        n = self.count + k
+        delta = batch_mean - self.mean
+        self.mean += delta * k / n
+        self.m2 += batch_m2 + delta * delta * self.count * k / n
+        self.count = n
+
+        values = np.cumprod(1.0 + r)
+        values *= self.last_value
+        if first:
+            self.start_value = float(values[0])
+            self.peak = float(values[0])
+
+        running_peak = np.maximum.accumulate(np.maximum(values, self.peak))
+        self.worst_drawdown = min(self.worst_drawdown, float((values / running_peak).min()) - 1.0)
+        self.peak = float(running_peak[-1])
+        self.last_value = float(values[-1])
+        if dates is not None:
+            if first:
+                self.start_date = dates[0]
+            self.last_date = dates[-1]
+        return values
+
+    def metrics(self, risk_free_rate_annual: float = 0.0, periods_per_year: int = 252) -> dict[str, float]:
+        if self.count == 0:
+            return {"annualized_return": 0.0, "annualized_volatility": 0.0, "max_drawdown": 0.0, "sharpe_ratio": 0.0}
+
+        std = math.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else float("nan")
+
+        excess = self.mean - risk_free_rate_annual / periods_per_year
+        if not math.isfinite(std) or std <= 1e-12 * max(abs(excess), 1e-300):
+            sharpe = 0.0
+        else:
+            sharpe = excess / std * (periods_per_year ** 0.5)
+
+        ann = 0.0
+        days = (self.last_date - self.start_date).days if self.start_date is not None else 0
+        if self.start_value > 0 and days > 0:
+            ann = (self.last_value / self.start_value) ** (1.0 / (days / 365.25)) - 1.0
+
+        return {
+            "annualized_return": ann,
+            "annualized_volatility": std * math.sqrt(periods_per_year),
+            "max_drawdown": self.worst_drawdown,
+            "sharpe_ratio": float(sharpe),
+        }
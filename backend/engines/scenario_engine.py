@@ -1,7 +1,10 @@
 from __future__ import annotations
 
+import numpy as np
 import pandas as pd
 
+from engines.price_matrix import PriceMatrix
+
 
 # Stress scenarios defined here:
 # - apply_price_shock: simple multiplicative shock to all prices on/after shock date with NO rebound
@@ -159,4 +162,104 @@ def apply_regime_shift(
     # Insert into shocked dataframe
     shocked.update(shocked_prices)
 
-    return shocked
\ No newline at end of file
+    return shocked
+
+
+# ================Compact (PriceMatrix) variants======================
+# Same scenarios on a PriceMatrix. Each makes one copy of the value array (in its own
+# dtype) and edits it in place, instead of going through DataFrame copies/updates.
+
+_REGIME_BLOCK_COLS = 256
+
+
+def _block_returns(prices: np.ndarray, cols: slice) -> np.ndarray:
+    block = prices[:, cols].astype("float64")
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return block[1:] / block[:-1] - 1.0
+
+
+def apply_price_shock_matrix(prices: PriceMatrix, shock_date: str, shock_pct: float) -> PriceMatrix:
+    """PriceMatrix version of apply_price_shock."""
+    shocked = prices.values.copy()
+    if shocked.size == 0:
+        return prices.with_values(shocked)
+
+    start_pos = prices.dates.searchsorted(pd.to_datetime(shock_date, errors="raise"))
+    shocked[start_pos:] *= shocked.dtype.type(1.0 + float(shock_pct))
+    return prices.with_values(shocked)
+
+
+def apply_shock_with_linear_rebound_matrix(
+    prices: PriceMatrix,
+    shock_date: str,
+    shock_pct: float,
+    rebound_days: int,
+) -> PriceMatrix:
+    """PriceMatrix version of apply_shock_with_linear_rebound."""
+    shocked = prices.values.copy()
+    if shocked.size == 0:
+        return prices.with_values(shocked)
+
+    if rebound_days < 1:
+        raise ValueError("rebound_days must be >= 1")
+
+    n = len(prices.dates)
+    start_pos = prices.dates.searchsorted(pd.to_datetime(shock_date, errors="raise"))
+    if start_pos >= n:
+        return prices.with_values(shocked)
+
+    end_pos = min(start_pos + rebound_days, n - 1)
+    m0 = 1.0 + float(shock_pct)
+    steps = end_pos - start_pos
+    if steps == 0:
+        multipliers = np.array([m0])
+    else:
+        multipliers = m0 + (1.0 - m0) * (np.arange(steps + 1) / steps)
+
+    shocked[start_pos : end_pos + 1] *= multipliers.astype(shocked.dtype)[:, None]
+    return prices.with_values(shocked)
+
+
+def apply_regime_shift_matrix(
+    prices: PriceMatrix,
+    shock_date: str,
+    vol_mult: float,
+    drift_shift: float,
+) -> PriceMatrix:
+    """
+    PriceMatrix version of apply_regime_shift.
+
+    As in the DataFrame version, days with a missing return for any asset are left
+    untouched and skipped when compounding.
+    """
+    shocked = prices.values.copy()
+    if shocked.size == 0:
+        return prices.with_values(shocked)
+
+    n = len(prices.dates)
+    start_pos = prices.dates.searchsorted(pd.to_datetime(shock_date, errors="raise"))
+    if start_pos >= n:
+        return prices.with_values(shocked)
+
+    # Returns into rows first..n-1 (row 0 has no return). The return math runs in
+    # float64 over blocks of columns, so temporaries stay small for wide universes.
+    first = max(start_pos, 1)
+    base = shocked[first - 1 :]
+    blocks = [slice(c, c + _REGIME_BLOCK_COLS) for c in range(0, shocked.shape[1], _REGIME_BLOCK_COLS)]
+
+    valid = np.ones(n - first, dtype=bool)
+    for cols in blocks:
+        valid &= ~np.isnan(_block_returns(base, cols)).any(axis=1)
+    if not valid.any():
+        return prices.with_values(shocked)
+
+    rows = first + np.flatnonzero(valid)
+    anchor_row = max(start_pos - 1, 0)
+    for cols in blocks:
+        post_rets = _block_returns(base, cols)[valid]
+        mu = post_rets.mean(axis=0)
+        post_rets = mu + float(vol_mult) * (post_rets - mu) + float(drift_shift)
+        path = np.cumprod(1.0 + post_rets, axis=0) * shocked[anchor_row, cols]
+        # Like DataFrame.update: NaNs in the rebuilt path (e.g. a missing anchor) keep the original price
+        shocked[rows, cols] = np.where(np.isnan(path), shocked[rows, cols], path)
+    return prices.with_values(shocked)
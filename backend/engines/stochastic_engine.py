@@ -1,6 +1,10 @@
 # For stochastic forecasting
+import math
+
 import numpy as np
 
+from engines.drawdown_engine import underwater_durations
+
 def simulate_gbm_path(s0, mu, sigma, T, N):
     '''
         Return path
@@ -15,15 +19,46 @@ def simulate_gbm_path(s0, mu, sigma, T, N):
 
     return path
 
-def simulate_many_paths(s0, mu, sigma, T, N, n):
+def simulate_many_paths_scalar(s0, mu, sigma, T, N, n):
     '''
-        Return list of paths
+        Return list of paths, one simulate_gbm_path call per path (reference version)
     '''
     paths = []
     for _ in range(n):
         paths.append(simulate_gbm_path(s0, mu, sigma, T, N))
     return np.array(paths)
 
+# Paths per independent RNG substream. Fixed (not derived from worker counts), so a
+# seed gives the same paths however the work is later split.
+PATHS_PER_STREAM = 1024
+
+# Upper bound for generated seeds: JSON numbers stay exact in JavaScript below 2^53
+_MAX_SEED = 2**53
+
+def simulate_many_paths(s0, mu, sigma, T, N, n, rng=None):
+    '''
+        Return (n, N + 1) array of paths, all drawn at once.
+
+        Same model as simulate_gbm_path: the whole (n, N) normal block is drawn in
+        one call, scaled to log increments (mu - sigma^2/2) dt + sigma sqrt(dt) z,
+        cumulatively summed along time and exponentiated once. Column 0 is s0.
+
+        rng: a numpy Generator; None draws from the global np.random state.
+    '''
+    dt = T / N
+    paths = np.empty((n, N + 1))
+    paths[:, 0] = 0.0
+    if rng is None:
+        paths[:, 1:] = np.random.normal(0, 1, size=(n, N))
+    else:
+        paths[:, 1:] = rng.standard_normal((n, N))
+    paths[:, 1:] *= sigma * np.sqrt(dt)
+    paths[:, 1:] += (mu - 0.5 * sigma**2) * dt
+    np.cumsum(paths, axis=1, out=paths)
+    np.exp(paths, out=paths)
+    paths *= s0
+    return paths
+
 def summarize_terminal_metrics(paths):
     """
     Compute terminal-value summary metrics from simulated paths.
@@ -51,6 +86,9 @@ def summarize_terminal_metrics(paths):
 def summarize_drawdown_metrics(paths):
     """
     Compute drawdown-based risk metrics from simulated paths.
+
+    Durations are in steps: per path, the longest run under its running peak and
+    the share of steps spent under water (see drawdown_engine.underwater_durations).
     """
     paths = np.asarray(paths)
 
@@ -61,10 +99,16 @@ def summarize_drawdown_metrics(paths):
     median_max_drawdown = np.median(max_drawdowns)
     prob_drawdown_gt_20 = np.mean(max_drawdowns <= -0.20)
 
+    max_durations, time_under_water = underwater_durations(paths)
+
     return {
         "max_drawdowns": max_drawdowns,
         "median_max_drawdown": float(median_max_drawdown),
         "prob_drawdown_gt_20": float(prob_drawdown_gt_20),
+        "max_durations": max_durations,
+        "median_max_duration": float(np.median(max_durations)),
+        "p90_max_duration": float(np.percentile(max_durations, 90)),
+        "mean_time_under_water": float(np.mean(time_under_water)),
     }
 
 
@@ -89,17 +133,59 @@ def summarize_path_metrics(paths):
     }
 
 
-def run_stochastic_forecast(s0, mu, sigma, T, N, n):
+def resolve_seed(seed=None):
+    '''
+        Validate a request seed, or draw a fresh one (from OS entropy) when it's None.
+    '''
+    if seed is None:
+        return int(np.random.SeedSequence().generate_state(1, np.uint64)[0] % _MAX_SEED)
+    seed = int(seed)
+    if seed < 0:
+        raise ValueError("seed must be a non-negative integer.")
+    return seed
+
+def stream_rng(seed, i):
+    '''
+        Generator of substream i: the i-th child of SeedSequence(seed).spawn(...),
+        built alone (spawn_key=(i,)) so only the stream being simulated exists.
+    '''
+    return np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(i,)))
+
+def path_streams(seed, n):
+    '''
+        Independent Generators for the n paths, one substream per PATHS_PER_STREAM
+        block in path order; yielded lazily, one at a time.
+    '''
+    for i in range(math.ceil(n / PATHS_PER_STREAM)):
+        yield stream_rng(seed, i)
+
+def simulate_seeded_paths(s0, mu, sigma, T, N, n, seed):
+    '''
+        Return (n, N + 1) paths from the seed's substreams; identical for identical inputs.
+    '''
+    paths = np.empty((n, N + 1))
+    for i, rng in enumerate(path_streams(seed, n)):
+        lo = i * PATHS_PER_STREAM
+        hi = min(lo + PATHS_PER_STREAM, n)
+        paths[lo:hi] = simulate_many_paths(s0, mu, sigma, T, N, hi - lo, rng=rng)
+    return paths
+
+def run_stochastic_forecast(s0, mu, sigma, T, N, n, seed=None):
     '''
         Single entrypoint for stochastic engine
+
+        Paths come from per-request Generators (never the global np.random state);
+        seed=None picks a fresh seed. The seed used is returned as "seed".
     '''
-    paths = simulate_many_paths(s0, mu, sigma, T, N, n)
+    seed = resolve_seed(seed)
+    paths = simulate_seeded_paths(s0, mu, sigma, T, N, n, seed)
 
     terminal = summarize_terminal_metrics(paths)
     drawdown = summarize_drawdown_metrics(paths)
     path_metrics = summarize_path_metrics(paths)
 
     return {
+        "seed": seed,
         "paths": paths,
         "terminal": terminal,
         "drawdown": drawdown,
@@ -0,0 +1,289 @@
+from __future__ import annotations
+
+import math
+from concurrent.futures import Executor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import get_context
+from threading import Lock
+from typing import Any
+
+import numpy as np
+
+from engines.drawdown_engine import underwater_durations
+from engines.stochastic_engine import PATHS_PER_STREAM, resolve_seed, simulate_many_paths, stream_rng
+
+
+# Streaming Monte Carlo: paths are simulated one seed substream (PATHS_PER_STREAM paths)
+# at a time and folded into a ForecastSketch, so peak memory is set by the chunk, not by
+# the number of simulations. Because the chunks are the same substreams the in-memory
+# engine uses, a seed produces the same paths in both modes; only the quantiles differ,
+# by at most the sketch resolution documented below.
+#
+# Sketch resolution (quantile error, on top of Monte Carlo sampling error):
+# - price bands / terminal quantiles: one bin of a per-day grid in log(S / s0) spanning
+#   the GBM mean ± GRID_SIGMAS standard deviations, i.e. a relative error of at most
+#   exp(2 * GRID_SIGMAS * sigma * sqrt(t) / PRICE_BINS) - 1  (~0.35% at sigma=20%, 5 years;
+#   linear interpolation inside the bin is typically far tighter)
+# - median max drawdown: one bin of DRAWDOWN_BINS over [-1, 0] (2.4e-4 absolute)
+# - terminal mean, probability of loss, P(drawdown <= -20%), durations: exact
+
+PRICE_BINS = 2048
+GRID_SIGMAS = 8.0
+DRAWDOWN_BINS = 4096
+
+_PATH_PERCENTILES = {"p10_path": 10, "p25_path": 25, "p50_path": 50, "p75_path": 75, "p90_path": 90}
+
+
+class ForecastSketch:
+    """
+    Mergeable summary of simulated GBM paths (all counts; merge = add).
+
+    - counts:     (N + 1) x PRICE_BINS histogram of log(S_t / s0) per day on a fixed grid
+    - dd_counts:  histogram of per-path max drawdown on [-1, 0]
+    - dur_counts: exact histogram of per-path longest time under water (steps)
+    - terminal_sum, n_loss, n_dd_gt_20, under_sum: running sums for the exact metrics
+
+    The grid depends only on (s0, mu, sigma, T, N), so sketches built from disjoint
+    sets of paths (other chunks, other processes) merge exactly.
+    """
+
+    def __init__(self, s0: float, mu: float, sigma: float, T: float, N: int):
+        self.s0, self.N = float(s0), int(N)
+        t = np.arange(N + 1) * (T / N)
+        self.center = (mu - 0.5 * sigma**2) * t
+        half = np.maximum(GRID_SIGMAS * sigma * np.sqrt(t), 1e-9)
+        self.lo = self.center - half
+        self.width = 2.0 * half / PRICE_BINS
+
+        self.n = 0
+        self.counts = np.zeros((N + 1, PRICE_BINS), dtype=np.int64)
+        self.dd_counts = np.zeros(DRAWDOWN_BINS, dtype=np.int64)
+        self.dur_counts = np.zeros(N + 1, dtype=np.int64)
+        self.terminal_sum = 0.0
+        self.n_loss = 0
+        self.n_dd_gt_20 = 0
+        self.under_sum = 0.0
+
+    # -----------------
+    # building
+    # -----------------
+    def add_paths(self, paths: np.ndarray) -> None:
+        """Fold an (n, N + 1) block of paths into the sketch."""
+        paths = np.asarray(paths, dtype="float64")
+        n_paths, n_cols = paths.shape
+
+        bins = np.log(paths / self.s0)
+        bins -= self.lo
+        bins /= self.width
+        idx = np.clip(bins, 0, PRICE_BINS - 1).astype(np.intp)
+        idx += np.arange(n_cols) * PRICE_BINS
+        self.counts += np.bincount(idx.ravel(), minlength=n_cols * PRICE_BINS).reshape(n_cols, PRICE_BINS)
+
+        terminal = paths[:, -1]
+        self.terminal_sum += float(terminal.sum())
+        self.n_loss += int((terminal < self.s0).sum())
+
+        max_dd = (paths / np.maximum.accumulate(paths, axis=1)).min(axis=1) - 1.0
+        self.n_dd_gt_20 += int((max_dd <= -0.20).sum())
+        dd_idx = np.clip(((max_dd + 1.0) * DRAWDOWN_BINS).astype(np.intp), 0, DRAWDOWN_BINS - 1)
+        self.dd_counts += np.bincount(dd_idx, minlength=DRAWDOWN_BINS)
+
+        longest, fraction = underwater_durations(paths)
+        self.dur_counts += np.bincount(longest.astype(np.intp), minlength=self.N + 1)
+        self.under_sum += float(fraction.sum())
+
+        self.n += n_paths
+
+    def merge(self, other: "ForecastSketch") -> "ForecastSketch":
+        """Add another sketch on the same grid into this one (returns self)."""
+        if other.counts.shape != self.counts.shape or not np.array_equal(other.lo, self.lo):
+            raise ValueError("Cannot merge forecast sketches built on different grids.")
+        self.counts += other.counts
+        self.dd_counts += other.dd_counts
+        self.dur_counts += other.dur_counts
+        self.terminal_sum += other.terminal_sum
+        self.n_loss += other.n_loss
+        self.n_dd_gt_20 += other.n_dd_gt_20
+        self.under_sum += other.under_sum
+        self.n += other.n
+        return self
+
+    # -----------------
+    # queries
+    # -----------------
+    def price_quantiles(self, q: float) -> np.ndarray:
+        """Per-day q-quantile (0..1) of S_t, interpolated linearly inside the grid bin."""
+        log_q = _histogram_quantile(self.counts, q) * self.width + self.lo
+        out = self.s0 * np.exp(log_q)
+        out[0] = self.s0  # every path starts at s0
+        return out
+
+    def summary(self) -> dict[str, Any]:
+        """Same keys as stochastic_engine.run_stochastic_forecast (minus per-path arrays)."""
+        if self.n == 0:
+            raise ValueError("No simulated paths in the sketch.")
+
+        terminal_row = self.counts[-1:]
+        terminal_q = {
+            p: float(self.s0 * math.exp(_histogram_quantile(terminal_row, p / 100)[0] * self.width[-1] + self.lo[-1]))
+            for p in (10, 50, 90)
+        }
+        dd_median = _histogram_quantile(self.dd_counts[None, :], 0.5)[0] / DRAWDOWN_BINS - 1.0
+        durations = np.arange(self.N + 1, dtype="float64")
+
+        return {
+            "terminal": {
+                "mean_terminal_value": self.terminal_sum / self.n,
+                "median_terminal_value": terminal_q[50],
+                "bear_case": terminal_q[10],
+                "bull_case": terminal_q[90],
+                "probability_of_loss": self.n_loss / self.n,
+            },
+            "drawdown": {
+                "median_max_drawdown": float(dd_median),
+                "prob_drawdown_gt_20": self.n_dd_gt_20 / self.n,
+                "median_max_duration": _percentile_from_counts(durations, self.dur_counts, 50),
+                "p90_max_duration": _percentile_from_counts(durations, self.dur_counts, 90),
+                "mean_time_under_water": self.under_sum / self.n,
+            },
+            "path_metrics": {name: self.price_quantiles(p / 100) for name, p in _PATH_PERCENTILES.items()},
+        }
+
+
+def _histogram_quantile(counts: np.ndarray, q: float) -> np.ndarray:
+    """
+    q-quantile per row of a rows x bins count matrix, in (fractional) bin units:
+    the bin where the cumulative count crosses q * total, plus the linear share of it.
+    """
+    cum = np.cumsum(counts, axis=1)
+    target = q * cum[:, -1]
+    b = np.minimum((cum <= target[:, None]).sum(axis=1), counts.shape[1] - 1)
+    rows = np.arange(counts.shape[0])
+    before = np.where(b > 0, cum[rows, b - 1], 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        frac = np.where(counts[rows, b] > 0, (target - before) / counts[rows, b], 0.5)
+    return b + np.clip(frac, 0.0, 1.0)
+
+
+def _percentile_from_counts(values: np.ndarray, counts: np.ndarray, p: float) -> float:
+    """np.percentile (linear) of the multiset {values[i] repeated counts[i] times}, exactly."""
+    cum = np.cumsum(counts)
+    pos = p / 100 * (cum[-1] - 1)
+    lo, hi = math.floor(pos), math.ceil(pos)
+    v_lo = values[np.searchsorted(cum, lo, side="right")]
+    v_hi = values[np.searchsorted(cum, hi, side="right")]
+    return float(v_lo + (v_hi - v_lo) * (pos - lo))
+
+
+def simulate_into_sketch(
+    s0: float,
+    mu: float,
+    sigma: float,
+    T: float,
+    N: int,
+    n: int,
+    seed: int,
+    streams: range | None = None,
+) -> ForecastSketch:
+    """
+    Simulate the seed's substreams (all, or the given stream indices) chunk by chunk
+    into a fresh sketch; each substream's Generator is created when its chunk runs.
+    Peak memory is one chunk of PATHS_PER_STREAM x (N + 1) paths.
+    """
+    sketch = ForecastSketch(s0, mu, sigma, T, N)
+    for i in streams if streams is not None else range(math.ceil(n / PATHS_PER_STREAM)):
+        size = min(PATHS_PER_STREAM, n - i * PATHS_PER_STREAM)
+        sketch.add_paths(simulate_many_paths(s0, mu, sigma, T, N, size, rng=stream_rng(seed, i)))
+    return sketch
+
+
+# -----------------
+# process-pool execution
+# -----------------
+# Seed substreams are independent, so a run shards cleanly: each worker process simulates
+# a contiguous range of stream indices into its own sketch and ships back only the counts
+# (~(N + 1) x PRICE_BINS int64, i.e. ~4 MB for a one-year horizon), never path arrays.
+# The merged counts are identical to the serial sketch for any worker count (the running
+# float sums agree up to summation order).
+
+_pool: ProcessPoolExecutor | None = None
+_pool_lock = Lock()
+
+
+def _get_pool(workers: int) -> ProcessPoolExecutor:
+    """
+    Shared worker pool, created once with `workers` processes on first use and only
+    rebuilt after it breaks (requests that already hold it keep submitting safely).
+    Runs asking for more workers than it has simply queue their extra shards.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn: forking a threaded server process is not safe
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=get_context("spawn"))
+        return _pool
+
+
+def _discard_pool(broken: Executor) -> None:
+    """
+    Drop the shared pool after a worker died (BrokenProcessPool is permanent); the next
+    parallel run creates a fresh one. Concurrent runs that saw the same broken pool
+    discard it only once.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is broken:
+            _pool = None
+    broken.shutdown(wait=False, cancel_futures=True)
+
+
+def shard_streams(n: int, workers: int) -> list[range]:
+    """Split the ceil(n / PATHS_PER_STREAM) stream indices into <= workers contiguous, balanced ranges."""
+    n_streams = math.ceil(n / PATHS_PER_STREAM)
+    shards = max(1, min(int(workers), n_streams))
+    bounds = [n_streams * i // shards for i in range(shards + 1)]
+    return [range(bounds[i], bounds[i + 1]) for i in range(shards)]
+
+
+def simulate_into_sketch_parallel(
+    s0: float,
+    mu: float,
+    sigma: float,
+    T: float,
+    N: int,
+    n: int,
+    seed: int,
+    workers: int,
+    pool: Executor | None = None,
+) -> ForecastSketch:
+    """
+    simulate_into_sketch sharded into up to `workers` tasks on `pool` (default: the
+    shared pool, sized by the first caller's `workers`); one shard runs in-process.
+    If a worker process dies, the pool is replaced and this run finishes in-process
+    (same seeded streams, so the same sketch).
+    """
+    shards = shard_streams(n, workers)
+    if len(shards) == 1:
+        return simulate_into_sketch(s0, mu, sigma, T, N, n, seed)
+
+    pool = pool if pool is not None else _get_pool(workers)
+    try:
+        futures = [pool.submit(simulate_into_sketch, s0, mu, sigma, T, N, n, seed, shard) for shard in shards]
+        sketch = futures[0].result()
+        for future in futures[1:]:
+            sketch.merge(future.result())
+    except BrokenProcessPool:
+        _discard_pool(pool)
+        return simulate_into_sketch(s0, mu, sigma, T, N, n, seed)
+    return sketch
+
+
+def run_streaming_forecast(s0, mu, sigma, T, N, n, seed=None, workers=1) -> dict[str, Any]:
+    """
+    Streaming counterpart of run_stochastic_forecast: the same seeded paths, summarized
+    through a ForecastSketch instead of materializing all of them. With workers > 1 the
+    substreams are simulated in a process pool and the partial sketches merged.
+    """
+    seed = resolve_seed(seed)
+    sketch = simulate_into_sketch_parallel(s0, mu, sigma, T, N, n, seed, workers)
+    return {"seed": seed, "paths": None, **sketch.summary()}
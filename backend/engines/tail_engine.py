@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import math
+from statistics import NormalDist
+
+import numpy as np
+
+
+# Confidence levels reported by default (95% and 99% one-day VaR/CVaR)
+DEFAULT_TAIL_LEVELS = (0.95, 0.99)
+
+
+def _level_key(level: float) -> str:
+    """0.95 -> "95", 0.975 -> "97_5" (for names like var_95)."""
+    return f"{level * 100:g}".replace(".", "_")
+
+
+def tail_metrics_matrix(
+    returns: np.ndarray,
+    annualized_return: np.ndarray | None = None,
+    max_drawdown: np.ndarray | None = None,
+    levels: tuple[float, ...] = DEFAULT_TAIL_LEVELS,
+    risk_free_rate_annual: float = 0.0,
+    periods_per_year: int = 252,
+) -> dict[str, np.ndarray]:
+    """
+    Tail-risk metrics for K daily return series at once (columns of a T x K array;
+    a 1-D array is one series). NaN returns are treated as 0.0, and every metric is
+    finite: statistics undefined for so few points (std for n < 2, skewness for n < 3,
+    kurtosis for n < 4) are reported as 0.0.
+
+    Shared central moments m2, m3, m4 (one pass over the deviations):
+      skewness        = sqrt(n(n-1)) / (n-2) * m3 / m2^1.5          (as pandas .skew())
+      excess_kurtosis = ((n+1)(m4/m2^2 - 3) + 6) (n-1) / ((n-2)(n-3)) (as pandas .kurt())
+      parametric_var  = -(mean + z_{1-a} * std)
+      parametric_cvar = -(mean - std * phi(z_{1-a}) / (1-a))
+
+    One np.partition over all needed order statistics (k = ceil((1-a) n) - 1):
+      var_a  = -r_(k)                        historical one-day VaR (loss, positive)
+      cvar_a = -mean(r_(0..k))               expected loss in that tail
+
+    Plus Sortino = mean(r - rf) / sqrt(mean(min(r - rf, 0)^2)) * sqrt(252) and, when
+    annualized_return and max_drawdown are given, Calmar = annualized_return / |max_drawdown|.
+
+    Returns {name: length-K float64 array}.
+    """
+    r = np.nan_to_num(np.asarray(returns, dtype="float64"), nan=0.0)
+    if r.ndim == 1:
+        r = r[:, None]
+    n, k = r.shape
+    out: dict[str, np.ndarray] = {}
+    if n == 0:
+        for level in levels:
+            for prefix in ("var", "cvar", "parametric_var", "parametric_cvar"):
+                out[f"{prefix}_{_level_key(level)}"] = np.zeros(k)
+        for name in ("sortino_ratio", "calmar_ratio", "skewness", "excess_kurtosis"):
+            out[name] = np.zeros(k)
+        return out
+
+    # --- Shared moments ---
+    mean = r.mean(axis=0)
+    d = r - mean
+    d2 = d * d
+    m2 = d2.mean(axis=0)
+    m3 = (d2 * d).mean(axis=0)
+    m4 = (d2 * d2).mean(axis=0)
+    std = np.sqrt(m2 * n / (n - 1)) if n > 1 else np.zeros(k)
+
+    # Too few points (pandas gives NaN, which is not valid JSON) or a numerically
+    # constant series -> 0.0
+    flat = m2 <= 1e-14 * np.maximum(mean * mean, 1e-300)
+    skew = kurt = np.zeros(k)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if n > 2:
+            skew = np.where(flat, 0.0, math.sqrt(n * (n - 1)) / (n - 2) * m3 / m2 ** 1.5)
+        if n > 3:
+            kurt = np.where(flat, 0.0, ((n + 1) * (m4 / (m2 * m2) - 3.0) + 6.0) * (n - 1) / ((n - 2) * (n - 3)))
+    out["skewness"] = skew
+    out["excess_kurtosis"] = kurt
+
+    # --- Historical VaR / CVaR from one partial sort ---
+    # (1 - 0.95) * 1000 is 50.00000000000004 in floating point; don't let that round up
+    ranks = {level: max(math.ceil((1.0 - level) * n - 1e-9) - 1, 0) for level in levels}
+    part = np.partition(r, sorted(set(ranks.values())), axis=0)
+    for level, rank in ranks.items():
+        key = _level_key(level)
+        out[f"var_{key}"] = -part[rank]
+        out[f"cvar_{key}"] = -part[: rank + 1].mean(axis=0)
+
+        z = NormalDist().inv_cdf(1.0 - level)
+        out[f"parametric_var_{key}"] = -(mean + z * std)
+        out[f"parametric_cvar_{key}"] = -(mean - std * NormalDist().pdf(z) / (1.0 - level))
+
+    # --- Downside and drawdown-based ratios ---
+    excess = r - risk_free_rate_annual / periods_per_year
+    downside = np.sqrt((np.minimum(excess, 0.0) ** 2).mean(axis=0))
+    excess_mean = excess.mean(axis=0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sortino = excess_mean / downside * math.sqrt(periods_per_year)
+    out["sortino_ratio"] = np.where(downside > 0, sortino, 0.0)
+
+    calmar = np.zeros(k)
+    if annualized_return is not None and max_drawdown is not None:
+        ann = np.asarray(annualized_return, dtype="float64")
+        mdd = np.asarray(max_drawdown, dtype="float64")
+        with np.errstate(divide="ignore", invalid="ignore"):
+            calmar = np.where(mdd < 0, ann / np.abs(mdd), 0.0)
+    out["calmar_ratio"] = calmar
+
+    return out
@@ -0,0 +1,176 @@
+from __future__ import annotations
+
+from datetime import date, timedelta
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+
+# NYSE session calendar, generated from holiday rules (no external calendar package).
+# Sessions are plain weekdays minus full-day closures; early closes count as sessions.
+
+FIRST_YEAR = 1990
+LAST_YEAR = 2060
+
+# One-off full-day closures (national mourning, weather, 9/11)
+SPECIAL_CLOSURES = (
+    "1994-04-27",  # President Nixon funeral
+    "2001-09-11", "2001-09-12", "2001-09-13", "2001-09-14",
+    "2004-06-11",  # President Reagan funeral
+    "2007-01-02",  # President Ford funeral
+    "2012-10-29", "2012-10-30",  # Hurricane Sandy
+    "2018-12-05",  # President G.H.W. Bush funeral
+    "2025-01-09",  # President Carter funeral
+)
+
+
+def _easter(year: int) -> date:
+    """Gregorian Easter Sunday (anonymous Gregorian algorithm)."""
+    a = year % 19
+    b, c = divmod(year, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    wd = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * wd) // 451
+    month, day = divmod(h + wd - 7 * m + 114, 31)
+    return date(year, month, day + 1)
+
+
+def _nth_weekday(year: int, month: int, weekday: int, n: int) -> date:
+    """n-th (1-based) weekday of a month; n=-1 for the last one. weekday: Mon=0."""
+    if n > 0:
+        d = date(year, month, 1)
+        d += timedelta(days=(weekday - d.weekday()) % 7)
+        return d + timedelta(weeks=n - 1)
+    nxt = date(year + (month == 12), month % 12 + 1, 1)
+    d = nxt - timedelta(days=1)
+    return d - timedelta(days=(d.weekday() - weekday) % 7)
+
+
+def _observed(d: date) -> date:
+    """Saturday holidays move to Friday, Sunday holidays to Monday."""
+    if d.weekday() == 5:
+        return d - timedelta(days=1)
+    if d.weekday() == 6:
+        return d + timedelta(days=1)
+    return d
+
+
+def nyse_holidays(year: int) -> list[date]:
+    """Full-day NYSE holidays for a year."""
+    hols = []
+
+    # New Year's Day: Sunday -> Monday; Saturday is not made up on the prior Friday
+    ny = date(year, 1, 1)
+    if ny.weekday() == 6:
+        hols.append(ny + timedelta(days=1))
+    elif ny.weekday() < 5:
+        hols.append(ny)
+
+    if year >= 1998:
+        hols.append(_nth_weekday(year, 1, 0, 3))  # Martin Luther King Jr. Day
+    hols.append(_nth_weekday(year, 2, 0, 3))  # Washington's Birthday
+    hols.append(_easter(year) - timedelta(days=2))  # Good Friday
+    hols.append(_nth_weekday(year, 5, 0, -1))  # Memorial Day
+    if year >= 2022:
+        hols.append(_observed(date(year, 6, 19)))  # Juneteenth
+    hols.append(_observed(date(year, 7, 4)))  # Independence Day
+    hols.append(_nth_weekday(year, 9, 0, 1))  # Labor Day
+    hols.append(_nth_weekday(year, 11, 3, 4))  # Thanksgiving
+    hols.append(_observed(date(year, 12, 25)))  # Christmas
+
+    return hols
+
+
+def _to_day(x) -> np.datetime64:
+    return np.datetime64(pd.Timestamp(x).date(), "D")
+
+
+class TradingCalendar:
+    """
+    Sorted array of exchange sessions with O(log n) lookups (np.searchsorted).
+    """
+
+    def __init__(self, sessions: np.ndarray):
+        self._sessions = np.asarray(sessions, dtype="datetime64[D]")
+        self._first = self._sessions[0]
+        self._last = self._sessions[-1]
+
+    @property
+    def sessions(self) -> np.ndarray:
+        return self._sessions
+
+    def _check(self, d: np.datetime64) -> None:
+        if d < self._first or d > self._last:
+            raise ValueError(
+                f"Date {d} is outside the trading calendar ({self._first} to {self._last})."
+            )
+
+    def is_session(self, d) -> bool:
+        day = _to_day(d)
+        self._check(day)
+        pos = np.searchsorted(self._sessions, day)
+        return bool(pos < len(self._sessions) and self._sessions[pos] == day)
+
+    def next_session(self, d, inclusive: bool = True) -> pd.Timestamp:
+        """First session on/after `d` (strictly after if inclusive=False)."""
+        day = _to_day(d)
+        self._check(day)
+        pos = np.searchsorted(self._sessions, day, side="left" if inclusive else "right")
+        if pos >= len(self._sessions):
+            raise ValueError(f"No trading session after {day} in the trading calendar.")
+        return pd.Timestamp(self._sessions[pos])
+
+    def previous_session(self, d, inclusive: bool = True) -> pd.Timestamp:
+        """Last session on/before `d` (strictly before if inclusive=False)."""
+        day = _to_day(d)
+        self._check(day)
+        pos = np.searchsorted(self._sessions, day, side="right" if inclusive else "left") - 1
+        if pos < 0:
+            raise ValueError(f"No trading session before {day} in the trading calendar.")
+        return pd.Timestamp(self._sessions[pos])
+
+    def next_sessions(self, d, n: int) -> pd.DatetimeIndex:
+        """The `n` sessions strictly after `d` (vectorized slice)."""
+        if n <= 0:
+            return pd.DatetimeIndex([])
+        day = _to_day(d)
+        self._check(day)
+        pos = np.searchsorted(self._sessions, day, side="right")
+        if pos + n > len(self._sessions):
+            raise ValueError(f"Trading calendar ends at {self._last}; cannot generate {n} sessions after {day}.")
+        return pd.DatetimeIndex(self._sessions[pos : pos + n])
+
+    def sessions_in_range(self, start, end) -> pd.DatetimeIndex:
+        """Sessions in [start, end] (inclusive)."""
+        lo = np.searchsorted(self._sessions, _to_day(start), side="left")
+        hi = np.searchsorted(self._sessions, _to_day(end), side="right")
+        return pd.DatetimeIndex(self._sessions[lo:hi])
+
+
+def build_nyse_sessions(first_year: int = FIRST_YEAR, last_year: int = LAST_YEAR) -> np.ndarray:
+    days = np.arange(np.datetime64(f"{first_year}-01-01"), np.datetime64(f"{last_year + 1}-01-01"))
+    closed = [np.datetime64(h, "D") for y in range(first_year, last_year + 1) for h in nyse_holidays(y)]
+    closed += [np.datetime64(s, "D") for s in SPECIAL_CLOSURES]
+    return days[np.is_busday(days, holidays=closed)]
+
+
+@lru_cache(maxsize=1)
+def get_trading_calendar() -> TradingCalendar:
+    """Process-wide NYSE calendar, built once on first use."""
+    return TradingCalendar(build_nyse_sessions())
+
+
+def future_sessions(d, n: int) -> pd.DatetimeIndex:
+    """
+    The `n` exchange sessions strictly after `d`; business days (pd.bdate_range) where
+    that runs past the calendar's FIRST_YEAR..LAST_YEAR coverage.
+    """
+    try:
+        return get_trading_calendar().next_sessions(d, n)
+    except ValueError:
+        return pd.bdate_range(start=pd.Timestamp(d).normalize() + pd.Timedelta(days=1), periods=max(n, 0))
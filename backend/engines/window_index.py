@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import math
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+
+# Node of the drawdown segment tree over log-equity c_k = Σ_{u<=k} log(1 + r_u):
+#   (max c, min c, largest drop c_l - c_k with l <= k)
+_EMPTY = (-math.inf, math.inf, 0.0)
+
+
+def _merge(a: tuple[float, float, float], b: tuple[float, float, float]) -> tuple[float, float, float]:
+    """Combine a left node with the node immediately to its right."""
+    return max(a[0], b[0]), min(a[1], b[1]), max(a[2], b[2], a[0] - b[1])
+
+
+class WindowIndex:
+    """
+    Sub-window metrics over a stored daily return series without recomputing it.
+
+    Built once per analysis (O(n), vectorized):
+      - prefix sums of (r - m) and (r - m)^2 (m = series mean, to avoid cancellation)
+      - log-equity c_k = Σ log(1 + r_u) and a segment tree of (max c, min c, max drop)
+
+    Then, for rows [i, j]:
+      - mean/std from the prefix sums in O(1)            -> volatility, Sharpe
+      - growth V_j / V_i = exp(c_j - c_i) in O(1)        -> annualized return
+      - max drawdown = exp(-max drop over [i, j]) - 1, O(log n)
+
+    Results match the analytics_engine functions applied to the equity curve of
+    returns.iloc[i:j+1] (the window's curve starts after day i's return).
+    """
+
+    def __init__(self, returns: pd.Series):
+        r = returns.to_numpy(dtype="float64", na_value=np.nan)
+        r = np.nan_to_num(r, nan=0.0)
+        self.dates = pd.DatetimeIndex(returns.index)
+        self.n = r.size
+
+        self._shift = float(r.mean()) if r.size else 0.0
+        d = r - self._shift
+        self._s1 = np.concatenate(([0.0], np.cumsum(d)))
+        self._s2 = np.concatenate(([0.0], np.cumsum(d * d)))
+        with np.errstate(divide="ignore"):
+            self._log = np.cumsum(np.log1p(r))
+
+        self._build_tree()
+
+    # -----------------
+    # public API
+    # -----------------
+    def locate(self, start: str | None, end: str | None) -> tuple[int, int]:
+        """Rows [i, j] of the first date >= start and the last date <= end."""
+        if self.n == 0:
+            raise ValueError("The stored analysis has no returns.")
+        i = 0 if not start else int(self.dates.searchsorted(pd.Timestamp(start), side="left"))
+        j = self.n - 1 if not end else int(self.dates.searchsorted(pd.Timestamp(end), side="right")) - 1
+        if i > j or i >= self.n or j < 0:
+            raise ValueError("No stored returns fall inside the requested window.")
+        return i, j
+
+    def metrics(
+        self,
+        i: int,
+        j: int,
+        risk_free_rate_annual: float = 0.0,
+        periods_per_year: int = 252,
+    ) -> dict[str, float]:
+        """annualized_return, annualized_volatility, max_drawdown, sharpe_ratio over rows [i, j]."""
+        n = j - i + 1
+        s1 = self._s1[j + 1] - self._s1[i]
+        s2 = self._s2[j + 1] - self._s2[i]
+        mean = self._shift + s1 / n
+
+        if n > 1:
+            std = math.sqrt(max((s2 - s1 * s1 / n) / (n - 1), 0.0))
+            vol = std * math.sqrt(periods_per_year)
+        else:
+            std = vol = 0.0  # single observation: no dispersion to report (and NaN is not valid JSON)
+
+        excess = mean - risk_free_rate_annual / periods_per_year
+        if std <= 1e-12 * max(abs(excess), 1e-300):
+            sharpe = 0.0
+        else:
+            sharpe = excess / std * (periods_per_year ** 0.5)
+
+        days = (self.dates[j] - self.dates[i]).days
+        ann = 0.0
+        if days > 0:
+            growth = math.exp(self._log[j] - self._log[i])
+            ann = growth ** (1.0 / (days / 365.25)) - 1.0
+
+        drop = self._query(i, j)[2]
+        return {
+            "annualized_return": ann,
+            "annualized_volatility": vol,
+            "max_drawdown": math.exp(-drop) - 1.0,
+            "sharpe_ratio": float(sharpe),
+        }
+
+    def window(self, start: str | None, end: str | None) -> dict[str, Any]:
+        """Locate [start, end] and return {window, metrics} for it."""
+        i, j = self.locate(start, end)
+        return {
+            "window": {
+                "start": self.dates[i].strftime("%Y-%m-%d"),
+                "end": self.dates[j].strftime("%Y-%m-%d"),
+                "points": j - i + 1,
+            },
+            "metrics": self.metrics(i, j),
+        }
+
+    # -----------------
+    # internal helpers
+    # -----------------
+    def _build_tree(self) -> None:
+        size = 1
+        while size < max(self.n, 1):
+            size *= 2
+        self._size = size
+
+        mx = np.full(2 * size, -np.inf)
+        mn = np.full(2 * size, np.inf)
+        dr = np.zeros(2 * size)
+        mx[size : size + self.n] = self._log
+        mn[size : size + self.n] = self._log
+
+        # One vectorized merge per level, leaves upward
+        width = size
+        while width > 1:
+            width //= 2
+            left = np.arange(2 * width, 4 * width, 2)
+            right = left + 1
+            mx[width : 2 * width] = np.maximum(mx[left], mx[right])
+            mn[width : 2 * width] = np.minimum(mn[left], mn[right])
+            with np.errstate(invalid="ignore"):
+                cross = mx[left] - mn[right]
+            dr[width : 2 * width] = np.fmax(np.maximum(dr[left], dr[right]), cross)
+
+        self._mx, self._mn, self._dr = mx, mn, dr
+
+    def _node(self, k: int) -> tuple[float, float, float]:
+        return float(self._mx[k]), float(self._mn[k]), float(self._dr[k])
+
+    def _query(self, i: int, j: int) -> tuple[float, float, float]:
+        lo, hi = i + self._size, j + self._size + 1
+        acc = _EMPTY
+        right_nodes: list[int] = []
+        while lo < hi:
+            if lo & 1:
+                acc = _merge(acc, self._node(lo))
+                lo += 1
+            if hi & 1:
+                hi -= 1
+                right_nodes.append(hi)
+            lo //= 2
+            hi //= 2
+        for k in reversed(right_nodes):
+            acc = _merge(acc, self._node(k))
+        return acc
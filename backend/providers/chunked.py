@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+import pandas as pd
+
+from providers.price_cache import Downloader, PartialDownloadError
+
+
+class ChunkedDownloader:
+    """
+    Splits large ticker lists into bounded chunks fetched concurrently (same call signature).
+
+    - Requests up to `chunk_size` tickers go straight through.
+    - Larger requests are split and run on a pool of `max_concurrency` threads; the
+      chunk frames are assembled with one aligned pd.concat.
+    - A failing chunk no longer fails the whole request: if at least one chunk
+      succeeds, PartialDownloadError carries the assembled frame plus the tickers
+      that failed (a chunk's own PartialDownloadError contributes its partial frame).
+      If every chunk fails outright, the first error is raised.
+    """
+
+    def __init__(self, downloader: Downloader, chunk_size: int = 100, max_concurrency: int = 4):
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be >= 1")
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be >= 1")
+        self._downloader = downloader
+        self._chunk_size = int(chunk_size)
+        self._max_concurrency = int(max_concurrency)
+        self._pool = ThreadPoolExecutor(max_workers=self._max_concurrency, thread_name_prefix="chunk")
+
+        self._lock = threading.Lock()
+        self._stats = {"requests": 0, "chunked_requests": 0, "chunks": 0, "chunk_failures": 0}
+        self._recent: deque[dict[str, Any]] = deque(maxlen=20)
+
+    def __call__(self, tickers: list[str], start: str, end: str) -> pd.DataFrame:
+        with self._lock:
+            self._stats["requests"] += 1
+
+        if len(tickers) <= self._chunk_size:
+            return self._downloader(tickers, start, end)
+
+        chunks = [tickers[i : i + self._chunk_size] for i in range(0, len(tickers), self._chunk_size)]
+        t0 = time.perf_counter()
+        futures = [self._pool.submit(self._timed, chunk, start, end) for chunk in chunks]
+        outcomes = [f.result() for f in futures]  # _timed never raises
+        total_ms = (time.perf_counter() - t0) * 1000.0
+
+        frames: list[pd.DataFrame] = []
+        errors: list[BaseException] = []
+        failed: list[str] = []
+        for chunk, (frame, err, _) in zip(chunks, outcomes):
+            if isinstance(err, PartialDownloadError):
+                # The chunk's own tickers partly succeeded: keep them, report the rest
+                frames.append(err.prices)
+                failed.extend(err.failed)
+                errors.append(err.cause if err.cause is not None else err)
+            elif err is not None:
+                failed.extend(chunk)
+                errors.append(err)
+            else:
+                frames.append(frame)
+
+        with self._lock:
+            self._stats["chunked_requests"] += 1
+            self._stats["chunks"] += len(chunks)
+            self._stats["chunk_failures"] += len(errors)
+            self._recent.append(
+                {
+                    "tickers": len(tickers),
+                    "total_ms": round(total_ms, 2),
+                    "chunks": [
+                        {"tickers": len(chunk), "ms": round(ms, 2), "ok": err is None}
+                        for chunk, (_, err, ms) in zip(chunks, outcomes)
+                    ],
+                }
+            )
+
+        if not frames:
+            raise errors[0]
+
+        prices = pd.concat(frames, axis=1, join="outer", sort=True)  # one aligned concat, no repeated joins
+        if failed:
+            raise PartialDownloadError(prices, failed, errors[0])
+        return prices
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            out: dict[str, Any] = dict(self._stats)
+            out["chunk_size"] = self._chunk_size
+            out["max_concurrency"] = self._max_concurrency
+            out["recent"] = list(self._recent)
+        return out
+
+    def _timed(self, chunk: list[str], start: str, end: str) -> tuple[pd.DataFrame | None, BaseException | None, float]:
+        t0 = time.perf_counter()
+        try:
+            frame = self._downloader(chunk, start, end)
+            return frame, None, (time.perf_counter() - t0) * 1000.0
+        except Exception as e:
+            return None, e, (time.perf_counter() - t0) * 1000.0
@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from providers.price_cache import Downloader
+
+
+# Histogram bucket upper bounds (ms); the last bucket is open-ended
+LATENCY_BUCKETS_MS = (25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+# Requests are grouped by size, since a 200-ticker download is naturally slower than a 1-ticker one
+TICKER_COUNT_BUCKETS = ((1, 1), (2, 5), (6, 20), (21, 100), (101, None))
+
+
+class ProviderTimeout(TimeoutError):
+    """Raised when a provider call does not finish before its deadline."""
+
+
+def _size_label(n: int) -> str:
+    for lo, hi in TICKER_COUNT_BUCKETS:
+        if hi is None or n <= hi:
+            return f"{lo}+" if hi is None else (str(lo) if lo == hi else f"{lo}-{hi}")
+    return "?"
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram plus a bounded window of recent samples for percentiles."""
+
+    def __init__(self, window: int = 256):
+        self.counts = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.total = 0
+        self.sum_ms = 0.0
+        self.max_ms = 0.0
+        self._recent: deque[float] = deque(maxlen=window)
+
+    def record(self, ms: float) -> None:
+        self.counts[int(np.searchsorted(LATENCY_BUCKETS_MS, ms, side="left"))] += 1
+        self.total += 1
+        self.sum_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+        self._recent.append(ms)
+
+    def percentile(self, q: float) -> float | None:
+        if not self._recent:
+            return None
+        return float(np.percentile(np.fromiter(self._recent, dtype="float64"), q))
+
+    def to_dict(self) -> dict[str, Any]:
+        labels = [f"le_{b}ms" for b in LATENCY_BUCKETS_MS] + ["gt_10000ms"]
+        p50, p95, p99 = (self.percentile(q) for q in (50, 95, 99))
+        return {
+            "count": self.total,
+            "mean_ms": round(self.sum_ms / self.total, 2) if self.total else None,
+            "max_ms": round(self.max_ms, 2),
+            "p50_ms": None if p50 is None else round(p50, 2),
+            "p95_ms": None if p95 is None else round(p95, 2),
+            "p99_ms": None if p99 is None else round(p99, 2),
+            "buckets": dict(zip(labels, self.counts)),
+        }
+
+
+class HedgedDownloader:
+    """
+    Deadline-aware, hedged wrapper around a downloader (same call signature).
+
+    - The first attempt starts immediately.
+    - If it is still running after the p95 latency observed for requests of this
+      size (or `initial_hedge_seconds` until `min_samples` have been seen), a second
+      identical attempt is sent; whichever finishes first wins.
+    - If nothing finishes within `deadline_seconds`, ProviderTimeout is raised.
+      Attempts that have not started yet are cancelled; running ones finish in the
+      pool and their latency is still recorded.
+
+    Hedging assumes attempts are independent, i.e. the downloader is thread-safe.
+    """
+
+    def __init__(
+        self,
+        downloader: Downloader,
+        deadline_seconds: float = 10.0,
+        hedge: bool = True,
+        initial_hedge_seconds: float = 2.0,
+        min_samples: int = 20,
+        max_workers: int = 16,
+    ):
+        self._downloader = downloader
+        self._deadline = float(deadline_seconds)
+        self._hedge = bool(hedge)
+        self._initial_hedge = float(initial_hedge_seconds)
+        self._min_samples = int(min_samples)
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="provider")
+
+        self._lock = threading.Lock()
+        self._hist: dict[str, LatencyHistogram] = {}
+        self._stats = {"calls": 0, "hedges_sent": 0, "hedges_won": 0, "timeouts": 0, "errors": 0}
+
+    def __call__(self, tickers: list[str], start: str, end: str) -> pd.DataFrame:
+        label = _size_label(len(tickers))
+        with self._lock:
+            self._stats["calls"] += 1
+
+        t0 = time.monotonic()
+        deadline = t0 + self._deadline
+        attempts = [self._submit(label, tickers, start, end)]
+
+        if self._hedge:
+            hedge_after = min(self._hedge_delay(label), self._deadline)
+            done, _ = wait(attempts, timeout=hedge_after)
+            if not done and time.monotonic() < deadline:
+                attempts.append(self._submit(label, tickers, start, end))
+                with self._lock:
+                    self._stats["hedges_sent"] += 1
+
+        pending = set(attempts)
+        last_error: BaseException | None = None
+        while pending:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            for fut in done:
+                err = fut.exception()
+                if err is None:
+                    if len(attempts) > 1 and fut is attempts[1]:
+                        with self._lock:
+                            self._stats["hedges_won"] += 1
+                    self._cancel(pending)
+                    return fut.result()
+                last_error = err
+
+        self._cancel(pending)
+        if last_error is not None and not pending:
+            with self._lock:
+                self._stats["errors"] += 1
+            raise last_error
+
+        with self._lock:
+            self._stats["timeouts"] += 1
+        raise ProviderTimeout(f"Market data provider did not respond within {self._deadline:g}s.")
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            out: dict[str, Any] = dict(self._stats)
+            out["deadline_seconds"] = self._deadline
+            out["hedging"] = self._hedge
+            out["latency_by_ticker_count"] = {k: h.to_dict() for k, h in self._hist.items()}
+        return out
+
+    # -----------------
+    # internal helpers
+    # -----------------
+    def _hedge_delay(self, label: str) -> float:
+        with self._lock:
+            h = self._hist.get(label)
+            if h is None or h.total < self._min_samples:
+                return self._initial_hedge
+            p95 = h.percentile(95)
+        return self._initial_hedge if p95 is None else p95 / 1000.0
+
+    @staticmethod
+    def _cancel(attempts: set[Future]) -> None:
+        """Drop attempts still queued behind busy workers; running ones cannot be stopped."""
+        for fut in attempts:
+            fut.cancel()
+
+    def _submit(self, label: str, tickers: list[str], start: str, end: str) -> Future:
+        def attempt() -> pd.DataFrame:
+            t0 = time.perf_counter()
+            try:
+                return self._downloader(tickers, start, end)
+            finally:
+                ms = (time.perf_counter() - t0) * 1000.0
+                with self._lock:
+                    self._hist.setdefault(label, LatencyHistogram()).record(ms)
+
+        return self._pool.submit(attempt)
@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import os
+import threading
+from pathlib import Path
+
+import pandas as pd
+
+from providers.market_data import MarketDataProvider
+
+
+CLOSE_COLUMNS = ("Close", "close", "Adj Close", "adj_close")
+DATE_COLUMNS = ("Date", "date")
+
+
+class LocalFileProvider(MarketDataProvider):
+    """
+    Offline provider reading one price file per ticker from a directory:
+
+      <dir>/AAPL.csv  or  <dir>/AAPL.parquet
+
+    Each file needs a date column (Date/date, or the index for Parquet) and a
+    close column (Close/close/Adj Close/adj_close). Files are parsed once and
+    kept in memory.
+    """
+
+    name = "local"
+
+    def __init__(self, directory: str | os.PathLike):
+        self._dir = Path(directory)
+        if not self._dir.is_dir():
+            raise ValueError(f"Market data directory not found: {self._dir}")
+        self._lock = threading.Lock()
+        self._series: dict[str, pd.Series | None] = {}
+
+    def get_closes(self, tickers: list[str], start: str, end: str) -> pd.DataFrame:
+        s, e = pd.Timestamp(start), pd.Timestamp(end)
+        cols = {}
+        for t in tickers:
+            series = self._load(t)
+            if series is None:
+                continue
+            cols[t] = series.loc[(series.index >= s) & (series.index < e)]
+
+        if not cols:
+            return pd.DataFrame(columns=tickers, dtype="float64")
+
+        prices = pd.concat(cols, axis=1).sort_index()
+        prices.index.name = "Date"
+        return prices
+
+    def stats(self) -> dict[str, int | str]:
+        with self._lock:
+            loaded = sum(1 for v in self._series.values() if v is not None)
+        return {"directory": str(self._dir), "tickers_loaded": loaded}
+
+    def _load(self, ticker: str) -> pd.Series | None:
+        with self._lock:
+            if ticker in self._series:
+                return self._series[ticker]
+
+        series = self._read_file(ticker)
+
+        with self._lock:
+            self._series[ticker] = series
+        return series
+
+    def _read_file(self, ticker: str) -> pd.Series | None:
+        csv_path = self._dir / f"{ticker}.csv"
+        parquet_path = self._dir / f"{ticker}.parquet"
+
+        if csv_path.exists():
+            df = pd.read_csv(csv_path)
+        elif parquet_path.exists():
+            df = pd.read_parquet(parquet_path)  # needs pyarrow or fastparquet
+        else:
+            return None
+
+        date_col = next((c for c in DATE_COLUMNS if c in df.columns), None)
+        if date_col is not None:
+            df = df.set_index(date_col)
+
+        close_col = next((c for c in CLOSE_COLUMNS if c in df.columns), None)
+        if close_col is None:
+            raise ValueError(f"{ticker}: price file has no close column.")
+
+        series = df[close_col].astype("float64")
+        idx = pd.to_datetime(series.index)
+        if idx.tz is not None:
+            idx = idx.tz_localize(None)
+        series.index = idx.normalize()
+        series.name = ticker
+        return series[~series.index.duplicated(keep="last")].sort_index()
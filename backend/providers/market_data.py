@@ -1,49 +1,241 @@
 from __future__ import annotations
 
+import os
+import threading
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import Iterable
+from typing import Any, Iterable
 
 import pandas as pd
 import yfinance as yf
 
+from providers.chunked import ChunkedDownloader
+from providers.hedging import HedgedDownloader
+from providers.price_cache import Downloader, PartialDownloadError, get_price_cache
+from providers.single_flight import SingleFlightDownloader
+
+
+class NoPriceData(ValueError):
+    """The provider returned no price rows for the requested tickers and window."""
+
 
 @dataclass(frozen=True)
 class PriceHistory:
     prices: pd.DataFrame  # index=date, columns=tickers
 
 
+class MarketDataProvider(ABC):
+    """
+    Source of daily close prices.
+
+    Subclasses implement `get_closes`; the shared `fetch_price_history` does the
+    ticker cleanup and empty-result checks so every provider behaves the same.
+    """
+
+    name: str = "base"
+
+    @abstractmethod
+    def get_closes(self, tickers: list[str], start: str, end: str) -> pd.DataFrame:
+        """
+        Return closes for [start, end) as DataFrame(index=date, columns=tickers).
+        May be empty; tickers without data may be missing or all-NaN.
+        """
+
+    def fetch_price_history(self, tickers: Iterable[str], start: str, end: str) -> PriceHistory:
+        tickers_list = sorted({t.upper().strip() for t in tickers if t and t.strip()}) # Dedupe & clean tickers
+        if not tickers_list:
+            raise ValueError("No tickers provided.")
+
+        prices = self.get_closes(tickers_list, start, end)
+
+        prices = prices.dropna(how="all") # Drop rows where all tickers are NaN (non-trading days)
+        if prices.empty:
+            raise NoPriceData("No price data returned (bad tickers or empty date range).")
+
+        return PriceHistory(prices=prices)
+
+    def stats(self) -> dict[str, Any]:
+        return {}
+
+
+class YFinanceProvider(MarketDataProvider):
+    """
+    Live Yahoo Finance data.
+
+    Request path: price cache (when enabled) -> single-flight coalescing
+    -> parallel chunking -> hedged, deadline-bounded call per chunk -> Ticker.history per ticker.
+    The default backend (_download_closes) uses per-ticker Ticker.history calls, which
+    share no state, so chunks and hedged attempts run independently.
+    """
+
+    name = "yfinance"
+
+    def __init__(
+        self,
+        downloader: Downloader | None = None,
+        gather_seconds: float | None = None,
+        deadline_seconds: float | None = None,
+        hedge: bool | None = None,
+        chunk_size: int | None = None,
+        max_concurrency: int | None = None,
+    ):
+        if gather_seconds is None:
+            gather_seconds = float(os.getenv("PRICE_FETCH_GATHER_MS", "5")) / 1000.0
+        if deadline_seconds is None:
+            deadline_seconds = float(os.getenv("PRICE_FETCH_DEADLINE_SECONDS", "10"))
+        if hedge is None:
+            hedge = os.getenv("PRICE_FETCH_HEDGE", "1").strip().lower() not in ("0", "false", "no", "off")
+        if chunk_size is None:
+            chunk_size = int(os.getenv("PRICE_FETCH_CHUNK_SIZE", "100"))
+        if max_concurrency is None:
+            max_concurrency = int(os.getenv("PRICE_FETCH_MAX_CONCURRENCY", "4"))
+
+        self._hedged = HedgedDownloader(downloader or _download_closes, deadline_seconds=deadline_seconds, hedge=hedge)
+        self._chunked = ChunkedDownloader(self._hedged, chunk_size=chunk_size, max_concurrency=max_concurrency)
+        self._fetcher = SingleFlightDownloader(self._chunked, gather_seconds=gather_seconds)
+
+    def get_closes(self, tickers: list[str], start: str, end: str) -> pd.DataFrame:
+        # Serve from the on-disk cache when enabled; only missing ranges hit yfinance
+        cache = get_price_cache()
+        try:
+            if cache is not None:
+                return cache.get_prices(tickers, start, end, self._fetcher)
+            return self._fetcher(tickers, start, end)
+        except PartialDownloadError as err:
+            if isinstance(err.cause, TimeoutError):
+                raise err.cause from err  # some chunk hit its deadline: 504, not a bad request
+            raise ValueError(f"Price download failed for {len(err.failed)} ticker(s): {', '.join(err.failed[:10])}") from err
+
+    def stats(self) -> dict[str, Any]:
+        cache = get_price_cache()
+        return {
+            "price_cache": cache.stats() if cache is not None else None,
+            "single_flight": self._fetcher.stats(),
+            "chunking": self._chunked.stats(),
+            "provider_calls": self._hedged.stats(),
+        }
+
+
+def create_provider(name: str | None = None) -> MarketDataProvider:
+    """
+    Build a provider by name (default: env MARKET_DATA_PROVIDER, else "yfinance").
+
+    - "yfinance":  live data (+ price cache)
+    - "local":     CSV/Parquet files from MARKET_DATA_DIR
+    - "synthetic": deterministic GBM prices (SYNTHETIC_SEED, SYNTHETIC_MU, SYNTHETIC_SIGMA)
+    - "universe":  memory-mapped universe matrix from UNIVERSE_DIR (see providers/universe_provider.py)
+    """
+    name = (name or os.getenv("MARKET_DATA_PROVIDER", "yfinance")).strip().lower()
+
+    if name == "yfinance":
+        return YFinanceProvider()
+
+    if name == "local":
+        from providers.local_provider import LocalFileProvider
+
+        directory = os.getenv("MARKET_DATA_DIR", "").strip()
+        if not directory:
+            raise ValueError("MARKET_DATA_DIR is required for the 'local' market data provider.")
+        return LocalFileProvider(directory)
+
+    if name == "synthetic":
+        from providers.synthetic_provider import SyntheticProvider
+
+        return SyntheticProvider(
+            seed=int(os.getenv("SYNTHETIC_SEED", "0")),
+            mu=float(os.getenv("SYNTHETIC_MU", "0.07")),
+            sigma=float(os.getenv("SYNTHETIC_SIGMA", "0.2")),
+        )
+
+    if name == "universe":
+        from providers.universe_provider import UniverseMatrixProvider
+
+        directory = os.getenv("UNIVERSE_DIR", "").strip()
+        if not directory:
+            raise ValueError("UNIVERSE_DIR is required for the 'universe' market data provider.")
+        return UniverseMatrixProvider(directory)
+
+    raise ValueError("market data provider must be 'yfinance', 'local', 'synthetic', or 'universe'.")
+
+
+_provider: MarketDataProvider | None = None
+_provider_lock = threading.Lock()
+
+
+def get_provider() -> MarketDataProvider:
+    global _provider
+    with _provider_lock:
+        if _provider is None:
+            _provider = create_provider()
+        return _provider
+
+
+def set_provider(provider: MarketDataProvider | None) -> None:
+    """Swap the process-wide provider (None -> rebuild from env on next use)."""
+    global _provider
+    with _provider_lock:
+        _provider = provider
+
+
 def fetch_price_history(tickers: Iterable[str], start: str, end: str) -> PriceHistory:
-    tickers_list = sorted({t.upper().strip() for t in tickers if t and t.strip()}) # Dedupe & clean tickers
-    if not tickers_list:
-        raise ValueError("No tickers provided.")
-
-    df = yf.download(
-        tickers=tickers_list,
-        start=start,
-        end=end,
-        auto_adjust=True,
-        progress=False,
-        group_by="column",
-        threads=True,
-    ) # Download daily historical data for the given tickers and date ranges
-
-    # Normalize to a simple DataFrame: index=date, columns=tickers, values=close prices
-    if isinstance(df.columns, pd.MultiIndex):
-        if "Close" in df.columns.levels[0]:
-            prices = df["Close"].copy()
-        elif "Adj Close" in df.columns.levels[0]:
-            prices = df["Adj Close"].copy()
-        else:
-            prices = df.xs(df.columns.levels[0][0], axis=1, level=0).copy()
-    else:
-        # Single ticker case -> columns like Open/High/Low/Close/Volume
-        if "Close" not in df.columns:
-            raise ValueError("Unexpected yfinance response: missing Close column.")
-        prices = df[["Close"]].copy()
-        prices.columns = tickers_list
-
-    prices = prices.dropna(how="all") # Drop rows where all tickers are NaN (non-trading days)
-    if prices.empty:
-        raise ValueError("No price data returned (bad tickers or empty date range).")
-
-    return PriceHistory(prices=prices)
+    return get_provider().fetch_price_history(tickers, start, end)
+
+
+def market_data_stats() -> dict[str, Any]:
+    provider = get_provider()
+    return {"provider": provider.name, **provider.stats()}
+
+
+# yf.download is not re-entrant: every call resets the process-wide yfinance.shared
+# _DFS/_ERRORS/_TRACEBACKS and assembles its result from shared._DFS, so overlapping
+# calls (parallel chunks, hedged attempts) can lose tickers or return each other's
+# frames. Ticker.history returns its own frame (shared state is only written, per
+# ticker, on errors), so calls are independent; a chunk's tickers are fetched
+# concurrently on this pool, the way yf.download(threads=True) did.
+_ticker_pool = ThreadPoolExecutor(
+    max_workers=int(os.getenv("PRICE_FETCH_TICKER_THREADS", "8")), thread_name_prefix="yf-ticker"
+)
+
+
+def _ticker_closes(ticker: str, start: str, end: str) -> pd.Series | None:
+    """Daily auto-adjusted closes of one ticker over [start, end), or None if Yahoo has none."""
+    df = yf.Ticker(ticker).history(start=start, end=end, auto_adjust=True, actions=False, raise_errors=False)
+    if df is None or df.empty or "Close" not in df.columns:
+        return None
+    closes = df["Close"].rename(ticker)
+    if closes.index.tz is not None:
+        closes.index = closes.index.tz_localize(None)  # exchange-local dates, as yf.download returns
+    return closes
+
+
+def _download_closes(tickers_list: list[str], start: str, end: str) -> pd.DataFrame:
+    """
+    Download daily closes from yfinance, one independent Ticker.history call per ticker.
+
+    Returns DataFrame(index=date, columns=tickers); may be empty (tickers without data
+    are missing). If some tickers raise, PartialDownloadError carries the rest; if all
+    of them raise, the first error is raised.
+    """
+    futures = {t: _ticker_pool.submit(_ticker_closes, t, start, end) for t in tickers_list}
+
+    closes: list[pd.Series] = []
+    failed: list[str] = []
+    errors: list[BaseException] = []
+    for t, fut in futures.items():
+        try:
+            series = fut.result()
+        except Exception as e:
+            failed.append(t)
+            errors.append(e)
+            continue
+        if series is not None:
+            closes.append(series)
+
+    if failed and not closes:
+        raise errors[0]
+
+    prices = pd.concat(closes, axis=1, sort=True) if closes else pd.DataFrame(columns=tickers_list, dtype="float64")
+    if failed:
+        raise PartialDownloadError(prices, failed, errors[0])
+    return prices
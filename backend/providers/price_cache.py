@@ -0,0 +1,373 @@
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Callable, Iterable
+
+import numpy as np
+import pandas as pd
+
+
+# Downloader contract: (tickers, start, end) -> DataFrame(index=date, columns=tickers) of closes.
+# `end` is exclusive (same as yf.download). An empty frame is allowed.
+Downloader = Callable[[list[str], str, str], pd.DataFrame]
+
+DATE_FMT = "%Y-%m-%d"
+
+DEFAULT_CACHE_PATH = Path(__file__).resolve().parent.parent / ".cache" / "prices.sqlite3"
+
+# Closes are auto-adjusted, so a split or dividend rescales a ticker's whole history.
+# A gap next to cached data is downloaded with this much overlap; if the overlapping
+# closes no longer match the cached ones, the ticker's cache is dropped and refetched.
+ADJUSTMENT_OVERLAP = pd.Timedelta(days=7)
+ADJUSTMENT_RTOL = 1e-6
+
+
+class PartialDownloadError(Exception):
+    """
+    A downloader got data for some tickers but failed for others.
+
+    `prices` holds what was fetched; `failed` lists the tickers that errored.
+    """
+
+    def __init__(self, prices: pd.DataFrame, failed: list[str], cause: BaseException | None = None):
+        super().__init__(f"Download failed for {len(failed)} ticker(s): {', '.join(failed[:10])}")
+        self.prices = prices
+        self.failed = list(failed)
+        self.cause = cause
+
+
+def _to_day(x: str | pd.Timestamp) -> pd.Timestamp:
+    return pd.Timestamp(x).normalize()
+
+
+def _merge_ranges(ranges: Iterable[tuple[pd.Timestamp, pd.Timestamp]]) -> list[tuple[pd.Timestamp, pd.Timestamp]]:
+    """Merge overlapping/adjacent half-open [start, end) ranges."""
+    merged: list[tuple[pd.Timestamp, pd.Timestamp]] = []
+    for s, e in sorted(r for r in ranges if r[0] < r[1]):
+        if merged and s <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], e))
+        else:
+            merged.append((s, e))
+    return merged
+
+
+def _missing_ranges(
+    start: pd.Timestamp,
+    end: pd.Timestamp,
+    covered: list[tuple[pd.Timestamp, pd.Timestamp]],
+) -> list[tuple[pd.Timestamp, pd.Timestamp]]:
+    """Subtract merged `covered` ranges from [start, end)."""
+    missing = []
+    cur = start
+    for s, e in covered:
+        if e <= cur:
+            continue
+        if s >= end:
+            break
+        if s > cur:
+            missing.append((cur, s))
+        cur = max(cur, e)
+        if cur >= end:
+            break
+    if cur < end:
+        missing.append((cur, end))
+    return missing
+
+
+class PriceCache:
+    """
+    Persistent SQLite cache of daily close prices, one row per (ticker, date).
+
+    Alongside the prices we keep, per ticker, the date ranges that have already
+    been downloaded ("coverage"). A request only downloads the parts of
+    [start, end) that are not covered yet, so repeated or overlapping windows are
+    served from disk (and work offline).
+
+    - Ranges reaching today or later are never marked covered: today's close may
+      still change, so that tail is re-fetched on every request.
+    - A downloaded range is only marked covered if the provider returned data for
+      it; empty responses (network hiccups, holidays-only windows) are retried.
+    - If the downloader times out (TimeoutError), whatever is cached for the window
+      is returned instead (stale/partial); the timeout is re-raised only if the
+      cache has nothing.
+    - Gaps next to cached data are fetched with ADJUSTMENT_OVERLAP days of overlap. If a
+      split or dividend changed the adjusted closes there, the ticker's rows and coverage
+      are dropped and the whole window is refetched, so cached ranges downloaded at
+      different times are never stitched on different adjustment bases.
+    """
+
+    def __init__(self, path: str | os.PathLike):
+        self._path = Path(path)
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._stats = {"hits": 0, "partial_hits": 0, "misses": 0, "downloads": 0, "rows_written": 0, "stale_served": 0, "adjustment_resets": 0}
+        self._init_schema()
+
+    # -----------------
+    # public API
+    # -----------------
+    def get_prices(self, tickers: list[str], start: str, end: str, downloader: Downloader) -> pd.DataFrame:
+        """
+        Return closes for `tickers` over [start, end), downloading only missing ranges.
+
+        Returns DataFrame(index=date, columns=tickers); tickers without data are all-NaN columns.
+        Tickers whose download failed (or was cut off by a timeout) are served from disk
+        when anything is cached for them; otherwise PartialDownloadError (TimeoutError on
+        a timeout) names them.
+        """
+        s, e = _to_day(start), _to_day(end)
+        if s >= e or not tickers:
+            return pd.DataFrame(columns=list(tickers), dtype="float64")
+
+        # Never treat today (or later) as final
+        cacheable_end = min(e, self._today())
+
+        covered = self._coverage(tickers)
+        plan: dict[tuple[tuple[pd.Timestamp, pd.Timestamp], ...], list[str]] = {}
+        hits = partial = misses = 0
+        for t in tickers:
+            missing = tuple(_missing_ranges(s, e, covered.get(t, [])))
+            if not missing:
+                hits += 1
+                continue
+            if missing == ((s, e),):
+                misses += 1
+            else:
+                partial += 1
+            plan.setdefault(missing, []).append(t)
+
+        self._bump(hits=hits, partial_hits=partial, misses=misses)
+
+        # Tickers with identical gaps share one multi-ticker download per gap
+        gaps = [(group, ms, me) for missing, group in plan.items() for ms, me in missing]
+        timed_out: TimeoutError | None = None
+        unfetched: set[str] = set()  # tickers with a gap that was not downloaded
+        failure: BaseException | None = None
+        for i, (group, ms, me) in enumerate(gaps):
+            # Overlap cached neighbours so a changed adjustment basis is noticed
+            fs = ms - ADJUSTMENT_OVERLAP if ms > s else ms
+            fe = me + ADJUSTMENT_OVERLAP if me < e else me
+            try:
+                df = downloader(group, fs.strftime(DATE_FMT), fe.strftime(DATE_FMT))
+            except PartialDownloadError as err:
+                # Keep what succeeded; failed tickers stay uncovered and are retried next time
+                self._bump(downloads=1)
+                failed = set(err.failed)
+                ok = [t for t in group if t not in failed]
+                self._store(self._keep_basis(ok, err.prices, ms, me, gaps, s, e), err.prices, ms, min(me, cacheable_end))
+                unfetched.update(failed)
+                if isinstance(err.cause, TimeoutError):
+                    # A chunk hit the deadline: same stale fallback as a full timeout
+                    timed_out = err.cause
+                    unfetched.update(t for g, _, _ in gaps[i + 1 :] for t in g)
+                    break
+                failure = failure or err.cause or err
+                continue
+            except TimeoutError as err:
+                # Deadline passed: stop downloading and serve what is already on disk
+                timed_out = err
+                unfetched.update(t for g, _, _ in gaps[i:] for t in g)
+                break
+            self._bump(downloads=1)
+            self._store(self._keep_basis(group, df, ms, me, gaps, s, e), df, ms, min(me, cacheable_end))
+
+        prices = self._read(tickers, s, e)
+        # Tickers whose download failed and that have nothing on disk are errors, not gaps
+        lost = [t for t in tickers if t in unfetched and prices[t].isna().all()]
+        if timed_out is not None:
+            if lost:
+                raise timed_out
+            self._bump(stale_served=1)
+        if lost:
+            raise PartialDownloadError(prices, lost, failure)
+        return prices
+
+    def stats(self) -> dict[str, int | str]:
+        with self._stats_lock:
+            out: dict[str, int | str] = dict(self._stats)
+        out["path"] = str(self._path)
+        return out
+
+    def clear(self) -> None:
+        with self._write_lock:
+            conn = self._conn()
+            conn.execute("DELETE FROM prices")
+            conn.execute("DELETE FROM coverage")
+            conn.commit()
+
+    # -----------------
+    # internal helpers
+    # -----------------
+    def _keep_basis(
+        self,
+        tickers: list[str],
+        df: pd.DataFrame,
+        ms: pd.Timestamp,
+        me: pd.Timestamp,
+        gaps: list[tuple[list[str], pd.Timestamp, pd.Timestamp]],
+        s: pd.Timestamp,
+        e: pd.Timestamp,
+    ) -> list[str]:
+        """
+        Tickers of a downloaded gap [ms, me) whose overlap rows match the cache. The others
+        had their adjusted history rescaled upstream: their rows and coverage are deleted
+        and a full [s, e) download is queued on `gaps`.
+        """
+        outside = (df.index < ms) | (df.index >= me)
+        if df.empty or not outside.any():
+            return tickers
+        fresh = df.loc[outside]
+        cached = self._read(tickers, fresh.index.min(), fresh.index.max() + pd.Timedelta(days=1))
+
+        rebased = []
+        for t in tickers:
+            if t not in fresh.columns:
+                continue
+            both = pd.concat([fresh[t], cached[t]], axis=1, join="inner").dropna()
+            if not both.empty and not np.allclose(both.iloc[:, 0], both.iloc[:, 1], rtol=ADJUSTMENT_RTOL, atol=0.0):
+                rebased.append(t)
+        if not rebased:
+            return tickers
+
+        marks = ",".join("?" * len(rebased))
+        with self._write_lock:
+            conn = self._conn()
+            conn.execute(f"DELETE FROM prices WHERE ticker IN ({marks})", rebased)
+            conn.execute(f"DELETE FROM coverage WHERE ticker IN ({marks})", rebased)
+            conn.commit()
+        self._bump(adjustment_resets=len(rebased))
+        gaps.append((rebased, s, e))
+        return [t for t in tickers if t not in rebased]
+
+    def _today(self) -> pd.Timestamp:
+        return pd.Timestamp.today().normalize()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self._path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _init_schema(self) -> None:
+        conn = self._conn()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS prices ("
+            " ticker TEXT NOT NULL, date TEXT NOT NULL, close REAL NOT NULL,"
+            " PRIMARY KEY (ticker, date)) WITHOUT ROWID"
+        )
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS coverage ("
+            " ticker TEXT NOT NULL, start TEXT NOT NULL, end TEXT NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS coverage_ticker ON coverage (ticker)")
+        conn.commit()
+
+    def _bump(self, **deltas: int) -> None:
+        with self._stats_lock:
+            for k, v in deltas.items():
+                self._stats[k] += v
+
+    def _coverage(self, tickers: list[str]) -> dict[str, list[tuple[pd.Timestamp, pd.Timestamp]]]:
+        marks = ",".join("?" * len(tickers))
+        rows = self._conn().execute(
+            f"SELECT ticker, start, end FROM coverage WHERE ticker IN ({marks})", list(tickers)
+        ).fetchall()
+        raw: dict[str, list[tuple[pd.Timestamp, pd.Timestamp]]] = {}
+        for t, s, e in rows:
+            raw.setdefault(t, []).append((_to_day(s), _to_day(e)))
+        return {t: _merge_ranges(r) for t, r in raw.items()}
+
+    def _store(
+        self,
+        tickers: list[str],
+        df: pd.DataFrame,
+        start: pd.Timestamp,
+        covered_end: pd.Timestamp,
+    ) -> None:
+        if df is None or df.empty:
+            return
+
+        rows = []
+        returned = []  # tickers with at least one price; only these get coverage
+        for t in tickers:
+            if t not in df.columns:
+                continue
+            s = df[t].dropna()
+            if s.empty:
+                continue
+            returned.append(t)
+            rows.extend((t, idx.strftime(DATE_FMT), float(v)) for idx, v in s.items())
+
+        # Nothing came back for any ticker: don't remember this range as covered
+        if not rows:
+            return
+
+        with self._write_lock:
+            conn = self._conn()
+            conn.executemany("INSERT OR REPLACE INTO prices (ticker, date, close) VALUES (?, ?, ?)", rows)
+            if start < covered_end:
+                # Tickers missing from (or all-NaN in) the response stay uncovered -> refetched
+                for t in returned:
+                    self._add_coverage_locked(conn, t, start, covered_end)
+            conn.commit()
+
+        self._bump(rows_written=len(rows))
+
+    def _add_coverage_locked(
+        self,
+        conn: sqlite3.Connection,
+        ticker: str,
+        start: pd.Timestamp,
+        end: pd.Timestamp,
+    ) -> None:
+        existing = conn.execute("SELECT start, end FROM coverage WHERE ticker = ?", (ticker,)).fetchall()
+        merged = _merge_ranges([(_to_day(s), _to_day(e)) for s, e in existing] + [(start, end)])
+        conn.execute("DELETE FROM coverage WHERE ticker = ?", (ticker,))
+        conn.executemany(
+            "INSERT INTO coverage (ticker, start, end) VALUES (?, ?, ?)",
+            [(ticker, s.strftime(DATE_FMT), e.strftime(DATE_FMT)) for s, e in merged],
+        )
+
+    def _read(self, tickers: list[str], start: pd.Timestamp, end: pd.Timestamp) -> pd.DataFrame:
+        marks = ",".join("?" * len(tickers))
+        rows = self._conn().execute(
+            f"SELECT date, ticker, close FROM prices"
+            f" WHERE ticker IN ({marks}) AND date >= ? AND date < ?",
+            [*tickers, start.strftime(DATE_FMT), end.strftime(DATE_FMT)],
+        ).fetchall()
+
+        if not rows:
+            return pd.DataFrame(columns=list(tickers), dtype="float64")
+
+        long = pd.DataFrame(rows, columns=["Date", "ticker", "close"])
+        prices = long.pivot(index="Date", columns="ticker", values="close")
+        prices.index = pd.to_datetime(prices.index)
+        prices.index.name = "Date"
+        prices.columns.name = None
+        return prices.reindex(columns=list(tickers)).sort_index()
+
+
+_cache: PriceCache | None = None
+_cache_lock = threading.Lock()
+
+
+def get_price_cache() -> PriceCache | None:
+    """
+    Process-wide cache instance, configured via env:
+      PRICE_CACHE_ENABLED (default "1"), PRICE_CACHE_PATH (default backend/.cache/prices.sqlite3)
+    """
+    global _cache
+    if os.getenv("PRICE_CACHE_ENABLED", "1").strip().lower() in ("0", "false", "no", "off"):
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = PriceCache(os.getenv("PRICE_CACHE_PATH", str(DEFAULT_CACHE_PATH)))
+        return _cache
@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass, field
+
+import pandas as pd
+
+from providers.price_cache import Downloader, PartialDownloadError
+
+
+@dataclass(eq=False)
+class _Batch:
+    start: str
+    end: str
+    tickers: set[str]
+    window: tuple[pd.Timestamp, pd.Timestamp] = field(init=False)
+    started: bool = False
+    done: threading.Event = field(default_factory=threading.Event)
+    result: pd.DataFrame | None = None
+    error: BaseException | None = None
+
+    def __post_init__(self) -> None:
+        self.window = (pd.Timestamp(self.start), pd.Timestamp(self.end))
+
+    def covers(self, window: tuple[pd.Timestamp, pd.Timestamp]) -> bool:
+        return self.window[0] <= window[0] and window[1] <= self.window[1]
+
+
+class SingleFlightDownloader:
+    """
+    Request coalescing in front of a downloader (same call signature).
+
+    Concurrent calls are collapsed:
+      - tickers already being downloaded by another thread for a window that covers
+        [start, end) are waited on, not re-fetched; the result is sliced to [start, end)
+        (so the price cache's per-ticker gap ranges can ride on a wider in-flight download)
+      - other tickers join a pending batch for exactly the same window, which the first
+        caller ("leader") downloads after a short gather window as one multi-ticker call
+
+    Results are only shared between in-flight calls; nothing is kept afterwards
+    (that is the price cache's job).
+    """
+
+    def __init__(self, downloader: Downloader, gather_seconds: float = 0.005):
+        self._downloader = downloader
+        self._gather = max(0.0, float(gather_seconds))
+        self._lock = threading.Lock()
+        self._batches: dict[tuple[str, str], list[_Batch]] = {}
+        self._stats = {"calls": 0, "downloads": 0, "coalesced": 0, "merged": 0}
+
+    def __call__(self, tickers: list[str], start: str, end: str) -> pd.DataFrame:
+        key = (start, end)
+        window = (pd.Timestamp(start), pd.Timestamp(end))
+        want = set(tickers)
+        waits: list[_Batch] = []
+        lead: _Batch | None = None
+
+        with self._lock:
+            self._stats["calls"] += 1
+            # 1) Anything already in flight for a window covering this one
+            for b in (b for bs in self._batches.values() for b in bs):
+                overlap = want & b.tickers
+                if b.started and overlap and b.covers(window):
+                    waits.append(b)
+                    want -= overlap
+
+            # 2) Remaining tickers join the pending batch, or start a new one
+            if want:
+                batches = self._batches.setdefault(key, [])
+                pending = next((b for b in batches if not b.started), None)
+                if pending is None:
+                    lead = _Batch(start=start, end=end, tickers=set(want))
+                    batches.append(lead)
+                    waits.append(lead)
+                else:
+                    pending.tickers |= want
+                    waits.append(pending)
+                    self._stats["merged"] += 1
+            else:
+                self._stats["coalesced"] += 1
+
+        if lead is not None:
+            self._run(key, lead)
+
+        frames = []
+        failed: list[str] = []
+        partial: PartialDownloadError | None = None
+        for b in waits:
+            b.done.wait()
+            res = b.result
+            if isinstance(b.error, PartialDownloadError):
+                partial = b.error
+                res = b.error.prices
+                failed.extend(t for t in b.error.failed if t in tickers)
+            elif b.error is not None:
+                raise b.error
+            if res is not None:
+                res = res[[t for t in res.columns if t in tickers]]
+                if b.window != window:  # joined a wider in-flight download
+                    res = res.loc[(res.index >= window[0]) & (res.index < window[1])]
+                frames.append(res)
+
+        if not frames:
+            out = pd.DataFrame(columns=tickers, dtype="float64")
+        else:
+            out = frames[0] if len(frames) == 1 else pd.concat(frames, axis=1)
+            out = out.reindex(columns=[t for t in tickers if t in out.columns])
+
+        if failed:
+            raise PartialDownloadError(out, failed, partial.cause if partial else None)
+        return out
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            out = dict(self._stats)
+        out["saved"] = out["calls"] - out["downloads"]
+        return out
+
+    def _run(self, key: tuple[str, str], batch: _Batch) -> None:
+        # Give concurrent callers a moment to join before the batch is sealed
+        if self._gather:
+            time.sleep(self._gather)
+
+        with self._lock:
+            batch.started = True
+            tickers = sorted(batch.tickers)
+            self._stats["downloads"] += 1
+
+        try:
+            batch.result = self._downloader(tickers, batch.start, batch.end)
+        except BaseException as e:  # handed to every waiter
+            batch.error = e
+        finally:
+            with self._lock:
+                batches = self._batches.get(key, [])
+                if batch in batches:
+                    batches.remove(batch)
+                if not batches:
+                    self._batches.pop(key, None)
+            batch.done.set()
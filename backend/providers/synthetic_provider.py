@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import threading
+import zlib
+
+import numpy as np
+import pandas as pd
+
+from providers.market_data import MarketDataProvider
+
+
+EPOCH = pd.Timestamp("1990-01-01")
+TRADING_DAYS_PER_YEAR = 252
+
+
+class SyntheticProvider(MarketDataProvider):
+    """
+    Deterministic GBM prices for any ticker, no network required.
+
+    Each ticker gets its own seeded path over business days starting at EPOCH,
+    so a given (ticker, date) always has the same price regardless of the
+    requested window:
+
+      S_t = s0 * exp(sum_k ((mu - 0.5 * sigma^2) * dt + sigma * sqrt(dt) * z_k))
+    """
+
+    name = "synthetic"
+
+    def __init__(self, seed: int = 0, mu: float = 0.07, sigma: float = 0.2, s0: float = 100.0):
+        self._seed = int(seed)
+        self._mu = float(mu)
+        self._sigma = float(sigma)
+        self._s0 = float(s0)
+        self._lock = threading.Lock()
+        self._paths: dict[str, tuple[pd.Timestamp, pd.Series]] = {}  # ticker -> (generated through, path)
+
+    def get_closes(self, tickers: list[str], start: str, end: str) -> pd.DataFrame:
+        s, e = pd.Timestamp(start), pd.Timestamp(end)
+        if s >= e:
+            return pd.DataFrame(columns=tickers, dtype="float64")
+
+        cols = {}
+        for t in tickers:
+            path = self._path(t, e)
+            cols[t] = path.loc[(path.index >= s) & (path.index < e)]
+
+        prices = pd.concat(cols, axis=1)
+        prices.index.name = "Date"
+        return prices
+
+    def stats(self) -> dict[str, float | int]:
+        return {"seed": self._seed, "mu": self._mu, "sigma": self._sigma}
+
+    def _path(self, ticker: str, end: pd.Timestamp) -> pd.Series:
+        with self._lock:
+            cached = self._paths.get(ticker)
+            if cached is not None and cached[0] >= end:
+                return cached[1]
+
+        # Always regenerate from EPOCH so extending a path never changes earlier prices
+        through = max(end, EPOCH)
+        days = np.arange(np.datetime64(EPOCH.date()), np.datetime64(through.date()) + 1)
+        idx = pd.DatetimeIndex(days[np.is_busday(days)])
+        rng = np.random.default_rng([self._seed, zlib.crc32(ticker.encode("utf-8"))])
+        z = rng.standard_normal(len(idx) - 1)
+
+        dt = 1.0 / TRADING_DAYS_PER_YEAR
+        log_inc = (self._mu - 0.5 * self._sigma**2) * dt + self._sigma * np.sqrt(dt) * z
+        log_path = np.concatenate(([0.0], np.cumsum(log_inc)))
+        path = pd.Series(self._s0 * np.exp(log_path), index=idx, name=ticker)
+
+        with self._lock:
+            self._paths[ticker] = (through, path)
+        return path
@@ -0,0 +1,181 @@
+"""
+Memory-mapped universe price matrix.
+
+Offline build step writes, into one directory:
+  prices.f64     raw float64 matrix, shape (n_dates, n_tickers), Fortran order
+                 (each ticker's history is one contiguous run on disk)
+  dates.npy      datetime64[D] session dates (rows)
+  tickers.json   ticker symbols (columns)
+  meta.json      shape / dtype / order / build window
+
+UniverseMatrixProvider maps prices.f64 read-only with numpy.memmap. Every worker
+process maps the same file, so the pages live once in the OS page cache instead of
+once per process. A request reads only the row range and columns it asks for.
+
+Build (from backend/):
+  python -m providers.universe_provider --out data/universe --tickers-file tickers.txt \
+      --start 2000-01-01 --end 2025-01-01
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import shutil
+from pathlib import Path
+from typing import Iterable
+
+import numpy as np
+import pandas as pd
+
+from engines.trading_calendar import get_trading_calendar
+from providers.market_data import MarketDataProvider, create_provider
+
+
+PRICES_FILE = "prices.f64"
+DATES_FILE = "dates.npy"
+TICKERS_FILE = "tickers.json"
+META_FILE = "meta.json"
+
+
+def build_universe_matrix(
+    out_dir: str | os.PathLike,
+    tickers: Iterable[str],
+    start: str,
+    end: str,
+    provider: MarketDataProvider | None = None,
+    chunk_size: int = 200,
+) -> Path:
+    """
+    Fetch `tickers` over [start, end) and write the aligned date x ticker matrix to `out_dir`.
+
+    Rows are the exchange sessions in the window (trading calendar); missing prices are NaN.
+    The matrix is written to a temporary directory and swapped in at the end, so readers
+    never see a half-written universe.
+    """
+    tickers_list = sorted({t.upper().strip() for t in tickers if t and t.strip()})
+    if not tickers_list:
+        raise ValueError("No tickers provided.")
+
+    provider = provider or create_provider()
+    sessions = get_trading_calendar().sessions_in_range(start, pd.Timestamp(end) - pd.Timedelta(days=1))
+    if len(sessions) == 0:
+        raise ValueError("No trading sessions in the requested window.")
+
+    out = Path(out_dir)
+    tmp = out.with_name(out.name + ".tmp")
+    if tmp.exists():
+        shutil.rmtree(tmp)
+    tmp.mkdir(parents=True)
+
+    shape = (len(sessions), len(tickers_list))
+    mm = np.memmap(tmp / PRICES_FILE, dtype="float64", mode="w+", shape=shape, order="F")
+    mm[:] = np.nan
+
+    for c0 in range(0, len(tickers_list), chunk_size):
+        chunk = tickers_list[c0 : c0 + chunk_size]
+        closes = provider.get_closes(chunk, start, end)
+        if closes.empty:
+            continue
+        closes = closes.reindex(index=sessions, columns=chunk)
+        mm[:, c0 : c0 + len(chunk)] = closes.to_numpy(dtype="float64")
+
+    mm.flush()
+    del mm
+
+    np.save(tmp / DATES_FILE, sessions.values.astype("datetime64[D]"))
+    (tmp / TICKERS_FILE).write_text(json.dumps(tickers_list))
+    (tmp / META_FILE).write_text(
+        json.dumps({"shape": list(shape), "dtype": "float64", "order": "F", "start": start, "end": end})
+    )
+
+    if out.exists():
+        shutil.rmtree(out)
+    os.replace(tmp, out)
+    return out
+
+
+class UniverseMatrixProvider(MarketDataProvider):
+    """
+    Serves closes by slicing the memory-mapped universe matrix.
+
+    Row range -> np.searchsorted on the date index; columns -> ticker lookup.
+    Tickers outside the universe are simply absent from the result (like a bad yfinance symbol).
+    """
+
+    name = "universe"
+
+    def __init__(self, directory: str | os.PathLike):
+        d = Path(directory)
+        meta_path = d / META_FILE
+        if not meta_path.exists():
+            raise ValueError(f"Universe matrix not found in {d} (run the build step first).")
+
+        meta = json.loads(meta_path.read_text())
+        self._dir = d
+        self._dates = np.load(d / DATES_FILE)
+        self._tickers = json.loads((d / TICKERS_FILE).read_text())
+        self._col = {t: i for i, t in enumerate(self._tickers)}
+        self._prices = np.memmap(
+            d / PRICES_FILE,
+            dtype=meta["dtype"],
+            mode="r",
+            shape=tuple(meta["shape"]),
+            order=meta["order"],
+        )
+
+    @property
+    def matrix(self) -> np.memmap:
+        return self._prices
+
+    def get_closes(self, tickers: list[str], start: str, end: str) -> pd.DataFrame:
+        r0 = int(np.searchsorted(self._dates, np.datetime64(pd.Timestamp(start).date(), "D"), side="left"))
+        r1 = int(np.searchsorted(self._dates, np.datetime64(pd.Timestamp(end).date(), "D"), side="left"))
+        cols = [t for t in tickers if t in self._col]
+        if r0 >= r1 or not cols:
+            return pd.DataFrame(columns=tickers, dtype="float64")
+
+        idx = [self._col[t] for t in cols]
+        rows = self._prices[r0:r1]  # view, no I/O yet
+        if idx == list(range(idx[0], idx[0] + len(idx))):
+            block = rows[:, idx[0] : idx[0] + len(idx)]  # contiguous columns: still a view
+        else:
+            block = rows[:, idx]  # gathers only the requested columns
+
+        prices = pd.DataFrame(block, index=pd.DatetimeIndex(self._dates[r0:r1], name="Date"), columns=cols, copy=False)
+        return prices
+
+    def stats(self) -> dict[str, object]:
+        return {
+            "directory": str(self._dir),
+            "tickers": len(self._tickers),
+            "dates": int(len(self._dates)),
+            "first_date": str(self._dates[0]) if len(self._dates) else None,
+            "last_date": str(self._dates[-1]) if len(self._dates) else None,
+        }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build the memory-mapped universe price matrix.")
+    parser.add_argument("--out", required=True, help="output directory")
+    parser.add_argument("--tickers-file", required=True, help="text file, one ticker per line")
+    parser.add_argument("--start", required=True)
+    parser.add_argument("--end", required=True)
+    parser.add_argument("--provider", default=None, help="source provider (default: MARKET_DATA_PROVIDER)")
+    parser.add_argument("--chunk-size", type=int, default=200)
+    args = parser.parse_args()
+
+    tickers = [line.strip() for line in Path(args.tickers_file).read_text().splitlines() if line.strip()]
+    out = build_universe_matrix(
+        args.out,
+        tickers,
+        args.start,
+        args.end,
+        provider=create_provider(args.provider),
+        chunk_size=args.chunk_size,
+    )
+    print(f"wrote {out}")
+
+
+if __name__ == "__main__":
+    main()
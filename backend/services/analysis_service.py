@@ -1,17 +1,26 @@
 from __future__ import annotations
 
+from datetime import datetime
 from typing import Any, Tuple
+import numpy as np
 import pandas as pd
 
 from providers.market_data import fetch_price_history
-from engines.portfolio_engine import prices_to_returns, portfolio_returns
-from engines.analytics_engine import (
-    equity_curve,
-    annualized_return,
-    annualized_volatility,
-    max_drawdown,
-    sharpe_ratio,
+from engines.portfolio_engine import (
+    prices_to_returns,
+    portfolio_returns,
+    prices_to_returns_array,
+    portfolio_weight_vector,
+    portfolio_returns_array,
 )
+from engines.analytics_engine import equity_curve, equity_curve_array, fused_metrics_array
+from engines.multi_asset_engine import AssetMoments
+from engines.price_matrix import PriceMatrix
+from engines.buy_and_hold_engine import build_ledger, buy_and_hold_returns, forward_fill, holdings_value
+from engines.rebalance_engine import RebalancePolicy, rebalanced_returns
+from engines.running_metrics import RunningMetrics
+from engines.tail_engine import tail_metrics_matrix
+from engines.window_index import WindowIndex
 from services.store_singleton import analysis_store
 
 
@@ -20,21 +29,44 @@ def _analyze_from_prices(
     weights: dict[str, float],
     starting_cash: float,
     return_artifacts: bool = False,
+    compact: bool = False,
+    trades: list[dict[str, Any]] | None = None,
+    cash: float = 0.0,
+    rebalance: RebalancePolicy | None = None,
 ) -> dict[str, Any]:
     """
     Core analysis pipeline given prices:
       prices -> returns -> portfolio returns -> equity curve -> metrics
+
+    compact=True runs the same pipeline on float32 arrays (see _analyze_from_matrix).
+
+    With `trades` (shares mode), portfolio returns come from holding the shares
+    (buy-and-hold, plus optional uninvested `cash`) instead of constant `weights`.
+    With `rebalance`, weights are held under that policy (see engines.rebalance_engine)
+    instead of the implicit daily rebalance; the output then includes a "rebalance" summary.
     """
+    if compact:
+        return _analyze_from_matrix(
+            PriceMatrix.from_frame(prices), weights, starting_cash, return_artifacts,
+            trades=trades, cash=cash, rebalance=rebalance,
+        )
+
+    rebalance_summary = None
     asset_r = prices_to_returns(prices)
-    port_r = portfolio_returns(asset_r, weights)
+    if trades is not None:
+        r, dates = _buy_and_hold_portfolio_returns(
+            prices.to_numpy(dtype="float64", na_value=np.nan), prices.index, list(prices.columns), trades, cash
+        )
+        port_r = pd.Series(r, index=dates, name="portfolio_return")
+    elif rebalance is not None:
+        r, rebalance_summary = _rebalanced_portfolio_returns(
+            asset_r.to_numpy(dtype="float64", na_value=np.nan), asset_r.index, list(asset_r.columns), weights, rebalance
+        )
+        port_r = pd.Series(r, index=asset_r.index, name="portfolio_return")
+    else:
+        port_r = portfolio_returns(asset_r, weights)
     curve = equity_curve(port_r, starting_cash)
-
-    metrics = {
-        "annualized_return": annualized_return(curve),
-        "annualized_volatility": annualized_volatility(port_r),
-        "max_drawdown": max_drawdown(curve),
-        "sharpe_ratio": sharpe_ratio(port_r),
-    }
+    metrics = _headline_metrics(port_r.to_numpy(dtype="float64", na_value=np.nan), port_r.index, starting_cash)
 
     curve_json = [
         {"date": idx.strftime("%Y-%m-%d"), "value": round(float(val), 2)}
@@ -42,16 +74,165 @@ def _analyze_from_prices(
     ]
 
     out = {"equity_curve": curve_json, "metrics": metrics}
+    if rebalance_summary is not None:
+        out["rebalance"] = rebalance_summary
 
     if return_artifacts:
         out["_artifacts"] = {
             "portfolio_returns": port_r.dropna(),  # pd.Series
             "equity_series": curve,                
+            "asset_returns": asset_r,  # pd.DataFrame, for multi-asset forecasts
         }
 
     return out
 
 
+def _analyze_from_matrix(
+    prices: PriceMatrix,
+    weights: dict[str, float],
+    starting_cash: float,
+    return_artifacts: bool = False,
+    trades: list[dict[str, Any]] | None = None,
+    cash: float = 0.0,
+    rebalance: RebalancePolicy | None = None,
+) -> dict[str, Any]:
+    """
+    Compact analysis pipeline: same output as _analyze_from_prices, computed on the
+    PriceMatrix arrays (float32 prices/returns, float64 reductions).
+
+    Tolerance vs the float64 path: float32 carries ~7 significant digits, so daily
+    returns differ by ~1e-7 absolute. Because reductions and compounding run in
+    float64, over 20+ years of daily data the equity curve agrees to ~1e-6 relative,
+    annualized return/volatility and max drawdown to ~1e-6 absolute, and Sharpe
+    to ~1e-5 absolute (these bounds are what the tests check). Very short windows
+    amplify the annualized return error by ~365/days.
+    """
+    rebalance_summary = None
+    asset_r, rows = prices_to_returns_array(prices.values)
+    if trades is not None:
+        port_r, dates = _buy_and_hold_portfolio_returns(prices.values, prices.dates, prices.tickers, trades, cash)
+    else:
+        dates = prices.dates[rows]
+        if asset_r.shape[0] == 0:
+            port_r = None
+        elif rebalance is not None:
+            port_r, rebalance_summary = _rebalanced_portfolio_returns(asset_r, dates, prices.tickers, weights, rebalance)
+        else:
+            port_r = portfolio_returns_array(asset_r, portfolio_weight_vector(prices.tickers, weights))
+
+    if port_r is None or port_r.size == 0:
+        # Keep the DataFrame path's behaviour (and errors) for degenerate input
+        return _analyze_from_prices(
+            prices.to_frame(), weights, starting_cash, return_artifacts, trades=trades, cash=cash, rebalance=rebalance
+        )
+
+    curve = equity_curve_array(port_r, starting_cash)
+    metrics = _headline_metrics(port_r, dates, starting_cash)
+
+    date_strs = dates.strftime("%Y-%m-%d")
+    curve_json = [
+        {"date": d, "value": round(float(v), 2)}
+        for d, v in zip(date_strs, curve.tolist())
+    ]
+
+    out = {"equity_curve": curve_json, "metrics": metrics}
+    if rebalance_summary is not None:
+        out["rebalance"] = rebalance_summary
+
+    if return_artifacts:
+        # Artifacts are one value per day, so they go back to float64 Series for the store
+        port_series = pd.Series(port_r.astype("float64"), index=dates, name="portfolio_return")
+        out["_artifacts"] = {
+            "portfolio_returns": port_series.dropna(),
+            "equity_series": pd.Series(curve, index=dates, name="equity"),
+            "asset_returns": pd.DataFrame(asset_r, index=prices.dates[rows], columns=list(prices.tickers)),
+        }
+
+    return out
+
+
+def _headline_metrics(port_r: np.ndarray, dates: pd.DatetimeIndex, starting_cash: float) -> dict[str, float]:
+    """The four headline metrics from one fused pass over the portfolio returns."""
+    fused = fused_metrics_array(port_r, starting_cash, dates)
+    return {k: fused[k] for k in ("annualized_return", "annualized_volatility", "max_drawdown", "sharpe_ratio")}
+
+
+def _tail_metrics(returns: list[pd.Series], metrics: list[dict[str, float]]) -> list[dict[str, float]]:
+    """
+    Tail-risk metrics (see engines.tail_engine) for one or more portfolio return series.
+    Series on the same dates run as one T x K batch; Calmar uses each series' headline metrics.
+    """
+    aligned = all(r.index.equals(returns[0].index) for r in returns[1:])
+    groups = [list(range(len(returns)))] if aligned else [[i] for i in range(len(returns))]
+
+    out: list[dict[str, float]] = [{} for _ in returns]
+    for group in groups:
+        tail = tail_metrics_matrix(
+            np.column_stack([returns[i].to_numpy(dtype="float64", na_value=np.nan) for i in group]),
+            annualized_return=np.array([metrics[i]["annualized_return"] for i in group]),
+            max_drawdown=np.array([metrics[i]["max_drawdown"] for i in group]),
+        )
+        for col, i in enumerate(group):
+            out[i] = {name: float(values[col]) for name, values in tail.items()}
+    return out
+
+
+def _buy_and_hold_portfolio_returns(
+    values: np.ndarray,
+    dates: pd.DatetimeIndex,
+    tickers: list[str] | tuple[str, ...],
+    trades: list[dict[str, Any]],
+    cash: float,
+) -> tuple[np.ndarray, pd.DatetimeIndex]:
+    """Daily time-weighted returns of holding the traded shares (see engines.buy_and_hold_engine)."""
+    ledger, _ = build_ledger(values, dates, tickers, trades)
+    value, flows = holdings_value(values, ledger, cash)
+    r, rows = buy_and_hold_returns(value, flows)
+    return r, dates[rows]
+
+
+def _rebalanced_portfolio_returns(
+    asset_returns: np.ndarray,
+    dates: pd.DatetimeIndex,
+    tickers: list[str] | tuple[str, ...],
+    weights: dict[str, float],
+    policy: RebalancePolicy,
+) -> tuple[np.ndarray, dict[str, Any]]:
+    """Daily returns of the target weights held under `policy` (see engines.rebalance_engine)."""
+    return rebalanced_returns(asset_returns, dates, portfolio_weight_vector(tickers, weights), policy)
+
+
+def _append_state(
+    prices: pd.DataFrame,
+    trades: list[dict[str, Any]] | None,
+    cash: float,
+    rebalance: RebalancePolicy | None,
+) -> dict[str, Any] | None:
+    """
+    What is needed to extend the portfolio returns past the window's last price row:
+      - weights mode: the last price row (the base of the next day's pct_change)
+      - shares mode:  final positions, leftover cash and last known prices (V = positions · P + cash)
+
+    None under a rebalance policy: its drift/period state is not carried, so those
+    analyses are re-run instead of extended.
+    """
+    if rebalance is not None:
+        return None
+    if trades is None:
+        return {"mode": "weights", "last_prices": prices.iloc[-1].copy()}
+
+    values = prices.to_numpy(dtype="float64", na_value=np.nan)
+    ledger, _ = build_ledger(values, prices.index, list(prices.columns), trades)
+    positions = np.bincount(ledger.cols, weights=ledger.shares, minlength=values.shape[1])
+    cost = float((ledger.shares * ledger.prices).sum())
+    return {
+        "mode": "shares",
+        "positions": pd.Series(positions, index=prices.columns),
+        "cash": max(float(cash) - cost, 0.0),  # buys beyond cash were contributed, see holdings_value
+        "last_prices": pd.Series(forward_fill(values)[-1], index=prices.columns),
+    }
+
+
 def analyze_portfolio(payload: dict[str, Any]) -> dict[str, Any]:
     """
     Supports holdings as either:
@@ -59,6 +240,16 @@ def analyze_portfolio(payload: dict[str, Any]) -> dict[str, Any]:
       - shares mode:  {ticker, shares} -> converted to weights using first trading day in date range
 
     Mixed mode not yet supported. If any holding has 'shares', we treat it as shares mode by default.
+
+    Shares mode is buy-and-hold: the shares are held (not rebalanced) over the window.
+    Holdings may carry an optional buy_date (bought at the next trading day's close),
+    and portfolio.cash adds an uninvested balance that later buys draw from.
+
+    Optional payload["compact"] = true runs the pipeline on float32 arrays (lower memory
+    for wide universes; see _analyze_from_matrix for tolerances).
+
+    The response carries VaR/CVaR, Sortino, Calmar, skew and kurtosis under
+    "tail_metrics", next to the headline "metrics".
     """
 
     portfolio = payload.get("portfolio", {}) or {}
@@ -81,32 +272,27 @@ def analyze_portfolio(payload: dict[str, Any]) -> dict[str, Any]:
     # Parse holdings accordingly
     shares: dict[str, float] = {}
     weights: dict[str, float] = {}
+    trades: list[dict[str, Any]] | None = None
+    cash = 0.0
 
     if mode == "shares":
         # -------------------------
         # SHARES PATH 
         # -------------------------
-        for h in holdings:
-            ticker = str(h.get("ticker", "")).strip().upper()
-            if not ticker:
-                continue
-            if "shares" not in h or h.get("shares") is None:
-                raise ValueError("In shares mode, every holding must include 'shares'.")
-            shares[ticker] = float(h.get("shares", 0.0))
-
-        if not shares:
-            raise ValueError("Portfolio holdings are required (ticker + shares).")
+        trades = _parse_share_trades(holdings)
+        cash = float(portfolio.get("cash", 0.0) or 0.0)
+        shares = _total_shares(trades)
 
         # Fetch prices for tickers (needed both to value shares and run analysis)
         ph = fetch_price_history(shares.keys(), start=start, end=end)
         prices = ph.prices
 
-        # Convert shares -> weights using first trading day in `prices`
-        weights, holdings_breakdown = shares_to_weights_from_prices(prices, shares)
+        # Weights at cost (first trading day, or each holding's buy date) for transparency
+        weights, holdings_breakdown = shares_weights_and_breakdown(prices, trades)
 
-        # Default starting_cash to portfolio market value if user didn't provide it
+        # Default starting_cash to portfolio market value (plus uninvested cash) if not provided
         if starting_cash is None:
-            starting_cash = float(holdings_breakdown["total_value"])
+            starting_cash = float(holdings_breakdown["total_value"]) + cash
 
     else:
         # --------------------------
@@ -131,9 +317,15 @@ def analyze_portfolio(payload: dict[str, Any]) -> dict[str, Any]:
 
         holdings_breakdown = None  # not applicable in weights mode
 
-    # Run the unchanged analysis pipeline
-    baseline = _analyze_from_prices(prices, weights, float(starting_cash), return_artifacts=True)
+    # Run the unchanged analysis pipeline (optionally on compact float32 arrays)
+    compact = bool(payload.get("compact", False))
+    rebalance = _parse_rebalance(payload, mode)
+    baseline = _analyze_from_prices(
+        prices, weights, float(starting_cash), return_artifacts=True, compact=compact,
+        trades=trades, cash=cash, rebalance=rebalance,
+    )
     art = baseline.pop("_artifacts")
+    baseline["tail_metrics"] = _tail_metrics([art["portfolio_returns"]], [baseline["metrics"]])[0]
 
     analysis_id = analysis_store.put({
         "kind": "analyze",
@@ -142,8 +334,14 @@ def analyze_portfolio(payload: dict[str, Any]) -> dict[str, Any]:
             "starting_cash": float(starting_cash),
             "date_range": {"start": start, "end": end},
             "weights": weights,
+            "rebalance": rebalance.to_dict() if rebalance is not None else None,
         },
         "portfolio_returns": art["portfolio_returns"],  # pd.Series
+        "window_index": WindowIndex(art["portfolio_returns"]),  # sub-window metrics without refetching
+        "running_metrics": RunningMetrics.from_returns(art["portfolio_returns"], float(starting_cash)),
+        "asset_moments": AssetMoments.from_returns(art["asset_returns"]),  # O(K^2), not the T x K returns
+        "asset_model": None,  # multi-asset GBM fit (with Cholesky factor), built on first use
+        "append_state": _append_state(prices, trades, cash, rebalance),  # for /api/analysis/append
         "last_equity_date": art["equity_series"].index[-1],
         "last_equity_value": float(art["equity_series"].iloc[-1]),
     })
@@ -159,6 +357,9 @@ def analyze_portfolio(payload: dict[str, Any]) -> dict[str, Any]:
         **baseline,
     }
 
+    if rebalance is not None:
+        resp["inputs"]["rebalance"] = rebalance.to_dict()
+
     if mode == "shares":
         resp["holdings_breakdown"] = holdings_breakdown
 
@@ -224,3 +425,104 @@ def shares_to_weights_from_prices(
         "positions": positions,
     }
     return weights, breakdown
+
+
+def _parse_share_trades(holdings: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """
+    Shares-mode holdings -> trades [{ticker, shares, buy_date}], one per holding.
+
+    A ticker may appear more than once (e.g. bought on different dates).
+    """
+    trades: list[dict[str, Any]] = []
+    for h in holdings:
+        ticker = str(h.get("ticker", "")).strip().upper()
+        if not ticker:
+            continue
+        if "shares" not in h or h.get("shares") is None:
+            raise ValueError("In shares mode, every holding must include 'shares'.")
+        shares = float(h.get("shares", 0.0))
+        if shares <= 0:
+            raise ValueError(f"Shares must be > 0 for {ticker}.")
+
+        buy_date = str(h.get("buy_date") or "").strip() or None
+        if buy_date is not None:
+            try:
+                datetime.strptime(buy_date, "%Y-%m-%d")
+            except ValueError:
+                raise ValueError(f"buy_date for {ticker} must be YYYY-MM-DD.")
+
+        trades.append({"ticker": ticker, "shares": shares, "buy_date": buy_date})
+
+    if not trades:
+        raise ValueError("Portfolio holdings are required (ticker + shares).")
+    return trades
+
+
+def _total_shares(trades: list[dict[str, Any]]) -> dict[str, float]:
+    shares: dict[str, float] = {}
+    for t in trades:
+        shares[t["ticker"]] = shares.get(t["ticker"], 0.0) + float(t["shares"])
+    return shares
+
+
+def shares_weights_and_breakdown(
+    prices: pd.DataFrame,
+    trades: list[dict[str, Any]],
+) -> Tuple[dict[str, float], dict[str, Any]]:
+    """
+    Weights and holdings breakdown for shares mode.
+
+    Without buy dates this is shares_to_weights_from_prices (valued on the first day).
+    With buy dates each trade is valued at its own execution price; weights are the
+    cost basis per ticker over the total, and the executed trades are listed.
+    """
+    if not any(t.get("buy_date") for t in trades):
+        return shares_to_weights_from_prices(prices, _total_shares(trades))
+
+    if prices is None or prices.empty:
+        raise ValueError("No price data available to value share holdings.")
+
+    _, executed = build_ledger(
+        prices.to_numpy(dtype="float64", na_value=np.nan), prices.index, list(prices.columns), trades
+    )
+
+    by_ticker: dict[str, dict[str, Any]] = {}
+    for ex in executed:
+        pos = by_ticker.setdefault(ex["ticker"], {"ticker": ex["ticker"], "shares": 0.0, "value": 0.0})
+        pos["shares"] += ex["shares"]
+        pos["value"] += ex["shares"] * ex["price"]
+
+    total_value = sum(p["value"] for p in by_ticker.values())
+    if total_value <= 0:
+        raise ValueError("Total portfolio value is 0; cannot compute weights.")
+
+    weights: dict[str, float] = {}
+    positions = []
+    for p in by_ticker.values():
+        w = p["value"] / total_value
+        weights[p["ticker"]] = w
+        positions.append(
+            {
+                "ticker": p["ticker"],
+                "shares": round(p["shares"], 6),
+                "price": round(p["value"] / p["shares"], 6),  # average cost
+                "value": round(p["value"], 2),
+                "weight": round(w, 6),
+            }
+        )
+
+    breakdown = {
+        "as_of": min(ex["date"] for ex in executed),
+        "total_value": round(total_value, 2),
+        "positions": positions,
+        "trades": executed,
+    }
+    return weights, breakdown
+
+
+def _parse_rebalance(payload: dict[str, Any], mode: str) -> RebalancePolicy | None:
+    """Optional payload["rebalance"] policy; only meaningful for target weights."""
+    policy = RebalancePolicy.from_payload(payload.get("rebalance"))
+    if policy is not None and mode == "shares":
+        raise ValueError("rebalance is only supported in weights mode (shares mode is buy-and-hold).")
+    return policy
@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+from datetime import timedelta
+from threading import Lock
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from providers.market_data import NoPriceData, fetch_price_history
+from engines.portfolio_engine import prices_to_returns, portfolio_returns
+from services.store_singleton import analysis_store
+
+
+# Serializes appends so two refreshes of one analysis cannot interleave their updates
+_append_lock = Lock()
+
+
+def _new_portfolio_returns(
+    state: dict[str, Any], new_prices: pd.DataFrame, weights: dict[str, float]
+) -> tuple[pd.Series, pd.DataFrame]:
+    """
+    Portfolio and per-asset returns for price rows after the stored window, continuing
+    from `state` (see analysis_service._append_state). Updates `state` in place.
+    """
+    columns = state["last_prices"].index
+    rows = new_prices.reindex(columns=columns)
+    frame = pd.concat([state["last_prices"].to_frame().T, rows])
+    asset_r = prices_to_returns(frame)
+
+    if state["mode"] == "weights":
+        port_r = portfolio_returns(asset_r, weights)
+        state["last_prices"] = frame.iloc[-1].copy()
+        return port_r, asset_r
+
+    # shares: positions are fixed after the last trade, so V_t = positions · P_t + cash
+    filled = frame.ffill()
+    positions = state["positions"].to_numpy(dtype="float64")
+    value = np.nan_to_num(filled.to_numpy(dtype="float64", na_value=np.nan), nan=0.0) @ positions + state["cash"]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        r = np.where(value[:-1] > 0, value[1:] / value[:-1] - 1.0, 0.0)
+    state["last_prices"] = filled.iloc[-1].copy()
+    return pd.Series(r, index=rows.index, name="portfolio_return"), asset_r
+
+
+def append_analysis(payload: dict[str, Any]) -> dict[str, Any]:
+    """
+    Extend a stored analysis with the price rows published since its last date,
+    updating its returns, equity curve and metrics in O(new days).
+
+    Payload:
+    {
+      "analysis_id": "...",
+      "end": "YYYY-MM-DD"   (optional, exclusive like date_range.end; default and cap: today)
+    }
+
+    Today's row is never appended: until the close it is an intraday quote, and appended
+    rows are permanent.
+
+    Metrics come from the analysis' running statistics (engines.running_metrics) and
+    match a full re-analysis of the extended window. Supported for /api/analyze results
+    without a rebalance policy; the sub-window index and multi-asset model are rebuilt
+    lazily on next use.
+    """
+    analysis_id = str(payload.get("analysis_id", "")).strip()
+    if not analysis_id:
+        raise ValueError("analysis_id is required.")
+
+    item = analysis_store.get(analysis_id)
+    if item is None:
+        raise ValueError("analysis_id not found or expired. Re-run analysis.")
+    if item.get("kind") != "analyze":
+        raise ValueError("Only /api/analyze results can be extended; re-run the shock analysis instead.")
+    if item.get("append_state") is None or item.get("running_metrics") is None:
+        raise ValueError("This analysis cannot be extended (rebalance policies are not supported). Re-run analysis.")
+
+    today = pd.Timestamp.today().normalize()
+    end_raw = str(payload.get("end") or "").strip()
+    end_ts = pd.to_datetime(end_raw, errors="coerce", format="%Y-%m-%d") if end_raw else today
+    if pd.isna(end_ts):
+        raise ValueError("end must be YYYY-MM-DD.")
+    end_ts = min(end_ts, today)
+
+    state = item["append_state"]
+    tickers = list(state["last_prices"].index)
+    fetch_start = item["last_equity_date"] + timedelta(days=1)
+    new_prices = pd.DataFrame(columns=tickers, index=pd.DatetimeIndex([]), dtype="float64")
+    if fetch_start < end_ts:
+        try:
+            new_prices = fetch_price_history(
+                tickers, start=fetch_start.strftime("%Y-%m-%d"), end=end_ts.strftime("%Y-%m-%d")
+            ).prices
+        except NoPriceData:
+            pass  # nothing published since the last stored date
+
+    with _append_lock:
+        last_date = item["last_equity_date"]
+        new_prices = new_prices.loc[new_prices.index > last_date]
+
+        port_r = None
+        values = np.empty(0, dtype="float64")
+        if not new_prices.empty:
+            port_r, asset_r = _new_portfolio_returns(state, new_prices, item["inputs"]["weights"])
+            port_r = port_r.dropna()
+            running = item["running_metrics"]
+            values = running.update(port_r.to_numpy(dtype="float64"), pd.DatetimeIndex(port_r.index))
+
+            if values.size:
+                item["portfolio_returns"] = pd.concat([item["portfolio_returns"], port_r])
+                item["last_equity_date"] = port_r.index[-1]
+                item["last_equity_value"] = float(values[-1])
+                item["window_index"] = None  # rebuilt from the extended returns on the next window query
+                if item.get("asset_moments") is not None:
+                    item["asset_moments"] = item["asset_moments"].extend(asset_r)
+                    item["asset_model"] = None  # refitted on the next multi-asset forecast
+
+        curve_json = []
+        if port_r is not None:
+            curve_json = [
+                {"date": idx.strftime("%Y-%m-%d"), "value": round(float(val), 2)}
+                for idx, val in zip(port_r.index, values.tolist())
+            ]
+
+        return {
+            "analysis_id": analysis_id,
+            "appended": len(curve_json),
+            "last_equity_date": item["last_equity_date"].strftime("%Y-%m-%d"),
+            "last_equity_value": item["last_equity_value"],
+            "equity_curve": curve_json,
+            "metrics": item["running_metrics"].metrics(),
+        }
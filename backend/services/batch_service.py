@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import os
+from typing import Any
+
+import numpy as np
+
+from providers.market_data import fetch_price_history
+from engines.batch_engine import batch_portfolio_metrics
+from engines.portfolio_engine import prices_to_returns_array
+
+
+MAX_BATCH_PORTFOLIOS = int(os.getenv("BATCH_MAX_PORTFOLIOS", "50000"))
+
+
+def analyze_batch(payload: dict[str, Any]) -> dict[str, Any]:
+    """
+    Score many weight vectors against one price window.
+
+    Payload:
+      - tickers: ["AAPL", "MSFT", ...]              (N columns)
+      - weights: [[0.5, 0.5], [0.2, 0.8], ...]      (K rows, each normalized to sum to 1)
+      - date_range: {start, end}
+
+    Prices are fetched once; all K portfolios are evaluated with one matrix product
+    (see engines.batch_engine). Metrics come back column-wise: one list of length K
+    per metric, in the same order as `weights`.
+    """
+    tickers_raw = payload.get("tickers", []) or []
+    tickers = [str(t).strip().upper() for t in tickers_raw]
+    if not tickers or any(not t for t in tickers):
+        raise ValueError("tickers must be a non-empty list of ticker symbols.")
+    if len(set(tickers)) != len(tickers):
+        raise ValueError("tickers must not contain duplicates.")
+
+    date_range = payload.get("date_range", {}) or {}
+    start = str(date_range.get("start", "")).strip()
+    end = str(date_range.get("end", "")).strip()
+    if not start or not end:
+        raise ValueError("date_range.start and date_range.end are required.")
+
+    weights_raw = payload.get("weights", None)
+    if not isinstance(weights_raw, list) or not weights_raw:
+        raise ValueError("weights must be a non-empty list of weight rows.")
+    if len(weights_raw) > MAX_BATCH_PORTFOLIOS:
+        raise ValueError(f"At most {MAX_BATCH_PORTFOLIOS} weight rows per request.")
+    try:
+        weights = np.asarray(weights_raw, dtype="float64")
+    except (TypeError, ValueError):
+        raise ValueError("weights must be a list of equal-length numeric rows.")
+    if weights.ndim != 2 or weights.shape[1] != len(tickers):
+        raise ValueError(f"Each weight row must have {len(tickers)} values (one per ticker).")
+
+    ph = fetch_price_history(tickers, start=start, end=end)
+    prices = ph.prices
+
+    # Absent and all-NaN columns (the cached provider's shape for unknown tickers) alike
+    missing = [t for t in tickers if t not in prices.columns or prices[t].isna().all()]
+    if missing:
+        raise ValueError(f"No market data for: {', '.join(missing)}.")
+
+    asset_r, rows = prices_to_returns_array(prices[tickers].to_numpy(dtype="float64", na_value=np.nan))
+    if asset_r.shape[0] == 0:
+        raise ValueError("Not enough price data in date_range to compute returns.")
+
+    metrics = batch_portfolio_metrics(asset_r, weights, prices.index[rows])
+
+    return {
+        "count": int(weights.shape[0]),
+        "tickers": tickers,
+        "date_range": {"start": start, "end": end},
+        "metrics": {k: v.tolist() for k, v in metrics.items()},
+    }
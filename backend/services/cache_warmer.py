@@ -0,0 +1,196 @@
+from __future__ import annotations
+
+import os
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Iterable
+
+import pandas as pd
+
+from engines.trading_calendar import get_trading_calendar
+from providers.market_data import PriceHistory, fetch_price_history, get_provider
+from providers.price_cache import get_price_cache
+
+
+DEFAULT_WARMUP_TICKERS = (
+    "SPY", "QQQ", "DIA", "IWM",
+    "AAPL", "MSFT", "NVDA", "AMZN", "GOOGL", "META", "TSLA", "BRK-B",
+)
+DEFAULT_LOOKBACK_DAYS = 5 * 365
+DEFAULT_REFRESH_SECONDS = 900
+WARMUP_CHUNK_SIZE = 10
+
+Fetcher = Callable[[Iterable[str], str, str], PriceHistory]
+
+
+class CacheWarmer:
+    """
+    Background price-cache warm-up.
+
+    1) On start: fetch `lookback_days` of history for every warm-up ticker (in small
+       multi-ticker chunks) so the first /api/analyze calls are cache hits.
+    2) Then every `refresh_seconds`: re-fetch the last few sessions for the same
+       tickers so the most recent close is always on disk.
+
+    Runs on a daemon thread; never blocks app startup. status() is reported by /api/health.
+    """
+
+    def __init__(
+        self,
+        tickers: Iterable[str],
+        lookback_days: int = DEFAULT_LOOKBACK_DAYS,
+        refresh_seconds: float = DEFAULT_REFRESH_SECONDS,
+        fetch: Fetcher = fetch_price_history,
+        chunk_size: int = WARMUP_CHUNK_SIZE,
+    ):
+        self._tickers = sorted({t.upper().strip() for t in tickers if t and t.strip()})
+        self._lookback_days = int(lookback_days)
+        self._refresh_seconds = float(refresh_seconds)
+        self._fetch = fetch
+        self._chunk_size = max(1, int(chunk_size))
+
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._status: dict[str, Any] = {
+            "state": "idle",
+            "tickers_total": len(self._tickers),
+            "tickers_done": 0,
+            "failed": [],
+            "started_at": None,
+            "finished_at": None,
+            "last_refresh_at": None,
+            "refreshes": 0,
+        }
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name="cache-warmer", daemon=True)
+            self._status["state"] = "running"
+            self._status["started_at"] = _now()
+        self._thread.start()
+
+    def stop(self, timeout: float | None = None) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def join(self, timeout: float | None = None) -> None:
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def status(self) -> dict[str, Any]:
+        with self._lock:
+            out = dict(self._status)
+            out["failed"] = list(out["failed"])
+        total = out["tickers_total"]
+        out["progress"] = round(out["tickers_done"] / total, 4) if total else 1.0
+        out["ready"] = out["state"] in ("refreshing", "done")
+        return out
+
+    # -----------------
+    # internal helpers
+    # -----------------
+    def _run(self) -> None:
+        today = pd.Timestamp.today().normalize()
+        start = (today - timedelta(days=self._lookback_days)).strftime("%Y-%m-%d")
+        end = (today + timedelta(days=1)).strftime("%Y-%m-%d")
+
+        for i in range(0, len(self._tickers), self._chunk_size):
+            if self._stop.is_set():
+                return
+            chunk = self._tickers[i : i + self._chunk_size]
+            failed = self._fetch_quietly(chunk, start, end)
+            with self._lock:
+                self._status["tickers_done"] += len(chunk)
+                self._status["failed"].extend(failed)
+
+        with self._lock:
+            self._status["finished_at"] = _now()
+            self._status["state"] = "refreshing" if self._refresh_seconds > 0 else "done"
+
+        while self._refresh_seconds > 0 and not self._stop.wait(self._refresh_seconds):
+            self.refresh_latest()
+
+    def refresh_latest(self) -> None:
+        """Re-fetch the window from the previous session through today for all warm-up tickers."""
+        today = pd.Timestamp.today().normalize()
+        try:
+            since = get_trading_calendar().previous_session(today, inclusive=False)
+        except ValueError:
+            since = today - timedelta(days=7)
+        start = since.strftime("%Y-%m-%d")
+        end = (today + timedelta(days=1)).strftime("%Y-%m-%d")
+
+        for i in range(0, len(self._tickers), self._chunk_size):
+            if self._stop.is_set():
+                return
+            self._fetch_quietly(self._tickers[i : i + self._chunk_size], start, end)
+
+        with self._lock:
+            self._status["last_refresh_at"] = _now()
+            self._status["refreshes"] += 1
+
+    def _fetch_quietly(self, tickers: list[str], start: str, end: str) -> list[str]:
+        """Fetch and return tickers that came back without data (errors never escape the thread)."""
+        try:
+            prices = self._fetch(tickers, start, end).prices
+        except Exception:
+            return list(tickers)
+        return [t for t in tickers if t not in prices.columns or prices[t].isna().all()]
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+def warmer_from_env() -> CacheWarmer | None:
+    """
+    Build the warmer from env, or None when warming makes no sense / is disabled.
+
+      WARMUP_ENABLED          default "1"
+      WARMUP_TICKERS          comma-separated (default: index ETFs + mega-caps)
+      WARMUP_LOOKBACK_DAYS    default 1825
+      WARMUP_REFRESH_SECONDS  default 900 (0 disables the periodic refresh)
+
+    Only the yfinance provider with the price cache enabled is warmed.
+    """
+    if os.getenv("WARMUP_ENABLED", "1").strip().lower() in ("0", "false", "no", "off"):
+        return None
+    if get_provider().name != "yfinance" or get_price_cache() is None:
+        return None
+
+    raw = os.getenv("WARMUP_TICKERS", "").strip()
+    tickers = [t for t in raw.split(",") if t.strip()] if raw else list(DEFAULT_WARMUP_TICKERS)
+
+    return CacheWarmer(
+        tickers,
+        lookback_days=int(os.getenv("WARMUP_LOOKBACK_DAYS", str(DEFAULT_LOOKBACK_DAYS))),
+        refresh_seconds=float(os.getenv("WARMUP_REFRESH_SECONDS", str(DEFAULT_REFRESH_SECONDS))),
+    )
+
+
+_warmer: CacheWarmer | None = None
+_warmer_started = False
+_warmer_lock = threading.Lock()
+
+
+def start_cache_warmer() -> CacheWarmer | None:
+    """Start the process-wide warmer once (create_app may run more than once per process)."""
+    global _warmer, _warmer_started
+    with _warmer_lock:
+        if not _warmer_started:
+            _warmer_started = True
+            _warmer = warmer_from_env()
+            if _warmer is not None:
+                _warmer.start()
+        return _warmer
+
+
+def warmup_status() -> dict[str, Any]:
+    w = _warmer
+    if w is None:
+        return {"state": "disabled", "ready": True, "progress": 1.0}
+    return w.status()
@@ -16,17 +16,33 @@ from __future__ import annotations
 
 from typing import Any
 import math
+import os
+import numpy as np
 import pandas as pd
 
 from services.store_singleton import analysis_store
 from engines.analytics_engine import equity_curve
 from engines.forecast_engine import _forecast_from_returns
 from engines.forecast_estimators import estimate_drift, estimate_volatility
-from engines.stochastic_engine import run_stochastic_forecast
+from engines.multi_asset_engine import AssetModel, run_multi_asset_forecast
+from engines.portfolio_engine import portfolio_weight_vector
+from engines.stochastic_engine import resolve_seed, run_stochastic_forecast
+from engines.streaming_engine import run_streaming_forecast
+from engines.trading_calendar import future_sessions
 
 
 TRADING_DAYS_PER_YEAR = 252
 
+# Above this many simulated values (simulations x (days + 1)) stochastic forecasts stream
+# through fixed-size chunks and quantile sketches instead of holding every path (~160 MB)
+STREAMING_MIN_ELEMENTS = int(os.getenv("FORECAST_STREAMING_MIN_ELEMENTS", "20000000"))
+
+# Worker processes for streaming forecasts (1 = simulate in the request thread)
+FORECAST_WORKERS = max(1, int(os.getenv("FORECAST_WORKERS", "1")))
+
+# Stochastic models: one GBM on the portfolio series, or correlated per-asset GBMs
+FORECAST_MODELS = ("portfolio", "multi_asset")
+
 
 def _get_cached_returns_and_starting_cash(
     analysis_id: str,
@@ -56,6 +72,33 @@ def _get_cached_returns_and_starting_cash(
     raise ValueError(f"Unsupported cached analysis kind: {kind}")
 
 
+def _get_asset_model(analysis_id: str, source: str) -> tuple[AssetModel, np.ndarray]:
+    """
+    Multi-asset GBM fit (mean vector, covariance, Cholesky factor) of a stored /api/analyze
+    result and its weight vector. Fitted from the stored asset return moments on first use
+    and kept on the item, so later forecasts of the same analysis_id skip the factorization.
+    """
+    item = analysis_store.get(analysis_id)
+    if item is None:
+        raise ValueError("analysis_id not found or expired. Re-run analysis.")
+    if item.get("kind") != "analyze" or item.get("asset_moments") is None:
+        raise ValueError("forecast.model 'multi_asset' requires an /api/analyze result. Re-run analysis.")
+    if source != "baseline":
+        raise ValueError("source must be 'baseline' for non-shock analyses.")
+    # The simulation holds the weights as a constant mix (rebalanced every step); that is
+    # only the portfolio whose history it continues for weights-mode, daily-rebalanced runs
+    if item["inputs"].get("mode") != "weights" or item["inputs"].get("rebalance") is not None:
+        raise ValueError(
+            "forecast.model 'multi_asset' supports weights-mode analyses without a rebalance policy only "
+            "(it simulates the weights as a constant mix, not buy-and-hold or periodic rebalancing)."
+        )
+
+    model = item.get("asset_model")
+    if model is None:
+        model = item["asset_model"] = AssetModel.from_moments(item["asset_moments"])
+    return model, portfolio_weight_vector(model.tickers, item["inputs"]["weights"])
+
+
 def _serialize_series(series: pd.Series) -> list[dict[str, Any]]:
     return [
         {"date": idx.strftime("%Y-%m-%d"), "value": round(float(val), 2)}
@@ -122,6 +165,7 @@ def _run_stochastic_forecast(
     port_r: pd.Series,
     starting_cash: float,
     forecast_cfg: dict[str, Any],
+    asset_model: tuple[AssetModel, np.ndarray] | None = None,
 ) -> dict[str, Any]:
     forecast_days = int(forecast_cfg.get("days", 30))
     if forecast_days <= 0:
@@ -133,6 +177,23 @@ def _run_stochastic_forecast(
 
     drift_mode = str(forecast_cfg.get("drift_mode", "mean")).strip().lower()
     vol_mode = str(forecast_cfg.get("vol_mode", "historical")).strip().lower()
+    if asset_model is not None and (drift_mode != "mean" or vol_mode != "historical"):
+        raise ValueError("forecast.model 'multi_asset' supports drift_mode 'mean' and vol_mode 'historical' only.")
+
+    # Streaming bounds memory by the chunk size; on by default for large runs
+    streaming_raw = forecast_cfg.get("streaming", None)
+    if streaming_raw is None:
+        streaming = simulations * (forecast_days + 1) > STREAMING_MIN_ELEMENTS
+    elif isinstance(streaming_raw, bool):
+        streaming = streaming_raw
+    else:
+        raise ValueError("forecast.streaming must be true or false.")
+
+    # Optional seed: the same seed and inputs give bit-identical paths and bands
+    try:
+        seed = resolve_seed(forecast_cfg.get("seed", None))
+    except (TypeError, ValueError):
+        raise ValueError("forecast.seed must be a non-negative integer.")
 
     window = forecast_cfg.get("window", None)
     alpha = forecast_cfg.get("alpha", None)
@@ -146,39 +207,71 @@ def _run_stochastic_forecast(
     if not isinstance(hist_curve, pd.Series):
         raise TypeError("equity_curve must return a pandas Series.")
 
-    mu_daily, trend_meta = estimate_drift(
-        port_r,
-        drift_mode,
-        window=window,
-        alpha=alpha,
-        lam=lam,
-    )
-    sigma_daily, vol_meta = estimate_volatility(
-        port_r,
-        vol_mode,
-        window=window,
-        alpha=alpha,
-        lam=lam,
-    )
-
-    mu_annual = float(mu_daily) * TRADING_DAYS_PER_YEAR
-    sigma_annual = float(sigma_daily) * math.sqrt(TRADING_DAYS_PER_YEAR)
+    if asset_model is None:
+        mu_daily, trend_meta = estimate_drift(
+            port_r,
+            drift_mode,
+            window=window,
+            alpha=alpha,
+            lam=lam,
+        )
+        sigma_daily, vol_meta = estimate_volatility(
+            port_r,
+            vol_mode,
+            window=window,
+            alpha=alpha,
+            lam=lam,
+        )
+        mu_annual = float(mu_daily) * TRADING_DAYS_PER_YEAR
+        sigma_annual = float(sigma_daily) * math.sqrt(TRADING_DAYS_PER_YEAR)
+    else:
+        # Report the moments the simulation uses: w·mu and sqrt(w' cov w) of the asset model
+        mu_annual, sigma_annual = asset_model[0].portfolio_moments(asset_model[1])
+        mu_daily = mu_annual / TRADING_DAYS_PER_YEAR
+        sigma_daily = sigma_annual / math.sqrt(TRADING_DAYS_PER_YEAR)
+        trend_meta = {"mode": "mean", "mean_daily_return": mu_daily}
+        vol_meta = {"mode": "historical", "daily_volatility": sigma_daily, "annualized_volatility": sigma_annual, "ddof": 1}
 
     s0 = float(hist_curve.iloc[-1])
     T = forecast_days / TRADING_DAYS_PER_YEAR
     N = forecast_days
 
-    stoch_out = run_stochastic_forecast(
-        s0=s0,
-        mu=mu_annual,
-        sigma=sigma_annual,
-        T=T,
-        N=N,
-        n=simulations,
-    )
+    if asset_model is not None:
+        model, weights = asset_model
+        stoch_out = run_multi_asset_forecast(
+            model,
+            weights,
+            s0=s0,
+            T=T,
+            N=N,
+            n=simulations,
+            seed=seed,
+            streaming=streaming,
+        )
+    elif streaming:
+        stoch_out = run_streaming_forecast(
+            s0=s0,
+            mu=mu_annual,
+            sigma=sigma_annual,
+            T=T,
+            N=N,
+            n=simulations,
+            seed=seed,
+            workers=FORECAST_WORKERS,
+        )
+    else:
+        stoch_out = run_stochastic_forecast(
+            s0=s0,
+            mu=mu_annual,
+            sigma=sigma_annual,
+            T=T,
+            N=N,
+            n=simulations,
+            seed=seed,
+        )
 
     last_date = hist_curve.index[-1]
-    future_idx = pd.bdate_range(last_date + pd.Timedelta(days=1), periods=forecast_days)
+    future_idx = future_sessions(last_date, forecast_days)
 
     path_metrics = stoch_out["path_metrics"]
 
@@ -199,6 +292,9 @@ def _run_stochastic_forecast(
         "simulations": simulations,
         "drift_mode": drift_mode,
         "vol_mode": vol_mode,
+        "seed": int(stoch_out["seed"]),
+        "streaming": streaming,
+        "model": "portfolio" if asset_model is None else "multi_asset",
     }
 
     if window is not None and (drift_mode == "rolling" or vol_mode == "rolling"):
@@ -212,7 +308,7 @@ def _run_stochastic_forecast(
         else:
             inputs_forecast["lambda"] = 0.94
 
-    return {
+    out = {
         "inputs_forecast": inputs_forecast,
         "trend": {
             **trend_meta,
@@ -235,9 +331,26 @@ def _run_stochastic_forecast(
         "drawdown": {
             "median_max_drawdown": float(drawdown["median_max_drawdown"]),
             "prob_drawdown_gt_20": float(drawdown["prob_drawdown_gt_20"]),
+            "median_max_duration_days": float(drawdown["median_max_duration"]),
+            "p90_max_duration_days": float(drawdown["p90_max_duration"]),
+            "mean_time_under_water": float(drawdown["mean_time_under_water"]),
         },
     }
 
+    if asset_model is not None:
+        model, weights = asset_model
+        out["assets"] = [
+            {
+                "ticker": ticker,
+                "weight": float(w),
+                "annualized_drift": float(m),
+                "annualized_volatility": float(math.sqrt(max(v, 0.0))),
+            }
+            for ticker, w, m, v in zip(model.tickers, weights, model.mu, np.diag(model.cov))
+        ]
+
+    return out
+
 
 def forecast_portfolio(payload: dict[str, Any]) -> dict[str, Any]:
     """
@@ -265,7 +378,14 @@ def forecast_portfolio(payload: dict[str, Any]) -> dict[str, Any]:
         "days": 252,
         "simulations": 10000,
         "drift_mode": "mean",
-        "vol_mode": "historical"
+        "vol_mode": "historical",
+        "seed": 12345,             (optional; echoed in inputs.forecast, random if omitted)
+        "streaming": true          (optional; sketch-based quantiles in bounded memory,
+                                    default on above STREAMING_MIN_ELEMENTS simulated values;
+                                    sharded across FORECAST_WORKERS processes)
+        "model": "multi_asset"     (optional, stochastic only; correlated per-asset GBMs fitted
+                                    to the asset returns, aggregated by weights as a constant mix; weights-mode
+                                    analyses without a rebalance policy only; default "portfolio")
       }
     }
     """
@@ -282,12 +402,20 @@ def forecast_portfolio(payload: dict[str, Any]) -> dict[str, Any]:
     if forecast_type not in ("deterministic", "stochastic"):
         raise ValueError("forecast.type must be 'deterministic' or 'stochastic'.")
 
+    model = str(forecast_cfg.get("model", "portfolio")).strip().lower()
+    if model not in FORECAST_MODELS:
+        raise ValueError("forecast.model must be 'portfolio' or 'multi_asset'.")
+
+    if forecast_type == "deterministic" and model != "portfolio":
+        raise ValueError("forecast.model 'multi_asset' requires forecast.type 'stochastic'.")
+
     port_r, starting_cash = _get_cached_returns_and_starting_cash(analysis_id, source)
 
     if forecast_type == "deterministic":
         out = _run_deterministic_forecast(port_r, starting_cash, forecast_cfg)
     else:
-        out = _run_stochastic_forecast(port_r, starting_cash, forecast_cfg)
+        asset_model = _get_asset_model(analysis_id, source) if model == "multi_asset" else None
+        out = _run_stochastic_forecast(port_r, starting_cash, forecast_cfg, asset_model)
 
     return {
         "inputs": {
@@ -0,0 +1,217 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from typing import Any
+
+import pandas as pd
+
+from engines.trading_calendar import get_trading_calendar
+from providers.market_data import fetch_price_history
+
+
+DEFAULT_LOOKAHEAD_DAYS = 7
+MAX_GROUP_SPAN_DAYS = 31  # batch: windows are merged into one fetch while the span stays under this
+
+
+def _parse_holding(h: dict[str, Any], lookahead_days: int) -> tuple[str, str, datetime, datetime]:
+    """
+    Validate one {ticker, buy_date} item.
+
+    Returns (ticker, requested_date, window_start, window_end). Raises ValueError on bad input.
+    """
+    ticker = str(h.get("ticker", "")).strip().upper()
+    requested_date = str(h.get("buy_date", "")).strip()
+
+    if not ticker:
+        raise ValueError("ticker is required")
+    if not requested_date:
+        raise ValueError("buy_date is required")
+
+    try:
+        d0 = datetime.strptime(requested_date, "%Y-%m-%d")
+    except ValueError:
+        raise ValueError("buy_date must be YYYY-MM-DD")
+
+    return ticker, requested_date, d0, d0 + timedelta(days=max(1, lookahead_days))
+
+
+def _resolve_from_prices(
+    prices: pd.DataFrame,
+    ticker: str,
+    requested_date: str,
+    start: datetime,
+    end: datetime,
+) -> dict[str, Any]:
+    """Pick the first valid price for `ticker` in [start, end) and build the response item."""
+    if prices.empty or ticker not in prices.columns:
+        return _no_data(ticker, requested_date)
+
+    s = prices[ticker]
+    s = s.loc[(s.index >= start) & (s.index < end)].dropna()
+    if s.empty:
+        return {
+            "valid": False,
+            "ticker": ticker,
+            "requested_date": requested_date,
+            "reason": "no valid prices returned in lookahead window",
+        }
+
+    as_of_dt = s.index[0]
+    as_of = as_of_dt.strftime("%Y-%m-%d")
+    px = float(s.iloc[0])
+
+    note = None
+    if as_of != requested_date:
+        note = f"Market closed on {requested_date}; used next trading day {as_of} for that {ticker} trade."
+
+    return {
+        "valid": True,
+        "ticker": ticker,
+        "requested_date": requested_date,
+        "as_of": as_of,
+        "price": round(px, 6),
+        "note": note,
+    }
+
+
+def _provider_error(ticker: str, requested_date: str) -> dict[str, Any]:
+    return {
+        "valid": False,
+        "ticker": ticker,
+        "requested_date": requested_date,
+        "reason": "Unspecified provider error. Check ticker.",
+    }
+
+
+def _no_data(ticker: str, requested_date: str) -> dict[str, Any]:
+    return {
+        "valid": False,
+        "ticker": ticker,
+        "requested_date": requested_date,
+        "reason": "no price data returned in lookahead window",
+    }
+
+
+Item = tuple[int, str, str, datetime, datetime]  # (position, ticker, requested_date, window_start, window_end)
+
+
+def _group_windows(items: list[Item]) -> list[list[Item]]:
+    """Greedy grouping over windows sorted by start; a group's span stays <= MAX_GROUP_SPAN_DAYS."""
+    groups: list[list[Item]] = []
+    for item in sorted(items, key=lambda x: (x[3], x[4])):
+        if groups:
+            g_start = groups[-1][0][3]
+            g_end = max(x[4] for x in groups[-1])
+            if max(g_end, item[4]) - g_start <= timedelta(days=MAX_GROUP_SPAN_DAYS):
+                groups[-1].append(item)
+                continue
+        groups.append([item])
+    return groups
+
+
+def _fetch_and_resolve(items: list[Item], results: dict[int, dict[str, Any]]) -> int:
+    """Resolve items with one multi-ticker fetch per window group. Returns the number of fetches."""
+    groups = _group_windows(items)
+    for group in groups:
+        start = group[0][3]
+        end = max(x[4] for x in group)
+        try:
+            prices = fetch_price_history(
+                {x[1] for x in group},
+                start=start.strftime("%Y-%m-%d"),
+                end=end.strftime("%Y-%m-%d"),
+            ).prices
+        except Exception:
+            for i, ticker, requested_date, _, _ in group:
+                results[i] = _provider_error(ticker, requested_date)
+            continue
+
+        for i, ticker, requested_date, s, e in group:
+            results[i] = _resolve_from_prices(prices, ticker, requested_date, s, e)
+    return len(groups)
+
+
+def _resolve_items(items: list[Item]) -> tuple[dict[int, dict[str, Any]], int]:
+    """
+    Resolve parsed items to {valid, as_of, price, note} results.
+
+    The trading calendar picks each item's session up front, so the provider is only
+    asked for the price on that one session. Items whose session has no price (halts,
+    unscheduled closures) fall back to the full lookahead window.
+    """
+    calendar = get_trading_calendar()
+    today = pd.Timestamp.today().normalize()
+
+    results: dict[int, dict[str, Any]] = {}
+    narrowed: list[Item] = []
+    full: list[Item] = []
+
+    for item in items:
+        i, ticker, requested_date, start, end = item
+        try:
+            session = calendar.next_session(start)
+        except ValueError:
+            full.append(item)  # outside calendar coverage: probe the window as before
+            continue
+
+        if session >= end or session > today:
+            results[i] = _no_data(ticker, requested_date)  # no session with a price yet; skip the fetch
+            continue
+        session_end = session + pd.Timedelta(days=1)
+        narrowed.append((i, ticker, requested_date, session.to_pydatetime(), session_end.to_pydatetime()))
+
+    calls = _fetch_and_resolve(narrowed + full, results)
+
+    originals = {x[0]: x for x in items}
+    retry = [originals[x[0]] for x in narrowed if not results[x[0]]["valid"]]
+    if retry:
+        calls += _fetch_and_resolve(retry, results)
+
+    return results, calls
+
+
+def validate_holding(payload: dict[str, Any]) -> dict[str, Any]:
+    """
+    Validate a single {ticker, buy_date} and resolve the next valid trading day/price.
+
+    Raises ValueError for malformed input.
+    """
+    lookahead_days = int(payload.get("lookahead_days", DEFAULT_LOOKAHEAD_DAYS))
+    item = (0, *_parse_holding(payload, lookahead_days))
+
+    results, _ = _resolve_items([item])
+    return results[0]
+
+
+def validate_holdings_batch(payload: dict[str, Any]) -> dict[str, Any]:
+    """
+    Validate many {ticker, buy_date} items with as few provider calls as possible.
+
+    Items are grouped by window; nearby windows are merged (span <= MAX_GROUP_SPAN_DAYS)
+    and each group is resolved from one multi-ticker fetch. Per-item results keep the same
+    shape/semantics as validate_holding, in request order. Malformed items get
+    {"valid": False, "reason": ...} instead of failing the whole batch.
+    """
+    holdings = payload.get("holdings", None)
+    if not isinstance(holdings, list) or not holdings:
+        raise ValueError("holdings must be a non-empty list")
+
+    lookahead_days = int(payload.get("lookahead_days", DEFAULT_LOOKAHEAD_DAYS))
+
+    results: list[dict[str, Any] | None] = [None] * len(holdings)
+    parsed: list[Item] = []
+    for i, h in enumerate(holdings):
+        try:
+            parsed.append((i, *_parse_holding(h if isinstance(h, dict) else {}, lookahead_days)))
+        except ValueError as e:
+            results[i] = {"valid": False, "reason": str(e)}
+
+    resolved, calls = _resolve_items(parsed)
+    for i, r in resolved.items():
+        results[i] = r
+
+    return {
+        "results": results,
+        "valid_count": sum(1 for r in results if r and r.get("valid")),
+        "provider_calls": calls,
+    }
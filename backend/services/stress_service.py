@@ -4,16 +4,34 @@ from typing import Any
 import pandas as pd
 
 from providers.market_data import fetch_price_history
-from services.analysis_service import _analyze_from_prices, shares_to_weights_from_prices
+from services.analysis_service import (
+    _analyze_from_prices,
+    _analyze_from_matrix,
+    _parse_rebalance,
+    _parse_share_trades,
+    _tail_metrics,
+    _total_shares,
+    shares_weights_and_breakdown,
+)
 from services.store_singleton import analysis_store
 
+from engines.drawdown_engine import drawdown_episodes
+from engines.price_matrix import PriceMatrix
+from engines.window_index import WindowIndex
 from engines.scenario_engine import (
     apply_price_shock,
     apply_shock_with_linear_rebound,
     apply_regime_shift,
+    apply_price_shock_matrix,
+    apply_shock_with_linear_rebound_matrix,
+    apply_regime_shift_matrix,
 )
 
 
+DEFAULT_TOP_DRAWDOWNS = 5
+MAX_TOP_DRAWDOWNS = 50
+
+
 def analyze_with_shock(payload: dict[str, Any]) -> dict[str, Any]:
     """
     Runs baseline analysis and a shocked-scenario analysis, then compares them.
@@ -23,9 +41,11 @@ def analyze_with_shock(payload: dict[str, Any]) -> dict[str, Any]:
       - shares mode:  {ticker, shares} -> converted to weights using first trading day in date range
 
     Returns:
-      - baseline: equity_curve + metrics
-      - scenario: equity_curve + metrics
-      - delta: metric differences (scenario - baseline)
+      - baseline: equity_curve + metrics + drawdowns (top episodes)
+      - scenario: equity_curve + metrics + drawdowns (top episodes)
+      - delta: metric and tail_metrics differences (scenario - baseline)
+
+    Optional payload["top_drawdowns"] (default 5) sets how many episodes are listed.
     """
     # --- Parse portfolio inputs ---
     portfolio = payload.get("portfolio", {}) or {}
@@ -48,29 +68,24 @@ def analyze_with_shock(payload: dict[str, Any]) -> dict[str, Any]:
 
     shares: dict[str, float] = {}
     weights: dict[str, float] = {}
+    trades: list[dict[str, Any]] | None = None
+    cash = 0.0
 
     # --- Parse holdings + fetch prices once ---
     if mode == "shares":
-        for h in holdings:
-            ticker = str(h.get("ticker", "")).strip().upper()
-            if not ticker:
-                continue
-            if "shares" not in h or h.get("shares") is None:
-                raise ValueError("In shares mode, every holding must include 'shares'.")
-            shares[ticker] = float(h.get("shares", 0.0))
-
-        if not shares:
-            raise ValueError("Portfolio holdings are required (ticker + shares).")
+        trades = _parse_share_trades(holdings)
+        cash = float(portfolio.get("cash", 0.0) or 0.0)
+        shares = _total_shares(trades)
 
         ph = fetch_price_history(shares.keys(), start=start, end=end)
         prices = ph.prices
 
-        # Convert shares -> weights using first trading day in window
-        weights, holdings_breakdown = shares_to_weights_from_prices(prices, shares)
+        # Weights at cost for transparency; the analysis itself holds the shares
+        weights, holdings_breakdown = shares_weights_and_breakdown(prices, trades)
 
-        # Default starting_cash to market value if omitted
+        # Default starting_cash to market value (plus uninvested cash) if omitted
         if starting_cash is None:
-            starting_cash = float(holdings_breakdown["total_value"])
+            starting_cash = float(holdings_breakdown["total_value"]) + cash
 
     else:
         for h in holdings:
@@ -108,19 +123,37 @@ def analyze_with_shock(payload: dict[str, Any]) -> dict[str, Any]:
     shock_type = str(shock.get("type", "permanent")).strip().lower()
     rebound_days = int(shock.get("rebound_days", 10))
 
+    top_drawdowns = int(payload.get("top_drawdowns", DEFAULT_TOP_DRAWDOWNS))
+    if not 0 <= top_drawdowns <= MAX_TOP_DRAWDOWNS:
+        raise ValueError(f"top_drawdowns must be between 0 and {MAX_TOP_DRAWDOWNS}.")
+
+    # Optional compact mode: float32 arrays through both the shock and the analysis
+    compact = bool(payload.get("compact", False))
+    if compact:
+        prices = PriceMatrix.from_frame(prices)
+        analyze = _analyze_from_matrix
+        shocks = (apply_price_shock_matrix, apply_shock_with_linear_rebound_matrix, apply_regime_shift_matrix)
+    else:
+        analyze = _analyze_from_prices
+        shocks = (apply_price_shock, apply_shock_with_linear_rebound, apply_regime_shift)
+    price_shock, shock_with_linear_rebound, regime_shift = shocks
+
     # --- Baseline analysis ---
-    baseline = _analyze_from_prices(prices, weights, float(starting_cash), return_artifacts=True)
+    rebalance = _parse_rebalance(payload, mode)
+    baseline = analyze(
+        prices, weights, float(starting_cash), return_artifacts=True, trades=trades, cash=cash, rebalance=rebalance
+    )
     base_art = baseline.pop("_artifacts")
 
     # --- Scenario analysis (apply shock then re-run analysis) ---
     if shock_type == "permanent":
-        shocked_prices = apply_price_shock(
+        shocked_prices = price_shock(
             prices,
             shock_date=shock_date,
             shock_pct=shock_pct,
         )
     elif shock_type == "linear_rebound":
-        shocked_prices = apply_shock_with_linear_rebound(
+        shocked_prices = shock_with_linear_rebound(
             prices,
             shock_date=shock_date,
             shock_pct=shock_pct,
@@ -129,7 +162,7 @@ def analyze_with_shock(payload: dict[str, Any]) -> dict[str, Any]:
     elif shock_type == "regime_shift":
         vol_mult = float(shock.get("vol_mult", 1.5))
         drift_shift = float(shock.get("drift_shift", -0.0005))
-        shocked_prices = apply_regime_shift(
+        shocked_prices = regime_shift(
             prices,
             shock_date=shock_date,
             vol_mult=vol_mult,
@@ -140,14 +173,31 @@ def analyze_with_shock(payload: dict[str, Any]) -> dict[str, Any]:
             f"Unknown shock.type '{shock_type}'. Use 'permanent', 'linear_rebound', or 'regime_shift'."
         )
 
-    scenario = _analyze_from_prices(shocked_prices, weights, float(starting_cash), return_artifacts=True)
+    scenario = analyze(
+        shocked_prices, weights, float(starting_cash), return_artifacts=True, trades=trades, cash=cash, rebalance=rebalance
+    )
     scen_art = scenario.pop("_artifacts")
 
+    # --- Drawdown episodes from each equity curve ---
+    for out, art in ((baseline, base_art), (scenario, scen_art)):
+        curve = art["equity_series"]
+        out["drawdowns"] = drawdown_episodes(curve.to_numpy(dtype="float64"), curve.index, top_drawdowns)
+
+    # --- Tail metrics for both curves in one batch ---
+    baseline["tail_metrics"], scenario["tail_metrics"] = _tail_metrics(
+        [base_art["portfolio_returns"], scen_art["portfolio_returns"]],
+        [baseline["metrics"], scenario["metrics"]],
+    )
+
     # --- Metric deltas (scenario - baseline) ---
     delta_metrics = {
         k: float(scenario["metrics"][k]) - float(baseline["metrics"][k])
         for k in baseline["metrics"].keys()
     }
+    delta_tail = {
+        k: scenario["tail_metrics"][k] - baseline["tail_metrics"][k]
+        for k in baseline["tail_metrics"].keys()
+    }
 
 
 
@@ -170,8 +220,10 @@ def analyze_with_shock(payload: dict[str, Any]) -> dict[str, Any]:
         },
         "baseline": baseline,
         "scenario": scenario,
-        "delta": {"metrics": delta_metrics},
+        "delta": {"metrics": delta_metrics, "tail_metrics": delta_tail},
     }
+    if rebalance is not None:
+        resp["inputs"]["rebalance"] = rebalance.to_dict()
 
     # Cache portfolio returns for further analysis
     analysis_id = analysis_store.put({
@@ -179,6 +231,8 @@ def analyze_with_shock(payload: dict[str, Any]) -> dict[str, Any]:
         "inputs": resp["inputs"],
         "baseline_returns": base_art["portfolio_returns"],   # pd.Series
         "scenario_returns": scen_art["portfolio_returns"],   # pd.Series
+        "baseline_window_index": WindowIndex(base_art["portfolio_returns"]),
+        "scenario_window_index": WindowIndex(scen_art["portfolio_returns"]),
         "baseline_last_equity_date": base_art["equity_series"].index[-1],
         "baseline_last_equity_value": float(base_art["equity_series"].iloc[-1]),
         "scenario_last_equity_date": scen_art["equity_series"].index[-1],
@@ -208,6 +262,9 @@ def _snap_to_trading_day(prices: pd.DataFrame, date_str: str) -> tuple[str, str
         raise ValueError("shock.date must be YYYY-MM-DD.")
 
     idx = prices.index  # DatetimeIndex
+
+    # The fetched rows are the trading days: the first one on/after the date is the
+    # next session (O(log n) on the sorted index)
     pos = idx.searchsorted(ts, side="left")
 
     if pos >= len(idx):
@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from engines.rolling_engine import ROLLING_FIELDS, rolling_metrics
+from engines.window_index import WindowIndex
+from services.store_singleton import analysis_store
+
+
+DEFAULT_ROLLING_WINDOWS = (63, 252)
+MAX_ROLLING_WINDOWS = 8
+
+
+def _get_item_keys(analysis_id: str, source: str) -> tuple[dict[str, Any], str, str]:
+    """(stored item, window index key, returns key) for a stored analysis and source."""
+    item = analysis_store.get(analysis_id)
+    if item is None:
+        raise ValueError("analysis_id not found or expired. Re-run analysis.")
+
+    kind = item.get("kind")
+    if kind == "analyze":
+        if source != "baseline":
+            raise ValueError("source must be 'baseline' for non-shock analyses.")
+        return item, "window_index", "portfolio_returns"
+    if kind == "analyze_shock":
+        return item, f"{source}_window_index", f"{source}_returns"
+    raise ValueError(f"Unsupported cached analysis kind: {kind}")
+
+
+def _parse_source(payload: dict[str, Any]) -> tuple[str, str]:
+    analysis_id = str(payload.get("analysis_id", "")).strip()
+    if not analysis_id:
+        raise ValueError("analysis_id is required.")
+
+    source = str(payload.get("source", "baseline")).strip().lower()
+    if source not in ("baseline", "scenario"):
+        raise ValueError("source must be 'baseline' or 'scenario'.")
+    return analysis_id, source
+
+
+def _get_window_index(analysis_id: str, source: str) -> WindowIndex:
+    """
+    WindowIndex for a stored analysis (built at analysis time; rebuilt from the
+    cached returns if the item predates it).
+    """
+    item, key, returns_key = _get_item_keys(analysis_id, source)
+    index = item.get(key)
+    if index is None:
+        index = item[key] = WindowIndex(item[returns_key])
+    return index
+
+
+def window_metrics(payload: dict[str, Any]) -> dict[str, Any]:
+    """
+    Metrics for a [start, end] sub-window of a stored analysis, served from the
+    analysis' prefix sums / segment tree (no provider calls, no recompute).
+
+    Payload:
+    {
+      "analysis_id": "...",
+      "source": "baseline" | "scenario",   (default "baseline")
+      "start": "YYYY-MM-DD",                (optional, default first date)
+      "end": "YYYY-MM-DD"                   (optional, default last date)
+    }
+    """
+    analysis_id, source = _parse_source(payload)
+
+    start = str(payload.get("start") or "").strip() or None
+    end = str(payload.get("end") or "").strip() or None
+    for name, value in (("start", start), ("end", end)):
+        if value is not None and pd.isna(pd.to_datetime(value, errors="coerce", format="%Y-%m-%d")):
+            raise ValueError(f"{name} must be YYYY-MM-DD.")
+
+    out = _get_window_index(analysis_id, source).window(start, end)
+    return {"analysis_id": analysis_id, "source": source, **out}
+
+
+def rolling_window_metrics(payload: dict[str, Any]) -> dict[str, Any]:
+    """
+    Rolling volatility / Sharpe / trailing return / drawdown-from-window-peak series
+    for a stored analysis, for several window lengths at once (see engines.rolling_engine).
+
+    Payload:
+    {
+      "analysis_id": "...",
+      "source": "baseline" | "scenario",   (default "baseline")
+      "windows": [63, 252],                 (optional, trading days, each >= 2)
+      "max_points": 500                     (optional, downsample each series to about this many points)
+    }
+    """
+    analysis_id, source = _parse_source(payload)
+
+    raw_windows = payload.get("windows") or list(DEFAULT_ROLLING_WINDOWS)
+    if not isinstance(raw_windows, list) or not raw_windows:
+        raise ValueError("windows must be a non-empty list of window lengths.")
+    if len(raw_windows) > MAX_ROLLING_WINDOWS:
+        raise ValueError(f"At most {MAX_ROLLING_WINDOWS} windows per request.")
+    try:
+        windows = sorted({int(w) for w in raw_windows})
+    except (TypeError, ValueError):
+        raise ValueError("windows must be integers (trading days).")
+    if windows[0] < 2:
+        raise ValueError("Each window must be at least 2 trading days.")
+
+    max_points = payload.get("max_points")
+    if max_points is not None:
+        max_points = int(max_points)
+        if max_points < 2:
+            raise ValueError("max_points must be at least 2.")
+
+    item, _, returns_key = _get_item_keys(analysis_id, source)
+    returns = item[returns_key]
+    series = rolling_metrics(returns.to_numpy(dtype="float64", na_value=np.nan), windows)
+    date_strs = pd.DatetimeIndex(returns.index).strftime("%Y-%m-%d")
+
+    out = []
+    for w in windows:
+        values = series[w]
+        size = values["volatility"].size
+        rows = np.arange(size)
+        if max_points is not None and size > max_points:
+            # Even stride, always keeping the latest point
+            rows = rows[::-(-size // max_points)]
+            if rows[-1] != size - 1:
+                rows = np.append(rows, size - 1)
+
+        cols = {field: values[field][rows].tolist() for field in ROLLING_FIELDS}
+        dates = date_strs[rows + w - 1]
+        out.append(
+            {
+                "window": w,
+                "points": int(rows.size),
+                "series": [
+                    {"date": d, **{field: cols[field][k] for field in ROLLING_FIELDS}}
+                    for k, d in enumerate(dates)
+                ],
+            }
+        )
+
+    return {"analysis_id": analysis_id, "source": source, "rolling": out}
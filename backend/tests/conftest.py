@@ -1,7 +1,11 @@
 # AI Disclosure: This file includes content generated with GPT-5.2.
+import os
 import sys
 from pathlib import Path
 
 # Add backend directory to Python path
 backend_dir = Path(__file__).parent.parent
 sys.path.insert(0, str(backend_dir))
+
+# Keep the app's background cache warm-up off the network during tests
+os.environ.setdefault("WARMUP_ENABLED", "0")
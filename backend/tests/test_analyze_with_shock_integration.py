@@ -112,3 +112,17 @@ def test_analyze_with_shock_regime_shift_runs(mock_fetch_price_history):
 def test_analyze_with_shock_unknown_type_raises(mock_fetch_price_history):
     with pytest.raises(ValueError, match="Unknown shock.type"):
         analyze_with_shock(_base_payload("made_up_type", pct=-0.10))
+
+
+@pytest.mark.parametrize("shock_type", ["permanent", "linear_rebound", "regime_shift"])
+def test_analyze_with_shock_compact_mode_matches_default(mock_fetch_price_history, shock_type):
+    payload = _base_payload(shock_type=shock_type, pct=-0.10)
+
+    full = analyze_with_shock(payload)
+    compact = analyze_with_shock({**payload, "compact": True})
+
+    for side in ("baseline", "scenario"):
+        assert [p["date"] for p in compact[side]["equity_curve"]] == [p["date"] for p in full[side]["equity_curve"]]
+        # A 3-day window annualizes with exponent ~90, which amplifies float32 rounding
+        for k, v in full[side]["metrics"].items():
+            assert compact[side]["metrics"][k] == pytest.approx(v, rel=1e-4, abs=1e-5)
@@ -0,0 +1,164 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from engines.analytics_engine import annualized_return, annualized_volatility, equity_curve, max_drawdown, sharpe_ratio
+from engines.running_metrics import RunningMetrics
+from providers.market_data import NoPriceData
+from services.analysis_service import analyze_portfolio
+from services.append_service import append_analysis
+from services.window_service import window_metrics
+
+
+class DummyPH:
+    def __init__(self, prices: pd.DataFrame):
+        self.prices = prices
+
+
+@pytest.fixture
+def prices():
+    rng = np.random.default_rng(16)
+    idx = pd.bdate_range("2020-01-01", periods=600)
+    r = rng.normal(0.0004, 0.012, (600, 3))
+    df = pd.DataFrame(100.0 * np.cumprod(1.0 + r, axis=0), index=idx, columns=["AAPL", "MSFT", "SPY"])
+    df.iloc[450, 1] = np.nan  # a missing close inside the appended part
+    return df
+
+
+def _fake_fetch(prices):
+    def fetch(tickers, start, end):
+        window = prices.loc[(prices.index >= pd.Timestamp(start)) & (prices.index < pd.Timestamp(end))]
+        if window.empty:
+            raise NoPriceData("No price data returned (bad tickers or empty date range).")
+        return DummyPH(window[sorted(tickers)])
+
+    return fetch
+
+
+@pytest.fixture
+def provider(monkeypatch, prices):
+    import services.analysis_service as svc
+    import services.append_service as app_svc
+
+    monkeypatch.setattr(svc, "fetch_price_history", _fake_fetch(prices))
+    monkeypatch.setattr(app_svc, "fetch_price_history", _fake_fetch(prices))
+
+
+def test_running_metrics_match_full_series():
+    rng = np.random.default_rng(1)
+    r = pd.Series(rng.normal(0.0003, 0.02, 900), index=pd.bdate_range("2015-01-01", periods=900))
+
+    running = RunningMetrics.from_returns(r.iloc[:100], 1000.0)
+    for lo, hi in ((100, 101), (101, 400), (400, 900)):
+        running.update(r.iloc[lo:hi].to_numpy(), r.index[lo:hi])
+
+    curve = equity_curve(r, 1000.0)
+    got = running.metrics()
+    assert got["annualized_return"] == pytest.approx(annualized_return(curve), rel=1e-10)
+    assert got["annualized_volatility"] == pytest.approx(annualized_volatility(r), rel=1e-10)
+    assert got["max_drawdown"] == pytest.approx(max_drawdown(curve), rel=1e-10)
+    assert got["sharpe_ratio"] == pytest.approx(sharpe_ratio(r), rel=1e-10)
+    assert running.last_value == pytest.approx(float(curve.iloc[-1]), rel=1e-12)
+
+
+@pytest.mark.parametrize(
+    "holdings, cash",
+    [
+        ([{"ticker": "AAPL", "weight": 0.5}, {"ticker": "MSFT", "weight": 0.3}, {"ticker": "SPY", "weight": 0.2}], None),
+        ([{"ticker": "AAPL", "shares": 10}, {"ticker": "MSFT", "shares": 5, "buy_date": "2020-06-01"}], 800.0),
+    ],
+)
+def test_append_matches_full_recompute(provider, holdings, cash):
+    portfolio = {"holdings": holdings}
+    if cash is not None:
+        portfolio["cash"] = cash
+
+    first = analyze_portfolio({"portfolio": portfolio, "date_range": {"start": "2020-01-01", "end": "2021-06-01"}})
+    appended = append_analysis({"analysis_id": first["analysis_id"], "end": "2021-09-01"})
+    appended = append_analysis({"analysis_id": first["analysis_id"], "end": "2022-06-01"})
+    full = analyze_portfolio({"portfolio": portfolio, "date_range": {"start": "2020-01-01", "end": "2022-06-01"}})
+
+    assert appended["appended"] > 0
+    assert appended["last_equity_date"] == full["equity_curve"][-1]["date"]
+    assert appended["equity_curve"][-1]["value"] == pytest.approx(full["equity_curve"][-1]["value"], abs=0.01)
+    for k, v in full["metrics"].items():
+        assert appended["metrics"][k] == pytest.approx(v, rel=1e-9, abs=1e-12), k
+
+    # The sub-window index is rebuilt over the extended returns
+    win = window_metrics({"analysis_id": first["analysis_id"]})
+    assert win["window"]["end"] == full["equity_curve"][-1]["date"]
+
+
+def test_append_without_new_rows_is_a_no_op(provider):
+    first = analyze_portfolio(
+        {
+            "portfolio": {"holdings": [{"ticker": "SPY", "weight": 1.0}]},
+            "date_range": {"start": "2020-01-01", "end": "2030-01-01"},
+        }
+    )
+    out = append_analysis({"analysis_id": first["analysis_id"], "end": "2030-06-01"})
+
+    assert out["appended"] == 0
+    assert out["equity_curve"] == []
+    assert out["metrics"]["sharpe_ratio"] == pytest.approx(first["metrics"]["sharpe_ratio"], rel=1e-9)
+
+
+def test_append_rejects_rebalanced_and_unknown_analyses(provider):
+    first = analyze_portfolio(
+        {
+            "portfolio": {"holdings": [{"ticker": "AAPL", "weight": 0.5}, {"ticker": "SPY", "weight": 0.5}]},
+            "date_range": {"start": "2020-01-01", "end": "2021-01-01"},
+            "rebalance": "monthly",
+        }
+    )
+    with pytest.raises(ValueError, match="cannot be extended"):
+        append_analysis({"analysis_id": first["analysis_id"]})
+    with pytest.raises(ValueError, match="not found"):
+        append_analysis({"analysis_id": "missing"})
+
+
+def test_append_never_stores_todays_bar(monkeypatch):
+    import services.analysis_service as svc
+    import services.append_service as app_svc
+
+    today = pd.Timestamp.today().normalize()
+    idx = pd.date_range(end=today, periods=120)  # includes a (possibly intraday) row for today
+    prices = pd.DataFrame({"SPY": np.linspace(100.0, 130.0, 120)}, index=idx)
+    calls = []
+
+    def fetch(tickers, start, end):
+        calls.append(end)
+        return _fake_fetch(prices)(tickers, start, end)
+
+    monkeypatch.setattr(svc, "fetch_price_history", fetch)
+    monkeypatch.setattr(app_svc, "fetch_price_history", fetch)
+
+    first = analyze_portfolio(
+        {
+            "portfolio": {"holdings": [{"ticker": "SPY", "weight": 1.0}]},
+            "date_range": {"start": idx[0].strftime("%Y-%m-%d"), "end": idx[100].strftime("%Y-%m-%d")},
+        }
+    )
+    out = append_analysis({"analysis_id": first["analysis_id"], "end": (today + pd.Timedelta(days=30)).strftime("%Y-%m-%d")})
+
+    assert calls[-1] == today.strftime("%Y-%m-%d")  # end is capped at today (exclusive)
+    assert out["last_equity_date"] == idx[-2].strftime("%Y-%m-%d")
+    assert append_analysis({"analysis_id": first["analysis_id"]})["appended"] == 0
+
+
+def test_append_surfaces_provider_errors(monkeypatch, provider):
+    import services.append_service as app_svc
+
+    first = analyze_portfolio(
+        {
+            "portfolio": {"holdings": [{"ticker": "SPY", "weight": 1.0}]},
+            "date_range": {"start": "2020-01-01", "end": "2021-01-01"},
+        }
+    )
+
+    def failing(tickers, start, end):
+        raise ValueError("Price download failed for 1 ticker(s): SPY")
+
+    monkeypatch.setattr(app_svc, "fetch_price_history", failing)
+    with pytest.raises(ValueError, match="download failed"):
+        append_analysis({"analysis_id": first["analysis_id"], "end": "2021-06-01"})
@@ -0,0 +1,127 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from engines.batch_engine import batch_portfolio_metrics
+from engines.portfolio_engine import prices_to_returns_array
+from services.analysis_service import _analyze_from_prices
+
+
+class DummyPH:
+    def __init__(self, prices: pd.DataFrame):
+        self.prices = prices
+
+
+@pytest.fixture
+def prices_df():
+    rng = np.random.default_rng(11)
+    idx = pd.bdate_range("2024-01-01", periods=300)
+    data = 100.0 * np.cumprod(1.0 + rng.normal(0.0004, 0.015, size=(300, 4)), axis=0)
+    prices = pd.DataFrame(data, index=idx, columns=["AAPL", "MSFT", "XOM", "TLT"])
+    prices.iloc[:20, 3] = np.nan  # one asset starts late
+    return prices
+
+
+@pytest.fixture
+def mock_fetch_price_history(monkeypatch, prices_df):
+    import services.batch_service as svc
+
+    def fake_fetch(tickers, start, end):
+        return DummyPH(prices_df)
+
+    monkeypatch.setattr(svc, "fetch_price_history", fake_fetch)
+
+
+def test_batch_metrics_match_single_portfolio_pipeline(prices_df):
+    weights = np.random.default_rng(3).random((25, 4))
+    weights[0] = [1.0, 0.0, 0.0, 0.0]
+
+    asset_r, rows = prices_to_returns_array(prices_df.to_numpy())
+    out = batch_portfolio_metrics(asset_r, weights, prices_df.index[rows])
+
+    for k in (0, 7, 24):
+        single = _analyze_from_prices(prices_df, dict(zip(prices_df.columns, weights[k])), 100_000.0)["metrics"]
+        for name, value in single.items():
+            assert out[name][k] == pytest.approx(value, rel=1e-9, abs=1e-12)
+
+
+def test_batch_metrics_rejects_zero_weight_rows(prices_df):
+    asset_r, rows = prices_to_returns_array(prices_df.to_numpy())
+
+    with pytest.raises(ValueError, match="row\\(s\\): 1"):
+        batch_portfolio_metrics(asset_r, np.array([[1.0, 0, 0, 0], [0, 0, 0, 0]]), prices_df.index[rows])
+
+
+def test_batch_metrics_evaluate_many_blocks(prices_df, monkeypatch):
+    import engines.batch_engine as be
+
+    monkeypatch.setattr(be, "_BLOCK_ELEMENTS", 300 * 3)  # force several blocks
+    asset_r, rows = prices_to_returns_array(prices_df.to_numpy())
+    weights = np.random.default_rng(5).random((10, 4))
+
+    blocked = be.batch_portfolio_metrics(asset_r, weights, prices_df.index[rows])
+    monkeypatch.setattr(be, "_BLOCK_ELEMENTS", 10**9)
+    whole = be.batch_portfolio_metrics(asset_r, weights, prices_df.index[rows])
+
+    for name in whole:
+        np.testing.assert_allclose(blocked[name], whole[name])
+
+
+def test_analyze_batch_endpoint(mock_fetch_price_history):
+    from app import create_app
+
+    client = create_app().test_client()
+    payload = {
+        "tickers": ["aapl", "MSFT", "XOM", "TLT"],
+        "weights": [[1, 1, 1, 1], [0.7, 0.3, 0, 0]],
+        "date_range": {"start": "2024-01-01", "end": "2025-02-01"},
+    }
+
+    res = client.post("/api/analyze_batch", json=payload)
+    assert res.status_code == 200
+    body = res.get_json()
+    assert body["count"] == 2
+    assert body["tickers"] == ["AAPL", "MSFT", "XOM", "TLT"]
+    assert set(body["metrics"]) == {"annualized_return", "annualized_volatility", "max_drawdown", "sharpe_ratio"}
+    assert all(len(v) == 2 for v in body["metrics"].values())
+
+    bad = client.post("/api/analyze_batch", json={**payload, "weights": [[1, 1]]})
+    assert bad.status_code == 400
+    assert "4 values" in bad.get_json()["error"]
+
+
+def test_single_return_window_has_zero_volatility(monkeypatch):
+    import json
+
+    import services.batch_service as svc
+    from app import create_app
+
+    prices = pd.DataFrame({"AAPL": [100.0, 101.0], "MSFT": [50.0, 49.0]}, index=pd.bdate_range("2024-01-02", periods=2))
+    monkeypatch.setattr(svc, "fetch_price_history", lambda tickers, start, end: DummyPH(prices))
+
+    res = create_app().test_client().post(
+        "/api/analyze_batch",
+        json={"tickers": ["AAPL", "MSFT"], "weights": [[1, 0], [0.5, 0.5]], "date_range": {"start": "2024-01-01", "end": "2024-01-04"}},
+    )
+    assert res.status_code == 200
+
+    def reject(token):
+        raise ValueError(f"invalid JSON constant {token}")
+
+    metrics = json.loads(res.get_data(as_text=True), parse_constant=reject)["metrics"]
+    assert metrics["annualized_volatility"] == [0.0, 0.0]
+    assert metrics["sharpe_ratio"] == [0.0, 0.0]
+
+
+def test_all_nan_ticker_column_is_rejected(monkeypatch):
+    import services.batch_service as svc
+    from services.batch_service import analyze_batch
+
+    prices = pd.DataFrame(
+        {"AAPL": [100.0, 101.0, 102.0], "ZZZZ": [np.nan] * 3}, index=pd.bdate_range("2024-01-02", periods=3)
+    )
+    monkeypatch.setattr(svc, "fetch_price_history", lambda tickers, start, end: DummyPH(prices))
+
+    payload = {"tickers": ["AAPL", "ZZZZ", "QQQQ"], "weights": [[1, 1, 1]], "date_range": {"start": "2024-01-01", "end": "2024-01-05"}}
+    with pytest.raises(ValueError, match="No market data for: ZZZZ, QQQQ"):
+        analyze_batch(payload)
@@ -0,0 +1,101 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from engines.buy_and_hold_engine import build_ledger, buy_and_hold_returns, forward_fill, holdings_value
+from services.analysis_service import analyze_portfolio
+
+
+class DummyPH:
+    def __init__(self, prices: pd.DataFrame):
+        self.prices = prices
+
+
+@pytest.fixture
+def prices_df():
+    idx = pd.to_datetime(["2025-01-02", "2025-01-03", "2025-01-06", "2025-01-07", "2025-01-08"])
+    return pd.DataFrame(
+        {"AAPL": [100.0, 110.0, 121.0, 110.0, 132.0], "MSFT": [200.0, np.nan, 180.0, 200.0, 220.0]},
+        index=idx,
+    )
+
+
+def _value(prices_df, trades, cash=0.0):
+    values = prices_df.to_numpy()
+    ledger, executed = build_ledger(values, prices_df.index, list(prices_df.columns), trades)
+    value, flows = holdings_value(values, ledger, cash)
+    return value, flows, executed
+
+
+def test_forward_fill_uses_last_known_price():
+    filled = forward_fill(np.array([[np.nan, 1.0], [2.0, np.nan], [np.nan, 3.0]]))
+    np.testing.assert_array_equal(filled, [[np.nan, 1.0], [2.0, 1.0], [2.0, 3.0]])
+
+
+def test_day_one_holdings_value_is_shares_dot_prices(prices_df):
+    value, flows, _ = _value(prices_df, [{"ticker": "AAPL", "shares": 10}, {"ticker": "MSFT", "shares": 5}])
+
+    filled = prices_df.ffill()
+    np.testing.assert_allclose(value, 10 * filled["AAPL"] + 5 * filled["MSFT"])
+    assert flows.tolist() == [2000.0, 0.0, 0.0, 0.0, 0.0]  # initial funding only
+
+    r, rows = buy_and_hold_returns(value, flows)
+    np.testing.assert_allclose(r, value[1:] / value[:-1] - 1.0)
+    assert rows.tolist() == [1, 2, 3, 4]
+
+
+def test_buy_date_snaps_to_next_priced_day(prices_df):
+    _, _, executed = _value(prices_df, [{"ticker": "MSFT", "shares": 1, "buy_date": "2025-01-03"}])
+
+    assert executed[0]["date"] == "2025-01-06"  # MSFT has no price on 01-03
+    assert executed[0]["price"] == pytest.approx(180.0)
+
+    with pytest.raises(ValueError, match="after the selected window"):
+        _value(prices_df, [{"ticker": "AAPL", "shares": 1, "buy_date": "2025-02-01"}])
+    with pytest.raises(ValueError, match="not found"):
+        _value(prices_df, [{"ticker": "XOM", "shares": 1}])
+
+
+def test_later_buy_is_a_contribution_not_a_gain(prices_df):
+    trades = [{"ticker": "AAPL", "shares": 10}, {"ticker": "MSFT", "shares": 10, "buy_date": "2025-01-06"}]
+    value, flows, _ = _value(prices_df, trades)
+
+    assert flows.tolist() == [1000.0, 0.0, 1800.0, 0.0, 0.0]
+    r, _ = buy_and_hold_returns(value, flows)
+    # 01-06: only AAPL moved (110 -> 121); the new MSFT position is not a return
+    assert r[1] == pytest.approx(0.10)
+
+
+def test_cash_funds_purchases_and_receives_sales(prices_df):
+    trades = [
+        {"ticker": "AAPL", "shares": 10, "buy_date": "2025-01-03"},
+        {"ticker": "AAPL", "shares": -10, "buy_date": "2025-01-07"},
+    ]
+    value, flows, _ = _value(prices_df, trades, cash=2000.0)
+
+    assert not flows.any()  # 1,100 of purchases fit in 2,000 of cash
+    # cash 900 + 10 AAPL until sold at 110 on 01-07, then all cash
+    np.testing.assert_allclose(value, [2000.0, 2000.0, 2110.0, 2000.0, 2000.0])
+
+
+def test_analyze_portfolio_shares_mode_is_buy_and_hold(monkeypatch, prices_df):
+    import services.analysis_service as svc
+
+    monkeypatch.setattr(svc, "fetch_price_history", lambda tickers, start, end: DummyPH(prices_df))
+    payload = {
+        "portfolio": {"holdings": [{"ticker": "AAPL", "shares": 10}, {"ticker": "MSFT", "shares": 5}]},
+        "date_range": {"start": "2025-01-02", "end": "2025-01-08"},
+    }
+
+    out = analyze_portfolio(payload)
+
+    # starting_cash defaults to the day-one value, so the curve is the actual holdings value
+    filled = prices_df.ffill()
+    expected = (10 * filled["AAPL"] + 5 * filled["MSFT"]).iloc[1:]
+    assert [p["value"] for p in out["equity_curve"]] == pytest.approx(expected.round(2).tolist())
+
+    payload["portfolio"]["holdings"][1]["buy_date"] = "2025-01-06"
+    out = analyze_portfolio(payload)
+    hb = out["holdings_breakdown"]
+    assert hb["trades"][1]["date"] == "2025-01-06"
+    assert hb["total_value"] == pytest.approx(1000.0 + 900.0)
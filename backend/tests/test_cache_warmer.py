@@ -0,0 +1,72 @@
+import threading
+
+import pandas as pd
+import pytest
+
+from services.cache_warmer import CacheWarmer
+
+
+class DummyPH:
+    def __init__(self, prices: pd.DataFrame):
+        self.prices = prices
+
+
+class FakeFetch:
+    def __init__(self, bad=()):
+        self.bad = set(bad)
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def __call__(self, tickers, start, end):
+        with self._lock:
+            self.calls.append((list(tickers), start, end))
+        idx = pd.to_datetime(["2025-01-02"])
+        good = [t for t in tickers if t not in self.bad]
+        if not good:
+            raise ValueError("No price data returned (bad tickers or empty date range).")
+        return DummyPH(pd.DataFrame({t: [1.0] for t in good}, index=idx))
+
+
+def test_warmup_fetches_all_tickers_in_chunks_and_reports_progress():
+    fetch = FakeFetch(bad={"ZZZZ"})
+    w = CacheWarmer(["spy", "QQQ", "AAPL", "ZZZZ", "MSFT"], lookback_days=30, refresh_seconds=0, fetch=fetch, chunk_size=2)
+
+    assert w.status()["state"] == "idle"
+    w.start()
+    w.join(timeout=5)
+
+    st = w.status()
+    assert st["state"] == "done"
+    assert st["ready"] is True
+    assert st["progress"] == pytest.approx(1.0)
+    assert st["tickers_done"] == 5
+    assert st["failed"] == ["ZZZZ"]
+    assert [c[0] for c in fetch.calls] == [["AAPL", "MSFT"], ["QQQ", "SPY"], ["ZZZZ"]]
+
+
+def test_refresh_latest_fetches_recent_window():
+    fetch = FakeFetch()
+    w = CacheWarmer(["SPY"], lookback_days=30, refresh_seconds=0, fetch=fetch)
+
+    w.refresh_latest()
+
+    tickers, start, end = fetch.calls[-1]
+    assert tickers == ["SPY"]
+    assert pd.Timestamp(end) - pd.Timestamp(start) <= pd.Timedelta(days=8)
+    assert w.status()["refreshes"] == 1
+
+
+def test_periodic_refresh_runs_until_stopped():
+    fetch = FakeFetch()
+    w = CacheWarmer(["SPY"], lookback_days=30, refresh_seconds=0.01, fetch=fetch)
+
+    w.start()
+    deadline = threading.Event()
+    for _ in range(200):
+        if w.status()["refreshes"] >= 2:
+            break
+        deadline.wait(0.01)
+    w.stop(timeout=5)
+
+    assert w.status()["state"] == "refreshing"
+    assert w.status()["refreshes"] >= 2
@@ -0,0 +1,200 @@
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+from providers.chunked import ChunkedDownloader
+from providers.market_data import YFinanceProvider
+from providers.price_cache import PartialDownloadError
+
+
+IDX = pd.to_datetime(["2025-01-02", "2025-01-03"])
+
+
+class RecordingDownloader:
+    def __init__(self, delay=0.0, fail_on=()):
+        self.delay = delay
+        self.fail_on = set(fail_on)
+        self.calls = []
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, tickers, start, end):
+        with self._lock:
+            self.calls.append(list(tickers))
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            time.sleep(self.delay)
+            if self.fail_on & set(tickers):
+                raise RuntimeError("chunk failed")
+            return pd.DataFrame({t: [1.0, 2.0] for t in tickers}, index=IDX)
+        finally:
+            with self._lock:
+                self.active -= 1
+
+
+def _tickers(n):
+    return [f"T{i:03d}" for i in range(n)]
+
+
+def test_small_requests_go_straight_through():
+    dl = RecordingDownloader()
+    out = ChunkedDownloader(dl, chunk_size=10)(_tickers(5), "2025-01-01", "2025-01-10")
+
+    assert dl.calls == [_tickers(5)]
+    assert list(out.columns) == _tickers(5)
+
+
+def test_large_request_is_split_and_fetched_concurrently():
+    dl = RecordingDownloader(delay=0.05)
+    cd = ChunkedDownloader(dl, chunk_size=10, max_concurrency=3)
+
+    out = cd(_tickers(45), "2025-01-01", "2025-01-10")
+
+    assert sorted(len(c) for c in dl.calls) == [5, 10, 10, 10, 10]
+    assert dl.max_active <= 3
+    assert dl.max_active > 1
+    assert list(out.columns) == _tickers(45)
+    assert out.shape == (2, 45)
+
+    stats = cd.stats()
+    assert stats["chunks"] == 5
+    assert len(stats["recent"][-1]["chunks"]) == 5
+
+
+def test_failed_chunk_returns_partial_result():
+    dl = RecordingDownloader(fail_on={"T012"})
+    cd = ChunkedDownloader(dl, chunk_size=10, max_concurrency=2)
+
+    with pytest.raises(PartialDownloadError) as exc:
+        cd(_tickers(25), "2025-01-01", "2025-01-10")
+
+    assert exc.value.failed == _tickers(20)[10:20]
+    assert "T012" not in exc.value.prices.columns
+    assert "T000" in exc.value.prices.columns
+    assert cd.stats()["chunk_failures"] == 1
+
+
+def test_all_chunks_failing_raises_original_error():
+    dl = RecordingDownloader(fail_on=set(_tickers(20)))
+    with pytest.raises(RuntimeError, match="chunk failed"):
+        ChunkedDownloader(dl, chunk_size=10)(_tickers(20), "2025-01-01", "2025-01-10")
+
+
+def test_chunk_partial_failure_keeps_its_successful_tickers():
+    def dl(tickers, start, end):
+        ok = [t for t in tickers if t != "T003"]
+        frame = pd.DataFrame({t: [1.0, 2.0] for t in ok}, index=IDX)
+        if len(ok) < len(tickers):
+            raise PartialDownloadError(frame, ["T003"], RuntimeError("no data"))
+        return frame
+
+    with pytest.raises(PartialDownloadError) as exc:
+        ChunkedDownloader(dl, chunk_size=2)(_tickers(6), "2025-01-01", "2025-01-10")
+
+    assert exc.value.failed == ["T003"]
+    assert list(exc.value.prices.columns) == ["T000", "T001", "T002", "T004", "T005"]
+    assert isinstance(exc.value.cause, RuntimeError)
+
+
+def test_yfinance_provider_reports_failed_chunks_without_cache(monkeypatch):
+    monkeypatch.setenv("PRICE_CACHE_ENABLED", "0")
+    dl = RecordingDownloader(fail_on={"T000"})
+    p = YFinanceProvider(downloader=dl, gather_seconds=0.0, chunk_size=5, max_concurrency=2)
+
+    with pytest.raises(ValueError, match="5 ticker\\(s\\): T000, T001, T002, T003, T004"):
+        p.fetch_price_history(_tickers(12), "2025-01-01", "2025-01-10")
+    assert p.stats()["chunking"]["chunk_failures"] == 1
+
+
+def test_yfinance_provider_reports_failed_tickers_with_cache(monkeypatch, tmp_path):
+    import providers.price_cache as pc
+
+    monkeypatch.setenv("PRICE_CACHE_ENABLED", "1")
+    monkeypatch.setenv("PRICE_CACHE_PATH", str(tmp_path / "prices.sqlite3"))
+    monkeypatch.setattr(pc, "_cache", None)
+    p = YFinanceProvider(downloader=RecordingDownloader(fail_on={"T000"}), gather_seconds=0.0, chunk_size=5)
+
+    with pytest.raises(ValueError, match="T000, T001, T002, T003, T004"):
+        p.fetch_price_history(_tickers(12), "2025-01-01", "2025-01-10")
+
+
+def test_chunk_timeout_falls_back_to_stale_cache(monkeypatch, tmp_path):
+    import providers.price_cache as pc
+    from providers.hedging import ProviderTimeout
+
+    monkeypatch.setenv("PRICE_CACHE_PATH", str(tmp_path / "prices.sqlite3"))
+    monkeypatch.setattr(pc, "_cache", None)
+
+    def slow_second_chunk(tickers, start, end):
+        if "T002" in tickers and end > "2025-01-03":
+            time.sleep(0.3)
+        frame = pd.DataFrame({t: [1.0, 2.0] for t in tickers}, index=IDX)
+        return frame[(frame.index >= start) & (frame.index < end)]
+
+    p = YFinanceProvider(downloader=slow_second_chunk, gather_seconds=0.0, deadline_seconds=0.1, hedge=False, chunk_size=2)
+    p.fetch_price_history(_tickers(4), "2025-01-01", "2025-01-03")  # caches 2025-01-02 only
+    prices = p.fetch_price_history(_tickers(4), "2025-01-01", "2025-01-10").prices
+
+    assert list(prices.columns) == _tickers(4)
+    assert prices.loc["2025-01-03", "T000"] == 2.0  # fresh
+    assert prices["T002"].notna().sum() == 1  # stale, served from disk
+    assert pc.get_price_cache().stats()["stale_served"] == 1
+
+    monkeypatch.setenv("PRICE_CACHE_ENABLED", "0")
+    with pytest.raises(ProviderTimeout):
+        p.fetch_price_history(_tickers(4), "2025-01-01", "2025-01-10")
+
+
+class FakeTicker:
+    """Stands in for yf.Ticker: each history() call sleeps, then returns its own tz-aware frame."""
+
+    delay = 0.0
+    fail = frozenset()
+
+    def __init__(self, ticker):
+        self.ticker = ticker
+
+    def history(self, start, end, **kwargs):
+        time.sleep(self.delay)
+        if self.ticker in self.fail:
+            raise RuntimeError(f"{self.ticker}: no data")
+        idx = IDX.tz_localize("America/New_York")
+        return pd.DataFrame({"Close": float(self.ticker[1:]), "Volume": 1}, index=idx)
+
+
+def test_yfinance_chunks_run_in_parallel_within_their_deadline(monkeypatch):
+    import providers.market_data as md
+
+    monkeypatch.setenv("PRICE_CACHE_ENABLED", "0")
+    monkeypatch.setattr(FakeTicker, "delay", 0.3)
+    monkeypatch.setattr(md.yf, "Ticker", FakeTicker)
+    p = YFinanceProvider(gather_seconds=0.0, deadline_seconds=0.5, hedge=False, chunk_size=2, max_concurrency=4)
+
+    prices = p.fetch_price_history(_tickers(8), "2025-01-01", "2025-01-10").prices
+
+    assert list(prices.columns) == _tickers(8)
+    assert list(prices.index) == list(IDX)  # exchange-local dates, tz dropped
+    for t in _tickers(8):
+        assert (prices[t] == float(t[1:])).all(), t
+    assert p.stats()["chunking"]["chunk_failures"] == 0
+
+
+def test_yfinance_backend_reports_failing_tickers(monkeypatch):
+    import providers.market_data as md
+
+    monkeypatch.setenv("PRICE_CACHE_ENABLED", "0")
+    monkeypatch.setattr(FakeTicker, "fail", frozenset({"T001"}))
+    monkeypatch.setattr(md.yf, "Ticker", FakeTicker)
+
+    with pytest.raises(PartialDownloadError) as exc:
+        md._download_closes(_tickers(3), "2025-01-01", "2025-01-10")
+    assert exc.value.failed == ["T001"]
+    assert list(exc.value.prices.columns) == ["T000", "T002"]
+
+    p = YFinanceProvider(gather_seconds=0.0, hedge=False)
+    with pytest.raises(ValueError, match="1 ticker\\(s\\): T001"):
+        p.fetch_price_history(_tickers(3), "2025-01-01", "2025-01-10")
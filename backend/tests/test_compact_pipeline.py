@@ -0,0 +1,109 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from engines.portfolio_engine import (
+    portfolio_returns,
+    portfolio_returns_array,
+    portfolio_weight_vector,
+    prices_to_returns,
+    prices_to_returns_array,
+)
+from engines.price_matrix import PriceMatrix
+from engines.scenario_engine import (
+    apply_price_shock,
+    apply_price_shock_matrix,
+    apply_regime_shift,
+    apply_regime_shift_matrix,
+    apply_shock_with_linear_rebound,
+    apply_shock_with_linear_rebound_matrix,
+)
+from providers.synthetic_provider import SyntheticProvider
+from services.analysis_service import _analyze_from_prices
+
+
+@pytest.fixture(scope="module")
+def wide_prices():
+    prices = SyntheticProvider(seed=7).get_closes([f"S{i:03d}" for i in range(30)], "2003-01-01", "2024-01-01")
+    prices.iloc[10:40, 2] = np.nan  # late listing
+    prices.iloc[2000, 5] = np.nan  # missing day
+    return prices
+
+
+def test_price_matrix_is_contiguous_float32(wide_prices):
+    pm = PriceMatrix.from_frame(wide_prices)
+    assert pm.values.dtype == np.float32
+    assert pm.values.flags["C_CONTIGUOUS"]
+    assert pm.values.nbytes * 2 == wide_prices.to_numpy().nbytes
+    assert pm.dates.equals(wide_prices.index)
+
+
+def test_array_returns_match_dataframe_returns():
+    idx = pd.to_datetime(["2025-01-02", "2025-01-03", "2025-01-06", "2025-01-07"])
+    prices = pd.DataFrame({"A": [np.nan, np.nan, 10.0, 11.0], "B": [np.nan, 5.0, 5.5, np.nan]}, index=idx)
+
+    expected = prices_to_returns(prices)
+    returns, rows = prices_to_returns_array(prices.to_numpy())
+
+    assert prices.index[rows].equals(expected.index)
+    np.testing.assert_allclose(returns, expected.to_numpy(), equal_nan=True)
+
+
+def test_array_portfolio_returns_match_series_version():
+    idx = pd.to_datetime(["2025-01-02", "2025-01-03"])
+    asset_r = pd.DataFrame({"AAPL": [0.10, None], "MSFT": [None, 0.20], "XOM": [0.5, 0.5]}, index=idx)
+    weights = {"aapl": 1.0, "MSFT": 3.0}
+
+    w = portfolio_weight_vector(list(asset_r.columns), weights)
+    out = portfolio_returns_array(asset_r.to_numpy(), w)
+
+    np.testing.assert_allclose(out, portfolio_returns(asset_r, weights).to_numpy())
+    with pytest.raises(ValueError, match="None of the portfolio tickers exist"):
+        portfolio_weight_vector(["XOM"], weights)
+
+
+def test_compact_analysis_within_documented_tolerance(wide_prices):
+    weights = {t: 1.0 + i % 3 for i, t in enumerate(wide_prices.columns)}
+
+    full = _analyze_from_prices(wide_prices, weights, 100_000.0, return_artifacts=True)
+    compact = _analyze_from_prices(wide_prices, weights, 100_000.0, return_artifacts=True, compact=True)
+
+    assert [p["date"] for p in compact["equity_curve"]] == [p["date"] for p in full["equity_curve"]]
+    a = np.array([p["value"] for p in full["equity_curve"]])
+    b = np.array([p["value"] for p in compact["equity_curve"]])
+    np.testing.assert_allclose(b, a, rtol=1e-6)
+
+    for k in ("annualized_return", "annualized_volatility", "max_drawdown"):
+        assert compact["metrics"][k] == pytest.approx(full["metrics"][k], abs=1e-6)
+    assert compact["metrics"]["sharpe_ratio"] == pytest.approx(full["metrics"]["sharpe_ratio"], abs=1e-5)
+
+    port_r = compact["_artifacts"]["portfolio_returns"]
+    assert port_r.dtype == np.float64
+    assert port_r.index.equals(full["_artifacts"]["portfolio_returns"].index)
+
+
+@pytest.mark.parametrize(
+    "frame_fn, matrix_fn, kwargs",
+    [
+        (apply_price_shock, apply_price_shock_matrix, {"shock_pct": -0.2}),
+        (apply_shock_with_linear_rebound, apply_shock_with_linear_rebound_matrix, {"shock_pct": -0.2, "rebound_days": 15}),
+        (apply_regime_shift, apply_regime_shift_matrix, {"vol_mult": 1.5, "drift_shift": -0.0005}),
+    ],
+)
+def test_matrix_scenarios_match_dataframe_scenarios(wide_prices, frame_fn, matrix_fn, kwargs):
+    expected = frame_fn(wide_prices, "2010-03-06", **kwargs)
+
+    exact = matrix_fn(PriceMatrix.from_frame(wide_prices, dtype=np.float64), "2010-03-06", **kwargs).to_frame()
+    np.testing.assert_allclose(exact.to_numpy(), expected.to_numpy(), rtol=1e-12, equal_nan=True)
+
+    compact = matrix_fn(PriceMatrix.from_frame(wide_prices), "2010-03-06", **kwargs)
+    assert compact.values.dtype == np.float32
+    np.testing.assert_allclose(compact.values, expected.to_numpy(), rtol=1e-6, equal_nan=True)
+
+
+def test_matrix_scenarios_leave_input_untouched(wide_prices):
+    pm = PriceMatrix.from_frame(wide_prices)
+    before = pm.values.copy()
+    apply_price_shock_matrix(pm, "2010-03-06", -0.5)
+    apply_regime_shift_matrix(pm, "2010-03-06", 2.0, -0.001)
+    np.testing.assert_array_equal(pm.values, before)
@@ -0,0 +1,101 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from engines.drawdown_engine import drawdown_episodes, underwater_durations
+from engines.stochastic_engine import summarize_drawdown_metrics
+from services.stress_service import analyze_with_shock
+
+
+class DummyPH:
+    def __init__(self, prices: pd.DataFrame):
+        self.prices = prices
+
+
+def _brute_force_episodes(v: np.ndarray) -> list[tuple[int, int, int | None, float]]:
+    """(peak row, trough row, recovery row, depth) by walking the curve."""
+    episodes, peak_row, trough_row = [], 0, None
+    for t in range(1, len(v)):
+        if v[t] >= v[peak_row]:
+            if trough_row is not None:
+                episodes.append((peak_row, trough_row, t, v[trough_row] / v[peak_row] - 1.0))
+                trough_row = None
+            peak_row = t
+        elif trough_row is None or v[t] < v[trough_row]:
+            trough_row = t
+    if trough_row is not None:
+        episodes.append((peak_row, trough_row, None, v[trough_row] / v[peak_row] - 1.0))
+    return sorted(episodes, key=lambda e: e[3])
+
+
+def test_known_curve_episodes():
+    dates = pd.bdate_range("2024-01-01", periods=9)
+    curve = np.array([100.0, 120.0, 90.0, 100.0, 120.0, 125.0, 110.0, 100.0, 105.0])
+
+    out = drawdown_episodes(curve, dates, top_n=5)
+
+    assert [e["depth"] for e in out] == pytest.approx([-0.25, -0.2])
+    first, second = out
+    assert (first["peak_date"], first["trough_date"], first["recovery_date"]) == ("2024-01-02", "2024-01-03", "2024-01-05")
+    assert (first["length"], first["decline_length"], first["recovery_length"]) == (3, 1, 2)
+    assert first["days_under_water"] == 3
+    assert second["recovery_date"] is None  # still under water at the end
+    assert (second["length"], second["decline_length"], second["recovery_length"]) == (3, 2, None)
+
+
+def test_episodes_match_brute_force():
+    rng = np.random.default_rng(19)
+    curve = 100.0 * np.cumprod(1.0 + rng.normal(0.0002, 0.015, 2000))
+    dates = pd.bdate_range("2015-01-01", periods=2000)
+
+    out = drawdown_episodes(curve, dates, top_n=10)
+    expected = _brute_force_episodes(curve)[:10]
+
+    assert len(out) == 10
+    for got, (p, t, r, depth) in zip(out, expected):
+        assert got["peak_date"] == dates[p].strftime("%Y-%m-%d")
+        assert got["trough_date"] == dates[t].strftime("%Y-%m-%d")
+        assert got["recovery_date"] == (None if r is None else dates[r].strftime("%Y-%m-%d"))
+        assert got["depth"] == pytest.approx(depth, rel=1e-12)
+
+    assert drawdown_episodes(np.linspace(1.0, 2.0, 50), dates[:50]) == []
+
+
+def test_path_durations():
+    paths = np.array(
+        [
+            [100.0, 90.0, 80.0, 95.0, 101.0, 99.0],  # under for 3 steps, then 1
+            [100.0, 101.0, 102.0, 103.0, 104.0, 105.0],  # never under
+            [100.0, 99.0, 98.0, 97.0, 96.0, 95.0],  # under from step 1 on
+        ]
+    )
+    longest, fraction = underwater_durations(paths)
+    np.testing.assert_array_equal(longest, [3, 0, 5])
+    np.testing.assert_allclose(fraction, [4 / 6, 0.0, 5 / 6])
+
+    out = summarize_drawdown_metrics(paths)
+    assert out["median_max_duration"] == 3.0
+    assert out["mean_time_under_water"] == pytest.approx(0.5)
+
+
+def test_analyze_with_shock_lists_episodes(monkeypatch):
+    import services.stress_service as svc
+
+    rng = np.random.default_rng(7)
+    idx = pd.bdate_range("2022-01-03", periods=300)
+    prices = pd.DataFrame({"SPY": 100.0 * np.cumprod(1.0 + rng.normal(0.002, 0.012, 300))}, index=idx)
+    monkeypatch.setattr(svc, "fetch_price_history", lambda tickers, start, end: DummyPH(prices))
+
+    out = analyze_with_shock(
+        {
+            "portfolio": {"holdings": [{"ticker": "SPY", "weight": 1.0}]},
+            "date_range": {"start": "2022-01-03", "end": "2023-03-01"},
+            "shock": {"type": "permanent", "date": "2022-06-01", "pct": -0.3},
+            "top_drawdowns": 3,
+        }
+    )
+
+    assert len(out["baseline"]["drawdowns"]) == 3
+    assert out["baseline"]["drawdowns"][0]["depth"] == pytest.approx(out["baseline"]["metrics"]["max_drawdown"])
+    assert out["scenario"]["drawdowns"][0]["depth"] == pytest.approx(out["scenario"]["metrics"]["max_drawdown"])
+    assert out["scenario"]["drawdowns"][0]["depth"] < out["baseline"]["drawdowns"][0]["depth"]
@@ -71,6 +71,16 @@ def test_forecast_from_returns_mean_shapes_and_continuity(port_returns_uptrend):
     assert float(fc[0]["value"]) == pytest.approx(expected_first_fc, abs=1e-9)
 
 
+def test_forecast_from_returns_dates_land_on_exchange_sessions():
+    idx = pd.to_datetime(["2025-06-30", "2025-07-01", "2025-07-02"])
+    port_r = pd.Series([0.01, 0.01, 0.01], index=idx)
+
+    out = fe._forecast_from_returns(port_r=port_r, starting_cash=100.0, forecast_days=3, mode="mean")
+
+    # Jul 4th is a holiday and Jul 5/6 a weekend
+    assert [p["date"] for p in out["forecast_equity_curve"]] == ["2025-07-03", "2025-07-07", "2025-07-08"]
+
+
 def test_forecast_from_returns_invalid_days_raises(port_returns_uptrend):
     with pytest.raises(ValueError, match="forecast_days must be > 0"):
         fe._forecast_from_returns(
@@ -491,4 +501,33 @@ def test_forecast_summary_days_to_target_none_when_never_hit():
     fc = _make_curve("2025-01-02", [101.0, 102.0, 103.0])
 
     out = forecast_summary(hist_curve=hist, forecast_curve=fc, target_multiple=1.10)
-    assert out["days_to_target_multiple"] is None
\ No newline at end of file
+    assert out["days_to_target_multiple"] is None
+
+def test_forecast_endpoint_stochastic_seed_is_reproducible(client, port_returns_mixed):
+    analysis_id = _seed_analysis_in_store(port_returns_mixed)
+
+    def run(seed=None):
+        forecast = {"type": "stochastic", "days": 20, "simulations": 3000}
+        if seed is not None:
+            forecast["seed"] = seed
+        resp = client.post("/api/forecast", json={"analysis_id": analysis_id, "forecast": forecast})
+        assert resp.status_code == 200
+        return resp.get_json()
+
+    first, second = run(seed=123), run(seed=123)
+    assert first["inputs"]["forecast"]["seed"] == 123
+    assert first["forecast_paths"] == second["forecast_paths"]
+    assert first["terminal"] == second["terminal"]
+
+    assert run(seed=124)["forecast_paths"] != first["forecast_paths"]
+
+    # Without a seed one is picked and echoed; replaying it reproduces the bands
+    unseeded = run()
+    replay = run(seed=unseeded["inputs"]["forecast"]["seed"])
+    assert replay["forecast_paths"] == unseeded["forecast_paths"]
+
+    resp = client.post(
+        "/api/forecast",
+        json={"analysis_id": analysis_id, "forecast": {"type": "stochastic", "seed": -1}},
+    )
+    assert resp.status_code == 400
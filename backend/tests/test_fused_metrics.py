@@ -0,0 +1,62 @@
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import engines.analytics_engine as ae
+
+
+def _pandas_reference(r: pd.Series, starting_cash: float, rf: float) -> dict[str, float]:
+    """The metric definitions as plain pandas operations."""
+    curve = (1.0 + r).cumprod() * starting_cash
+    excess = r - rf / 252
+    days = (curve.index[-1] - curve.index[0]).days
+    return {
+        "annualized_return": (curve.iloc[-1] / curve.iloc[0]) ** (365.25 / days) - 1.0,
+        "annualized_volatility": float(r.std(ddof=1)) * math.sqrt(252),
+        "max_drawdown": float((curve / curve.cummax() - 1.0).min()),
+        "sharpe_ratio": float(excess.mean() / excess.std(ddof=1) * math.sqrt(252)),
+    }
+
+
+@pytest.mark.parametrize("block", [7, 64, 65_536])
+def test_fused_metrics_match_pandas_across_blocks(monkeypatch, block):
+    monkeypatch.setattr(ae, "_FUSED_BLOCK", block)
+    rng = np.random.default_rng(17)
+    r = pd.Series(rng.normal(0.0004, 0.015, 3000), index=pd.bdate_range("2010-01-01", periods=3000))
+
+    out = ae.fused_metrics_array(r.to_numpy(), 5000.0, r.index, risk_free_rate_annual=0.02)
+    expected = _pandas_reference(r, 5000.0, 0.02)
+
+    assert out["count"] == 3000
+    assert out["final_value"] == pytest.approx(5000.0 * float((1.0 + r).prod()), rel=1e-12)
+    for k, v in expected.items():
+        assert out[k] == pytest.approx(v, rel=1e-10), k
+
+
+def test_fused_metrics_skip_nans_like_pandas(monkeypatch):
+    monkeypatch.setattr(ae, "_FUSED_BLOCK", 16)
+    rng = np.random.default_rng(3)
+    r = pd.Series(rng.normal(0.0, 0.01, 200), index=pd.bdate_range("2020-01-01", periods=200))
+    r.iloc[[5, 16, 17, 120]] = np.nan
+
+    assert ae.annualized_volatility(r) == pytest.approx(float(r.std(ddof=1)) * math.sqrt(252), rel=1e-12)
+    assert ae.sharpe_ratio(r) == pytest.approx(float(r.mean() / r.std(ddof=1)) * math.sqrt(252), rel=1e-10)
+
+    curve = (1.0 + r).cumprod()
+    assert ae.max_drawdown(curve) == pytest.approx(float((curve / curve.cummax() - 1.0).min()), rel=1e-12)
+
+
+def test_fused_metrics_degenerate_inputs():
+    empty = ae.fused_metrics_array(np.empty(0))
+    assert empty["count"] == 0
+    assert empty["annualized_volatility"] == 0.0 and empty["sharpe_ratio"] == 0.0
+
+    single = ae.fused_metrics_array(np.array([0.01]))
+    assert math.isnan(single["annualized_volatility"])  # like pandas std of one value
+    assert single["sharpe_ratio"] == 0.0
+
+    flat = ae.fused_metrics_array(np.full(500, 0.001, dtype=np.float32))
+    assert flat["sharpe_ratio"] == 0.0  # zero variance
+    assert flat["annualized_return"] == 0.0  # no dates given
@@ -0,0 +1,115 @@
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+from providers.hedging import HedgedDownloader, LatencyHistogram, ProviderTimeout
+
+
+class ScriptedDownloader:
+    """Attempt k sleeps delays[k] seconds (last delay repeats)."""
+
+    def __init__(self, delays):
+        self.delays = list(delays)
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, tickers, start, end):
+        with self._lock:
+            k = self.calls
+            self.calls += 1
+        time.sleep(self.delays[min(k, len(self.delays) - 1)])
+        return pd.DataFrame({t: [float(k)] for t in tickers}, index=pd.to_datetime(["2025-01-02"]))
+
+
+def test_fast_call_is_not_hedged():
+    dl = ScriptedDownloader([0.0])
+    h = HedgedDownloader(dl, deadline_seconds=1.0, initial_hedge_seconds=0.2)
+
+    out = h(["AAPL"], "2025-01-01", "2025-01-10")
+
+    assert out["AAPL"].iloc[0] == 0.0
+    assert dl.calls == 1
+    assert h.stats()["hedges_sent"] == 0
+
+
+def test_slow_first_attempt_is_hedged_and_second_wins():
+    dl = ScriptedDownloader([0.5, 0.0])
+    h = HedgedDownloader(dl, deadline_seconds=2.0, initial_hedge_seconds=0.05)
+
+    t0 = time.perf_counter()
+    out = h(["AAPL"], "2025-01-01", "2025-01-10")
+    elapsed = time.perf_counter() - t0
+
+    assert out["AAPL"].iloc[0] == 1.0  # result of the hedge
+    assert elapsed < 0.4
+    stats = h.stats()
+    assert stats["hedges_sent"] == 1
+    assert stats["hedges_won"] == 1
+
+
+def test_deadline_raises_provider_timeout():
+    dl = ScriptedDownloader([0.5])
+    h = HedgedDownloader(dl, deadline_seconds=0.1, hedge=False)
+
+    with pytest.raises(ProviderTimeout):
+        h(["AAPL"], "2025-01-01", "2025-01-10")
+
+    assert h.stats()["timeouts"] == 1
+
+
+def test_queued_attempts_are_cancelled_at_the_deadline():
+    dl = ScriptedDownloader([0.3])
+    h = HedgedDownloader(dl, deadline_seconds=0.1, initial_hedge_seconds=0.02, max_workers=1)
+
+    with pytest.raises(ProviderTimeout):
+        h(["AAPL"], "2025-01-01", "2025-01-10")
+    time.sleep(0.4)
+
+    assert h.stats()["hedges_sent"] == 1
+    assert dl.calls == 1  # the hedge never got a worker and was dropped
+
+
+def test_errors_propagate():
+    def broken(tickers, start, end):
+        raise RuntimeError("boom")
+
+    h = HedgedDownloader(broken, deadline_seconds=1.0)
+    with pytest.raises(RuntimeError, match="boom"):
+        h(["AAPL"], "2025-01-01", "2025-01-10")
+
+
+def test_latency_histogram_buckets_and_percentiles():
+    hist = LatencyHistogram()
+    for ms in (10, 30, 30, 200, 20000):
+        hist.record(ms)
+
+    d = hist.to_dict()
+    assert d["count"] == 5
+    assert d["buckets"]["le_25ms"] == 1
+    assert d["buckets"]["le_50ms"] == 2
+    assert d["buckets"]["le_250ms"] == 1
+    assert d["buckets"]["gt_10000ms"] == 1
+    assert d["p50_ms"] == pytest.approx(30.0)
+
+
+def test_stats_group_latency_by_ticker_count():
+    dl = ScriptedDownloader([0.0])
+    h = HedgedDownloader(dl, deadline_seconds=1.0)
+
+    h(["AAPL"], "2025-01-01", "2025-01-10")
+    h(["A", "B", "C"], "2025-01-01", "2025-01-10")
+
+    by_size = h.stats()["latency_by_ticker_count"]
+    assert by_size["1"]["count"] == 1
+    assert by_size["2-5"]["count"] == 1
+
+
+def test_yfinance_backend_is_hedged_unless_disabled(monkeypatch):
+    from providers.market_data import YFinanceProvider
+
+    monkeypatch.setenv("PRICE_FETCH_HEDGE", "1")
+    assert YFinanceProvider().stats()["provider_calls"]["hedging"] is True
+    monkeypatch.setenv("PRICE_FETCH_HEDGE", "0")
+    assert YFinanceProvider().stats()["provider_calls"]["hedging"] is False
@@ -0,0 +1,136 @@
+import pandas as pd
+import pytest
+
+from services.holdings_service import validate_holding, validate_holdings_batch
+
+
+class DummyPH:
+    def __init__(self, prices: pd.DataFrame):
+        self.prices = prices
+
+
+@pytest.fixture
+def prices_df():
+    # 2025-01-04/05 is a weekend
+    idx = pd.to_datetime(["2025-01-02", "2025-01-03", "2025-01-06", "2025-01-07", "2025-03-03"])
+    return pd.DataFrame(
+        {
+            "AAPL": [100.0, 101.0, 102.0, 103.0, 150.0],
+            "MSFT": [200.0, 201.0, 202.0, 203.0, 250.0],
+        },
+        index=idx,
+    )
+
+
+@pytest.fixture
+def fetch_calls(monkeypatch, prices_df):
+    import services.holdings_service as svc
+
+    calls = []
+
+    def fake_fetch(tickers, start, end):
+        tickers = sorted(tickers)
+        calls.append((tickers, start, end))
+        cols = [t for t in tickers if t in prices_df.columns]
+        if not cols:
+            raise ValueError("No price data returned (bad tickers or empty date range).")
+        mask = (prices_df.index >= start) & (prices_df.index < end)
+        return DummyPH(prices_df.loc[mask, cols])
+
+    monkeypatch.setattr(svc, "fetch_price_history", fake_fetch)
+    return calls
+
+
+def test_validate_holding_snaps_to_next_trading_day(fetch_calls):
+    out = validate_holding({"ticker": "aapl", "buy_date": "2025-01-04"})
+
+    assert out["valid"] is True
+    assert out["as_of"] == "2025-01-06"
+    assert out["price"] == pytest.approx(102.0)
+    assert "used next trading day 2025-01-06" in out["note"]
+
+    # the session comes from the trading calendar; only that day's price is fetched
+    assert fetch_calls == [(["AAPL"], "2025-01-06", "2025-01-07")]
+
+
+def test_validate_holding_falls_back_to_lookahead_when_session_has_no_price(fetch_calls, prices_df):
+    # 2025-01-02 is a session but pretend AAPL was halted that day
+    prices_df.loc["2025-01-02", "AAPL"] = float("nan")
+
+    out = validate_holding({"ticker": "AAPL", "buy_date": "2025-01-02"})
+
+    assert out["as_of"] == "2025-01-03"
+    assert len(fetch_calls) == 2
+    assert fetch_calls[1][1:] == ("2025-01-02", "2025-01-09")
+
+
+def test_validate_holding_skips_fetch_when_no_session_in_window(fetch_calls):
+    out = validate_holding({"ticker": "AAPL", "buy_date": "2025-01-04", "lookahead_days": 1})
+
+    assert out["valid"] is False
+    assert out["reason"] == "no price data returned in lookahead window"
+    assert fetch_calls == []
+
+
+def test_validate_holding_rejects_bad_date(fetch_calls):
+    with pytest.raises(ValueError, match="buy_date must be YYYY-MM-DD"):
+        validate_holding({"ticker": "AAPL", "buy_date": "01/04/2025"})
+
+
+def test_batch_resolves_nearby_windows_with_one_fetch(fetch_calls):
+    out = validate_holdings_batch(
+        {
+            "holdings": [
+                {"ticker": "AAPL", "buy_date": "2025-01-02"},
+                {"ticker": "MSFT", "buy_date": "2025-01-04"},
+                {"ticker": "AAPL", "buy_date": "2025-01-07"},
+            ]
+        }
+    )
+
+    assert len(fetch_calls) == 1
+    assert fetch_calls[0][0] == ["AAPL", "MSFT"]
+    assert out["provider_calls"] == 1
+
+    r = out["results"]
+    assert [x["as_of"] for x in r] == ["2025-01-02", "2025-01-06", "2025-01-07"]
+    assert r[0]["note"] is None
+    assert r[1]["price"] == pytest.approx(202.0)
+
+
+def test_batch_matches_single_call_semantics(fetch_calls):
+    items = [
+        {"ticker": "AAPL", "buy_date": "2025-01-04"},
+        {"ticker": "MSFT", "buy_date": "2025-03-01"},
+        {"ticker": "AAPL", "buy_date": "2025-02-01"},  # no data in lookahead window
+    ]
+
+    batch = validate_holdings_batch({"holdings": items})["results"]
+    singles = [validate_holding(h) for h in items]
+
+    assert batch == singles
+
+
+def test_batch_reports_bad_items_and_provider_errors_per_holding(fetch_calls):
+    out = validate_holdings_batch(
+        {
+            "holdings": [
+                {"ticker": "", "buy_date": "2025-01-02"},
+                {"ticker": "AAPL", "buy_date": "not-a-date"},
+                {"ticker": "ZZZZ", "buy_date": "2025-06-02"},
+                {"ticker": "MSFT", "buy_date": "2025-01-02"},
+            ]
+        }
+    )
+
+    r = out["results"]
+    assert r[0] == {"valid": False, "reason": "ticker is required"}
+    assert r[1] == {"valid": False, "reason": "buy_date must be YYYY-MM-DD"}
+    assert r[2]["reason"] == "Unspecified provider error. Check ticker."
+    assert r[3]["valid"] is True
+    assert out["valid_count"] == 1
+
+
+def test_batch_requires_holdings_list():
+    with pytest.raises(ValueError, match="holdings must be a non-empty list"):
+        validate_holdings_batch({"holdings": []})
@@ -0,0 +1,69 @@
+import pandas as pd
+import pytest
+
+import providers.market_data as md
+from providers.local_provider import LocalFileProvider
+from providers.synthetic_provider import SyntheticProvider
+
+
+@pytest.fixture
+def price_dir(tmp_path):
+    idx = pd.to_datetime(["2025-01-02", "2025-01-03", "2025-01-06"])
+    pd.DataFrame({"Date": idx, "Close": [100.0, 101.0, 102.0]}).to_csv(tmp_path / "AAPL.csv", index=False)
+    pd.DataFrame({"date": idx[1:], "adj_close": [200.0, 202.0]}).to_csv(tmp_path / "MSFT.csv", index=False)
+    return tmp_path
+
+
+@pytest.fixture
+def restore_provider():
+    yield
+    md.set_provider(None)
+
+
+def test_local_provider_reads_and_aligns_files(price_dir):
+    ph = LocalFileProvider(price_dir).fetch_price_history(["msft", "AAPL"], "2025-01-02", "2025-01-06")
+
+    # end is exclusive, like yf.download
+    assert list(ph.prices.index.strftime("%Y-%m-%d")) == ["2025-01-02", "2025-01-03"]
+    assert list(ph.prices.columns) == ["AAPL", "MSFT"]
+    assert ph.prices.loc["2025-01-03", "MSFT"] == pytest.approx(200.0)
+    assert pd.isna(ph.prices.loc["2025-01-02", "MSFT"])
+
+
+def test_local_provider_unknown_tickers_raise(price_dir):
+    with pytest.raises(ValueError, match="No price data returned"):
+        LocalFileProvider(price_dir).fetch_price_history(["NOPE"], "2025-01-01", "2025-02-01")
+
+
+def test_synthetic_provider_is_deterministic_and_window_independent():
+    p = SyntheticProvider(seed=7)
+
+    wide = p.fetch_price_history(["AAA", "BBB"], "2020-01-01", "2021-01-01").prices
+    narrow = SyntheticProvider(seed=7).fetch_price_history(["AAA"], "2020-06-01", "2020-07-01").prices
+
+    pd.testing.assert_series_equal(
+        narrow["AAA"], wide.loc["2020-06-01":"2020-06-30", "AAA"], check_freq=False
+    )
+    assert not wide["AAA"].equals(wide["BBB"])
+    assert (wide > 0).all().all()
+
+
+def test_create_provider_from_env(monkeypatch, price_dir):
+    monkeypatch.setenv("MARKET_DATA_PROVIDER", "local")
+    monkeypatch.setenv("MARKET_DATA_DIR", str(price_dir))
+    assert isinstance(md.create_provider(), LocalFileProvider)
+
+    monkeypatch.setenv("MARKET_DATA_PROVIDER", "synthetic")
+    assert isinstance(md.create_provider(), SyntheticProvider)
+
+    with pytest.raises(ValueError, match="market data provider must be"):
+        md.create_provider("bloomberg")
+
+
+def test_fetch_price_history_uses_selected_provider(price_dir, restore_provider):
+    md.set_provider(LocalFileProvider(price_dir))
+
+    ph = md.fetch_price_history(["AAPL"], "2025-01-01", "2025-01-10")
+
+    assert ph.prices["AAPL"].to_list() == [100.0, 101.0, 102.0]
+    assert md.market_data_stats()["provider"] == "local"
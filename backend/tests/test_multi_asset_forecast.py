@@ -0,0 +1,159 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import engines.multi_asset_engine as multi
+from engines.multi_asset_engine import AssetModel, AssetMoments, run_multi_asset_forecast, simulate_asset_returns
+from engines.stochastic_engine import PATHS_PER_STREAM, run_stochastic_forecast
+from services.analysis_service import analyze_portfolio
+from services.append_service import append_analysis
+from services.forecast_service import forecast_portfolio
+from services.store_singleton import analysis_store
+
+
+class DummyPH:
+    def __init__(self, prices: pd.DataFrame):
+        self.prices = prices
+
+
+def _asset_returns(n=500, seed=0):
+    rng = np.random.default_rng(seed)
+    cov = np.array([[1.0, 0.6, -0.2], [0.6, 1.5, 0.1], [-0.2, 0.1, 0.8]]) * 1e-4
+    r = rng.multivariate_normal([0.0004, 0.0006, 0.0002], cov, size=n)
+    return pd.DataFrame(r, index=pd.bdate_range("2022-01-03", periods=n), columns=["AAA", "BBB", "CCC"])
+
+
+def test_asset_model_fit_and_portfolio_moments():
+    r = _asset_returns()
+    model = AssetModel.from_returns(r)
+
+    np.testing.assert_allclose(model.mu, r.mean().to_numpy() * 252)
+    np.testing.assert_allclose(model.cov, r.cov().to_numpy() * 252)
+    np.testing.assert_allclose(model.chol @ model.chol.T, model.cov)
+    assert np.allclose(model.chol, np.tril(model.chol))
+
+    w = np.array([0.5, 0.3, 0.2])
+    port = r.to_numpy() @ w
+    mu_p, sigma_p = model.portfolio_moments(w)
+    assert mu_p == pytest.approx(port.mean() * 252)
+    assert sigma_p == pytest.approx(port.std(ddof=1) * np.sqrt(252))
+
+    # Running moments (merged in batches) give the same fit without keeping the returns
+    moments = AssetMoments.from_returns(r.iloc[:120]).extend(r.iloc[120:121]).extend(r.iloc[121:])
+    from_moments = AssetModel.from_moments(moments)
+    assert moments.count == len(r) and moments.tickers == model.tickers
+    np.testing.assert_allclose(from_moments.mu, model.mu, rtol=1e-12)
+    np.testing.assert_allclose(from_moments.cov, model.cov, rtol=1e-10)
+
+    # Duplicate asset -> singular covariance still factors (ridge)
+    singular = AssetModel.from_returns(r.assign(DDD=r["AAA"]))
+    np.testing.assert_allclose(singular.chol @ singular.chol.T, singular.cov, atol=1e-12)
+
+
+def test_single_asset_matches_scalar_gbm():
+    r = _asset_returns()[["AAA"]]
+    model = AssetModel.from_returns(r)
+    mu, sigma = float(model.mu[0]), float(np.sqrt(model.cov[0, 0]))
+
+    multi_out = run_multi_asset_forecast(model, np.array([1.0]), 1000.0, 1.0, 252, 2 * PATHS_PER_STREAM + 10, seed=4)
+    single_out = run_stochastic_forecast(1000.0, mu, sigma, 1.0, 252, 2 * PATHS_PER_STREAM + 10, seed=4)
+
+    np.testing.assert_allclose(multi_out["paths"], single_out["paths"], rtol=1e-10)
+    assert multi_out["terminal"]["probability_of_loss"] == single_out["terminal"]["probability_of_loss"]
+
+
+def test_correlated_returns_and_block_size_invariance(monkeypatch):
+    model = AssetModel.from_returns(_asset_returns())
+    x = simulate_asset_returns(model, 1.0, 252, 400, np.random.default_rng(1))
+    assert x.shape == (400, 252, 3)
+
+    logs = np.log1p(x).reshape(-1, 3)
+    np.testing.assert_allclose(np.cov(logs, rowvar=False) * 252, model.cov, rtol=0.05, atol=2e-4)
+
+    w = np.array([0.2, 0.5, 0.3])
+    full = run_multi_asset_forecast(model, w, 100.0, 0.5, 126, PATHS_PER_STREAM + 50, seed=9)
+    monkeypatch.setattr(multi, "MAX_BLOCK_ELEMENTS", 126 * 3 * 100)  # 100-path blocks
+    blocked = run_multi_asset_forecast(model, w, 100.0, 0.5, 126, PATHS_PER_STREAM + 50, seed=9)
+    np.testing.assert_array_equal(blocked["paths"], full["paths"])
+
+    streamed = run_multi_asset_forecast(model, w, 100.0, 0.5, 126, PATHS_PER_STREAM + 50, seed=9, streaming=True)
+    assert streamed["paths"] is None
+    assert streamed["terminal"]["probability_of_loss"] == full["terminal"]["probability_of_loss"]
+
+
+def test_multi_asset_forecast_service_caches_model(monkeypatch):
+    import services.analysis_service as svc
+    import services.append_service as append_svc
+
+    r = _asset_returns(400, seed=3)
+    prices = 100.0 * (1.0 + r).cumprod()
+    monkeypatch.setattr(svc, "fetch_price_history", lambda tickers, start, end: DummyPH(prices.iloc[:300]))
+
+    analysis = analyze_portfolio(
+        {
+            "portfolio": {"holdings": [{"ticker": t, "weight": w} for t, w in zip(prices.columns, (0.5, 0.3, 0.2))]},
+            "date_range": {"start": "2022-01-01", "end": "2023-06-01"},
+        }
+    )
+    item = analysis_store.get(analysis["analysis_id"])
+    assert "asset_returns" not in item  # only the O(K^2) moments are kept
+    assert item["asset_moments"].count == 299 and item["asset_moments"].m2.shape == (3, 3)
+    assert item["asset_model"] is None
+
+    payload = {
+        "analysis_id": analysis["analysis_id"],
+        "forecast": {"type": "stochastic", "days": 20, "simulations": 500, "seed": 2, "model": "multi_asset"},
+    }
+    out = forecast_portfolio(payload)
+    model = item["asset_model"]
+    assert out["inputs"]["forecast"]["model"] == "multi_asset"
+    assert [a["ticker"] for a in out["assets"]] == ["AAA", "BBB", "CCC"]
+    assert out["assets"][1]["weight"] == pytest.approx(0.3)
+    mu_p, sigma_p = model.portfolio_moments(np.array([0.5, 0.3, 0.2]))
+    assert out["trend"]["annualized_drift"] == pytest.approx(mu_p)
+    assert out["trend"]["mean_daily_return"] == pytest.approx(mu_p / 252)
+    assert out["volatility"]["annualized_volatility"] == pytest.approx(sigma_p)
+    assert out["volatility"]["daily_volatility"] == pytest.approx(sigma_p / np.sqrt(252))
+    assert len(out["forecast_paths"]["p50"]) == 20
+
+    again = forecast_portfolio(payload)
+    assert item["asset_model"] is model
+    assert again["forecast_paths"] == out["forecast_paths"]
+
+    with pytest.raises(ValueError, match="drift_mode"):
+        forecast_portfolio({**payload, "forecast": {**payload["forecast"], "drift_mode": "ewma"}})
+    with pytest.raises(ValueError, match="forecast.model"):
+        forecast_portfolio({**payload, "forecast": {**payload["forecast"], "model": "copula"}})
+    with pytest.raises(ValueError, match="requires forecast.type 'stochastic'"):
+        forecast_portfolio({**payload, "forecast": {**payload["forecast"], "type": "deterministic"}})
+
+    # Appending new rows extends the asset moments and drops the cached fit
+    monkeypatch.setattr(append_svc, "fetch_price_history", lambda tickers, start, end: DummyPH(prices.iloc[300:]))
+    append_analysis({"analysis_id": analysis["analysis_id"]})
+    assert item["asset_moments"].count == 399
+    assert item["asset_model"] is None
+    refit = AssetModel.from_moments(item["asset_moments"])
+    np.testing.assert_allclose(refit.cov, AssetModel.from_returns(r.iloc[1:]).cov, rtol=1e-8)
+
+
+@pytest.mark.parametrize(
+    "inputs",
+    [
+        {"mode": "shares", "rebalance": None},
+        {"mode": "weights", "rebalance": {"frequency": "monthly"}},
+    ],
+)
+def test_multi_asset_rejects_buy_and_hold_and_rebalanced_analyses(inputs):
+    r = _asset_returns(100)
+    analysis_id = analysis_store.put(
+        {
+            "kind": "analyze",
+            "inputs": {"starting_cash": 10_000.0, "weights": {"AAA": 0.5, "BBB": 0.5}, **inputs},
+            "portfolio_returns": r[["AAA", "BBB"]].mean(axis=1),
+            "asset_moments": AssetMoments.from_returns(r[["AAA", "BBB"]]),
+            "asset_model": None,
+        }
+    )
+    payload = {"analysis_id": analysis_id, "forecast": {"type": "stochastic", "days": 10, "model": "multi_asset"}}
+    with pytest.raises(ValueError, match="constant mix"):
+        forecast_portfolio(payload)
@@ -77,3 +77,17 @@ def test_portfolio_returns_handles_mixed_case_tickers_in_weights():
 
     # Expected: 0.25*0.10 + 0.75*0.20 = 0.175
     assert r.iloc[0] == pytest.approx(0.175)
+
+
+def test_portfolio_returns_ignores_columns_without_weights():
+    idx = pd.to_datetime(["2025-01-02", "2025-01-03"])
+    asset_returns = pd.DataFrame(
+        {"AAPL": [0.10, 0.20], "BAD": [float("inf"), None], "MSFT": [0.30, None]},
+        index=idx,
+    )
+
+    r = portfolio_returns(asset_returns, {"AAPL": 0.5, "MSFT": 0.5})
+
+    assert r.index.equals(idx)
+    assert r.loc["2025-01-02"] == pytest.approx(0.20)
+    assert r.loc["2025-01-03"] == pytest.approx(0.10)
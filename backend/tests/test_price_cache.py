@@ -0,0 +1,170 @@
+import pandas as pd
+import pytest
+
+from providers.price_cache import PriceCache, _merge_ranges, _missing_ranges
+
+
+class FakeDownloader:
+    """Serves closes from an in-memory panel and records every call."""
+
+    def __init__(self, panel: pd.DataFrame):
+        self.panel = panel
+        self.calls = []
+
+    def __call__(self, tickers, start, end):
+        self.calls.append((tuple(tickers), start, end))
+        idx = self.panel.index
+        mask = (idx >= pd.Timestamp(start)) & (idx < pd.Timestamp(end))
+        return self.panel.loc[mask, [t for t in tickers if t in self.panel.columns]]
+
+
+@pytest.fixture
+def panel():
+    idx = pd.bdate_range("2024-01-01", "2024-03-29")
+    return pd.DataFrame(
+        {
+            "AAPL": [100.0 + i for i in range(len(idx))],
+            "MSFT": [200.0 + i for i in range(len(idx))],
+        },
+        index=idx,
+    )
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return PriceCache(tmp_path / "prices.sqlite3")
+
+
+def test_missing_ranges_subtracts_coverage():
+    d = pd.Timestamp
+    covered = _merge_ranges([(d("2024-01-10"), d("2024-01-20")), (d("2024-01-15"), d("2024-01-25"))])
+    assert covered == [(d("2024-01-10"), d("2024-01-25"))]
+
+    missing = _missing_ranges(d("2024-01-01"), d("2024-02-01"), covered)
+    assert missing == [(d("2024-01-01"), d("2024-01-10")), (d("2024-01-25"), d("2024-02-01"))]
+
+
+def test_second_identical_request_is_served_from_cache(cache, panel):
+    dl = FakeDownloader(panel)
+
+    first = cache.get_prices(["AAPL", "MSFT"], "2024-01-01", "2024-02-01", dl)
+    second = cache.get_prices(["AAPL", "MSFT"], "2024-01-01", "2024-02-01", dl)
+
+    assert len(dl.calls) == 1  # one multi-ticker download, then nothing
+    pd.testing.assert_frame_equal(first, second)
+    assert first["AAPL"].iloc[0] == pytest.approx(100.0)
+
+    stats = cache.stats()
+    assert stats["misses"] == 2
+    assert stats["hits"] == 2
+    assert stats["partial_hits"] == 0
+
+
+def test_extended_window_downloads_only_missing_range(cache, panel):
+    dl = FakeDownloader(panel)
+
+    cache.get_prices(["AAPL"], "2024-01-01", "2024-02-01", dl)
+    out = cache.get_prices(["AAPL"], "2024-01-01", "2024-03-01", dl)
+
+    assert dl.calls[-1] == (("AAPL",), "2024-01-25", "2024-03-01")  # gap plus a week of overlap
+    assert cache.stats()["partial_hits"] == 1
+    assert cache.stats()["adjustment_resets"] == 0
+
+    expected = panel.loc["2024-01-01":"2024-02-29", ["AAPL"]]
+    assert out.index.equals(expected.index)
+    assert out["AAPL"].to_list() == expected["AAPL"].to_list()
+
+
+def test_changed_adjustment_basis_resets_the_ticker(cache, panel):
+    dl = FakeDownloader(panel)
+    cache.get_prices(["AAPL", "MSFT"], "2024-01-01", "2024-02-01", dl)
+
+    # 2:1 split on 2024-02-15: Yahoo rescales all earlier adjusted AAPL closes
+    dl.panel = panel.assign(AAPL=panel["AAPL"].where(panel.index >= "2024-02-15", panel["AAPL"] / 2))
+    out = cache.get_prices(["AAPL", "MSFT"], "2024-01-01", "2024-03-01", dl)
+
+    assert dl.calls[-1] == (("AAPL",), "2024-01-01", "2024-03-01")  # full refetch of the rebased ticker only
+    assert cache.stats()["adjustment_resets"] == 1
+    assert out["AAPL"].to_list() == dl.panel.loc["2024-01-01":"2024-02-29", "AAPL"].to_list()
+    assert out["MSFT"].to_list() == panel.loc["2024-01-01":"2024-02-29", "MSFT"].to_list()
+
+    again = FakeDownloader(dl.panel)
+    cache.get_prices(["AAPL"], "2024-01-01", "2024-03-01", again)
+    assert again.calls == []  # refetched window is covered again
+
+
+def test_unknown_ticker_is_returned_as_nan_column(cache, panel):
+    dl = FakeDownloader(panel)
+
+    out = cache.get_prices(["AAPL", "ZZZZ"], "2024-01-01", "2024-01-10", dl)
+
+    assert list(out.columns) == ["AAPL", "ZZZZ"]
+    assert out["ZZZZ"].isna().all()
+
+
+def test_empty_download_is_not_marked_covered(cache, panel):
+    dl = FakeDownloader(panel.iloc[0:0])
+
+    cache.get_prices(["AAPL"], "2024-01-01", "2024-01-10", dl)
+    cache.get_prices(["AAPL"], "2024-01-01", "2024-01-10", dl)
+
+    assert len(dl.calls) == 2
+
+
+def test_cache_persists_across_instances(tmp_path, panel):
+    path = tmp_path / "prices.sqlite3"
+    PriceCache(path).get_prices(["MSFT"], "2024-01-01", "2024-01-10", FakeDownloader(panel))
+
+    offline = FakeDownloader(panel)
+    out = PriceCache(path).get_prices(["MSFT"], "2024-01-01", "2024-01-10", offline)
+
+    assert offline.calls == []
+    assert out["MSFT"].iloc[0] == pytest.approx(200.0)
+
+
+def test_timeout_serves_stale_cached_prices(cache, panel):
+    cache.get_prices(["AAPL"], "2024-01-01", "2024-02-01", FakeDownloader(panel))
+
+    def timing_out(tickers, start, end):
+        raise TimeoutError("deadline")
+
+    out = cache.get_prices(["AAPL"], "2024-01-01", "2024-03-01", timing_out)
+
+    assert out.index.max() < pd.Timestamp("2024-02-01")
+    assert cache.stats()["stale_served"] == 1
+
+    with pytest.raises(TimeoutError):
+        cache.get_prices(["MSFT"], "2024-01-01", "2024-03-01", timing_out)
+
+
+def test_partial_download_only_covers_successful_tickers(cache, panel):
+    from providers.price_cache import PartialDownloadError
+
+    calls = []
+
+    def partial(tickers, start, end):
+        calls.append(tuple(tickers))
+        frame = FakeDownloader(panel)(["AAPL"], start, end)
+        raise PartialDownloadError(frame, ["MSFT"])
+
+    with pytest.raises(PartialDownloadError) as exc:
+        cache.get_prices(["AAPL", "MSFT"], "2024-01-01", "2024-02-01", partial)
+    assert exc.value.failed == ["MSFT"]  # reported, not an all-NaN column
+    assert exc.value.prices["AAPL"].notna().all()
+
+    dl = FakeDownloader(panel)
+    cache.get_prices(["AAPL", "MSFT"], "2024-01-01", "2024-02-01", dl)
+    assert dl.calls == [(("MSFT",), "2024-01-01", "2024-02-01")]
+
+
+def test_ticker_omitted_from_response_is_not_marked_covered(cache, panel):
+    dl = FakeDownloader(panel[["AAPL"]])  # MSFT silently missing from the multi-ticker response
+
+    first = cache.get_prices(["AAPL", "MSFT"], "2024-01-01", "2024-02-01", dl)
+    assert first["MSFT"].isna().all()
+
+    dl.panel = panel  # MSFT is back upstream
+    second = cache.get_prices(["AAPL", "MSFT"], "2024-01-01", "2024-02-01", dl)
+
+    assert dl.calls[-1] == (("MSFT",), "2024-01-01", "2024-02-01")  # only the missing ticker is refetched
+    assert second["MSFT"].iloc[0] == pytest.approx(200.0)
@@ -0,0 +1,109 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from engines.portfolio_engine import portfolio_returns
+from engines.rebalance_engine import RebalancePolicy, calendar_rebalance_rows, rebalanced_returns
+from services.analysis_service import _analyze_from_prices, analyze_portfolio
+
+
+class DummyPH:
+    def __init__(self, prices: pd.DataFrame):
+        self.prices = prices
+
+
+@pytest.fixture
+def returns_panel():
+    rng = np.random.default_rng(4)
+    dates = pd.bdate_range("2020-01-01", periods=700)
+    r = rng.normal(0.0004, 0.02, size=(700, 4))
+    w = np.array([0.4, 0.3, 0.2, 0.1])
+    return r, dates, w
+
+
+def _simulate(r, dates, w, policy):
+    """Reference: compound holdings day by day and trade back to target when the policy says so."""
+    ends = set(calendar_rebalance_rows(dates, policy.kind).tolist()) if policy.kind != "threshold" else None
+    held, value, out = w.copy(), 1.0, []
+    for t in range(len(r)):
+        held = held * (1.0 + r[t])
+        new_value = held.sum()
+        drift = held / new_value
+        if ends is not None:
+            trade = t in ends
+        else:
+            trade = t < len(r) - 1 and np.abs(drift - w).max() > policy.threshold
+        if trade:
+            new_value *= 1.0 - policy.cost_bps / 1e4 * np.abs(drift - w).sum()
+            held = w * new_value
+        out.append(new_value / value - 1.0)
+        value = new_value
+    return np.array(out)
+
+
+@pytest.mark.parametrize("kind", ["daily", "monthly", "quarterly", "annual", "threshold", "none"])
+def test_rebalanced_returns_match_day_by_day_simulation(returns_panel, kind):
+    r, dates, w = returns_panel
+    policy = RebalancePolicy(kind=kind, threshold=0.03, cost_bps=25.0)
+
+    out, summary = rebalanced_returns(r, dates, w, policy)
+
+    np.testing.assert_allclose(out, _simulate(r, dates, w, policy), atol=1e-12)
+    assert summary["type"] == kind
+    if kind == "none":
+        assert summary["rebalances"] == 0
+    if kind == "monthly":
+        assert summary["rebalances"] == len(pd.Index(dates.to_period("M")).unique()) - 1
+    assert summary["cost"] >= 0
+
+
+def test_daily_without_costs_matches_portfolio_returns(returns_panel):
+    r, dates, w = returns_panel
+    frame = pd.DataFrame(r, index=dates, columns=["A", "B", "C", "D"])
+
+    out, _ = rebalanced_returns(r, dates, w, RebalancePolicy())
+
+    np.testing.assert_allclose(out, portfolio_returns(frame, dict(zip(frame.columns, w))).to_numpy(), atol=1e-15)
+
+
+def test_policy_parsing():
+    assert RebalancePolicy.from_payload(None) is None
+    assert RebalancePolicy.from_payload("Monthly") == RebalancePolicy(kind="monthly")
+    assert RebalancePolicy.from_payload({"type": "threshold", "threshold": 0.1, "cost_bps": 5}).to_dict() == {
+        "type": "threshold",
+        "cost_bps": 5.0,
+        "threshold": 0.1,
+    }
+    with pytest.raises(ValueError, match="Unknown rebalance.type"):
+        RebalancePolicy.from_payload({"type": "weekly"})
+    with pytest.raises(ValueError, match="cost_bps"):
+        RebalancePolicy.from_payload({"type": "monthly", "cost_bps": -1})
+
+
+def test_analyze_accepts_rebalance_policy(monkeypatch, returns_panel):
+    import services.analysis_service as svc
+
+    r, dates, _ = returns_panel
+    prices = pd.DataFrame(100.0 * np.cumprod(1.0 + r, axis=0), index=dates, columns=["A", "B", "C", "D"])
+    monkeypatch.setattr(svc, "fetch_price_history", lambda tickers, start, end: DummyPH(prices))
+    payload = {
+        "portfolio": {"holdings": [{"ticker": "A", "weight": 0.5}, {"ticker": "B", "weight": 0.5}]},
+        "date_range": {"start": "2020-01-01", "end": "2022-09-01"},
+        "rebalance": {"type": "quarterly", "cost_bps": 10},
+    }
+
+    out = analyze_portfolio(payload)
+
+    assert out["inputs"]["rebalance"] == {"type": "quarterly", "cost_bps": 10.0}
+    assert out["rebalance"]["rebalances"] > 0
+    assert set(out["metrics"]) == {"annualized_return", "annualized_volatility", "max_drawdown", "sharpe_ratio"}
+
+    compact = _analyze_from_prices(
+        prices, {"A": 0.5, "B": 0.5}, 100_000.0, compact=True, rebalance=RebalancePolicy(kind="quarterly", cost_bps=10)
+    )
+    for k, v in out["metrics"].items():
+        assert compact["metrics"][k] == pytest.approx(v, rel=1e-5, abs=1e-6)
+
+    payload["portfolio"]["holdings"] = [{"ticker": "A", "shares": 1}]
+    with pytest.raises(ValueError, match="weights mode"):
+        analyze_portfolio(payload)
@@ -0,0 +1,73 @@
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from engines.rolling_engine import rolling_metrics, sliding_max
+from services.analysis_service import analyze_portfolio
+from services.window_service import rolling_window_metrics
+
+
+class DummyPH:
+    def __init__(self, prices: pd.DataFrame):
+        self.prices = prices
+
+
+@pytest.mark.parametrize("window", [1, 2, 5, 7, 100])
+def test_sliding_max_matches_pandas_rolling(window):
+    x = np.random.default_rng(window).normal(size=100)
+    expected = pd.Series(x).rolling(window).max().to_numpy()[window - 1 :]
+    np.testing.assert_array_equal(sliding_max(x, window), expected)
+    assert sliding_max(x, 101).size == 0
+
+
+def test_rolling_metrics_match_pandas_rolling():
+    rng = np.random.default_rng(18)
+    r = pd.Series(rng.normal(0.0003, 0.012, 800))
+    out = rolling_metrics(r.to_numpy(), [21, 63])
+
+    for w in (21, 63):
+        roll = r.rolling(w)
+        std = roll.std(ddof=1).to_numpy()[w - 1 :]
+        mean = roll.mean().to_numpy()[w - 1 :]
+        log_eq = np.log1p(r).cumsum()
+        trailing = np.expm1(log_eq - log_eq.shift(w, fill_value=0.0)).to_numpy()[w - 1 :]
+        equity = (1.0 + r).cumprod()
+        drawdown = (equity / equity.rolling(w).max() - 1.0).to_numpy()[w - 1 :]
+
+        np.testing.assert_allclose(out[w]["volatility"], std * math.sqrt(252), rtol=1e-9)
+        np.testing.assert_allclose(out[w]["sharpe_ratio"], mean / std * math.sqrt(252), rtol=1e-8)
+        np.testing.assert_allclose(out[w]["return"], trailing, rtol=1e-9, atol=1e-15)
+        np.testing.assert_allclose(out[w]["drawdown_from_window_peak"], drawdown, rtol=1e-9, atol=1e-12)
+
+
+def test_rolling_endpoint_serves_windows_and_downsamples(monkeypatch):
+    import services.analysis_service as svc
+
+    rng = np.random.default_rng(5)
+    idx = pd.bdate_range("2019-01-01", periods=700)
+    prices = pd.DataFrame({"SPY": 100.0 * np.cumprod(1.0 + rng.normal(0.0003, 0.01, 700))}, index=idx)
+    monkeypatch.setattr(svc, "fetch_price_history", lambda tickers, start, end: DummyPH(prices))
+
+    analysis = analyze_portfolio(
+        {
+            "portfolio": {"holdings": [{"ticker": "SPY", "weight": 1.0}]},
+            "date_range": {"start": "2019-01-01", "end": "2022-01-01"},
+        }
+    )
+    out = rolling_window_metrics({"analysis_id": analysis["analysis_id"], "max_points": 100})
+
+    by_window = {entry["window"]: entry for entry in out["rolling"]}
+    assert sorted(by_window) == [63, 252]
+    for w, entry in by_window.items():
+        assert entry["points"] <= 101
+        assert entry["series"][0]["date"] == idx[w].strftime("%Y-%m-%d")  # first full window
+        assert entry["series"][-1]["date"] == idx[-1].strftime("%Y-%m-%d")  # latest point is kept
+        assert set(entry["series"][0]) == {"date", "volatility", "sharpe_ratio", "return", "drawdown_from_window_peak"}
+
+    full = rolling_window_metrics({"analysis_id": analysis["analysis_id"], "windows": [21]})
+    assert full["rolling"][0]["points"] == 699 - 21 + 1
+
+    with pytest.raises(ValueError, match="at least 2"):
+        rolling_window_metrics({"analysis_id": analysis["analysis_id"], "windows": [1]})
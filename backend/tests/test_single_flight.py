@@ -0,0 +1,128 @@
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+from providers.single_flight import SingleFlightDownloader
+
+
+class SlowDownloader:
+    def __init__(self, delay=0.05, fail=False):
+        self.delay = delay
+        self.fail = fail
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def __call__(self, tickers, start, end):
+        with self._lock:
+            self.calls.append(tuple(tickers))
+        time.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("provider down")
+        idx = pd.to_datetime(["2025-01-02", "2025-01-03"])
+        return pd.DataFrame({t: [1.0, 2.0] for t in tickers}, index=idx)
+
+
+def _run_concurrently(fn, args_list):
+    results, errors = [None] * len(args_list), []
+    barrier = threading.Barrier(len(args_list))
+
+    def worker(i, args):
+        barrier.wait()
+        try:
+            results[i] = fn(*args)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(i, a)) for i, a in enumerate(args_list)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results, errors
+
+
+def test_identical_concurrent_calls_share_one_download():
+    dl = SlowDownloader()
+    sf = SingleFlightDownloader(dl, gather_seconds=0.02)
+
+    results, errors = _run_concurrently(sf, [(["AAPL"], "2025-01-01", "2025-01-10")] * 8)
+
+    assert not errors
+    assert len(dl.calls) == 1
+    assert all(list(r.columns) == ["AAPL"] for r in results)
+
+    stats = sf.stats()
+    assert stats["calls"] == 8
+    assert stats["downloads"] == 1
+    assert stats["saved"] == 7
+
+
+def test_different_tickers_same_window_are_merged_into_one_batch():
+    dl = SlowDownloader()
+    sf = SingleFlightDownloader(dl, gather_seconds=0.05)
+
+    args = [(["AAPL"], "2025-01-01", "2025-01-10"), (["MSFT"], "2025-01-01", "2025-01-10"), (["NVDA"], "2025-01-01", "2025-01-10")]
+    results, errors = _run_concurrently(sf, args)
+
+    assert not errors
+    assert dl.calls == [("AAPL", "MSFT", "NVDA")]
+    # each caller only sees the tickers it asked for
+    assert [list(r.columns) for r in results] == [["AAPL"], ["MSFT"], ["NVDA"]]
+
+
+def test_different_windows_are_not_coalesced():
+    dl = SlowDownloader(delay=0.0)
+    sf = SingleFlightDownloader(dl, gather_seconds=0.0)
+
+    sf(["AAPL"], "2025-01-01", "2025-01-10")
+    sf(["AAPL"], "2025-01-01", "2025-02-10")
+
+    assert len(dl.calls) == 2
+    assert sf.stats()["saved"] == 0
+
+
+def test_errors_are_propagated_to_every_waiter():
+    dl = SlowDownloader(fail=True)
+    sf = SingleFlightDownloader(dl, gather_seconds=0.02)
+
+    _, errors = _run_concurrently(sf, [(["AAPL"], "2025-01-01", "2025-01-10")] * 4)
+
+    assert len(dl.calls) == 1
+    assert len(errors) == 4
+    with pytest.raises(RuntimeError, match="provider down"):
+        raise errors[0]
+
+
+
+class PanelDownloader(SlowDownloader):
+    """SlowDownloader serving the [start, end) rows of a fixed panel."""
+
+    def __init__(self, panel, delay=0.1):
+        super().__init__(delay=delay)
+        self.panel = panel
+
+    def __call__(self, tickers, start, end):
+        with self._lock:
+            self.calls.append(tuple(tickers))
+        time.sleep(self.delay)
+        rows = (self.panel.index >= pd.Timestamp(start)) & (self.panel.index < pd.Timestamp(end))
+        return self.panel.loc[rows, list(tickers)]
+
+
+def test_narrower_window_joins_covering_in_flight_download():
+    idx = pd.to_datetime(["2025-01-02", "2025-01-15", "2025-02-20"])
+    dl = PanelDownloader(pd.DataFrame({"AAPL": [1.0, 2.0, 3.0], "MSFT": [4.0, 5.0, 6.0]}, index=idx))
+    sf = SingleFlightDownloader(dl, gather_seconds=0.0)
+
+    wide = threading.Thread(target=sf, args=(["AAPL"], "2025-01-01", "2025-03-01"))
+    wide.start()
+    time.sleep(0.03)  # the wide download is in flight
+    out = sf(["AAPL", "MSFT"], "2025-01-10", "2025-02-01")
+    wide.join()
+
+    assert dl.calls == [("AAPL",), ("MSFT",)]  # AAPL rode on the wide download
+    assert list(out.columns) == ["AAPL", "MSFT"]
+    assert out.to_dict("list") == {"AAPL": [2.0], "MSFT": [5.0]}  # sliced to [2025-01-10, 2025-02-01)
+    assert sf._batches == {}
@@ -6,6 +6,7 @@ import pytest
 from engines.stochastic_engine import (
     simulate_gbm_path,
     simulate_many_paths,
+    simulate_many_paths_scalar,
     summarize_terminal_metrics,
     summarize_drawdown_metrics,
     summarize_path_metrics,
@@ -193,4 +194,38 @@ def test_zero_volatility_many_paths_are_identical():
 
     first_path = paths[0]
     for i in range(1, n):
-        assert np.allclose(paths[i], first_path, rtol=1e-12, atol=1e-12)
\ No newline at end of file
+        assert np.allclose(paths[i], first_path, rtol=1e-12, atol=1e-12)
+
+def test_vectorized_paths_match_scalar_paths_for_the_same_draws():
+    # Both versions consume the global RNG in row-major (path, step) order
+    np.random.seed(7)
+    scalar = simulate_many_paths_scalar(100.0, 0.08, 0.2, 1.0, 60, 200)
+    np.random.seed(7)
+    vectorized = simulate_many_paths(100.0, 0.08, 0.2, 1.0, 60, 200)
+
+    assert np.all(vectorized[:, 0] == 100.0)
+    np.testing.assert_allclose(vectorized, scalar, rtol=1e-10)
+
+    ref, out = summarize_terminal_metrics(scalar), summarize_terminal_metrics(vectorized)
+    assert out["median_terminal_value"] == pytest.approx(ref["median_terminal_value"], rel=1e-10)
+    assert out["probability_of_loss"] == ref["probability_of_loss"]
+
+
+def test_seeded_paths_are_reproducible_and_ignore_global_state():
+    from engines.stochastic_engine import PATHS_PER_STREAM, run_stochastic_forecast, simulate_seeded_paths
+
+    n = 2 * PATHS_PER_STREAM + 10  # spans three substreams
+    np.random.seed(1)
+    a = simulate_seeded_paths(100.0, 0.08, 0.2, 1.0, 30, n, seed=99)
+    np.random.seed(2)
+    b = simulate_seeded_paths(100.0, 0.08, 0.2, 1.0, 30, n, seed=99)
+
+    np.testing.assert_array_equal(a, b)
+    assert np.all(a[:, 0] == 100.0)
+    # Substreams are independent: no block repeats another
+    assert not np.allclose(a[:10], a[PATHS_PER_STREAM : PATHS_PER_STREAM + 10])
+
+    out = run_stochastic_forecast(100.0, 0.08, 0.2, 1.0, 30, 50, seed=5)
+    assert out["seed"] == 5
+    with pytest.raises(ValueError):
+        run_stochastic_forecast(100.0, 0.08, 0.2, 1.0, 30, 50, seed=-3)
@@ -0,0 +1,171 @@
+import math
+from concurrent.futures import ThreadPoolExecutor
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from engines.stochastic_engine import PATHS_PER_STREAM, run_stochastic_forecast
+from engines.streaming_engine import (
+    GRID_SIGMAS,
+    PRICE_BINS,
+    run_streaming_forecast,
+    shard_streams,
+    simulate_into_sketch,
+    simulate_into_sketch_parallel,
+)
+from services.forecast_service import forecast_portfolio
+from services.store_singleton import analysis_store
+
+ARGS = dict(s0=100_000.0, mu=0.07, sigma=0.22, T=1.0, N=252)
+
+
+def test_streaming_matches_in_memory_within_sketch_resolution():
+    n = 4 * PATHS_PER_STREAM
+    exact = run_stochastic_forecast(**ARGS, n=n, seed=11)
+    stream = run_streaming_forecast(**ARGS, n=n, seed=11)
+
+    # Documented bound: one log-grid bin at the horizon
+    bound = math.exp(2 * GRID_SIGMAS * ARGS["sigma"] * math.sqrt(ARGS["T"]) / PRICE_BINS) - 1
+    for name, band in exact["path_metrics"].items():
+        assert stream["path_metrics"][name][0] == ARGS["s0"]
+        np.testing.assert_allclose(stream["path_metrics"][name], band, rtol=bound)
+    for key in ("median_terminal_value", "bear_case", "bull_case"):
+        assert stream["terminal"][key] == pytest.approx(exact["terminal"][key], rel=bound)
+
+    # Running accumulators are exact
+    assert stream["terminal"]["mean_terminal_value"] == pytest.approx(exact["terminal"]["mean_terminal_value"], rel=1e-12)
+    assert stream["terminal"]["probability_of_loss"] == exact["terminal"]["probability_of_loss"]
+    assert stream["drawdown"]["prob_drawdown_gt_20"] == exact["drawdown"]["prob_drawdown_gt_20"]
+    assert stream["drawdown"]["median_max_duration"] == exact["drawdown"]["median_max_duration"]
+    assert stream["drawdown"]["p90_max_duration"] == exact["drawdown"]["p90_max_duration"]
+    assert stream["drawdown"]["median_max_drawdown"] == pytest.approx(exact["drawdown"]["median_max_drawdown"], abs=3e-4)
+
+
+def test_sketches_merge_exactly():
+    n = 3 * PATHS_PER_STREAM
+    full = simulate_into_sketch(**ARGS, n=n, seed=3)
+    merged = simulate_into_sketch(**ARGS, n=n, seed=3, streams=range(0, 1)).merge(
+        simulate_into_sketch(**ARGS, n=n, seed=3, streams=range(1, 3))
+    )
+
+    np.testing.assert_array_equal(merged.counts, full.counts)
+    np.testing.assert_array_equal(merged.dd_counts, full.dd_counts)
+    assert merged.n == full.n == n
+    assert merged.summary()["path_metrics"]["p50_path"] == pytest.approx(full.summary()["path_metrics"]["p50_path"])
+
+
+def test_streaming_memory_does_not_grow_with_simulations():
+    def peak(n):
+        tracemalloc.start()
+        run_streaming_forecast(**ARGS, n=n, seed=1)
+        _, top = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return top
+
+    small, large = peak(2 * PATHS_PER_STREAM), peak(8 * PATHS_PER_STREAM)
+    assert large < 1.2 * small
+
+
+def test_forecast_service_streaming_option():
+    idx = pd.bdate_range("2024-01-01", periods=120)
+    port_r = pd.Series(np.random.default_rng(0).normal(0.0005, 0.01, 120), index=idx)
+    analysis_id = analysis_store.put(
+        {
+            "kind": "analyze",
+            "inputs": {"starting_cash": 10_000.0},
+            "portfolio_returns": port_r,
+        }
+    )
+
+    payload = {
+        "analysis_id": analysis_id,
+        "forecast": {"type": "stochastic", "days": 30, "simulations": 2000, "seed": 8, "streaming": True},
+    }
+    out = forecast_portfolio(payload)
+    assert out["inputs"]["forecast"]["streaming"] is True
+    assert len(out["forecast_paths"]["p50"]) == 30
+
+    payload["forecast"]["streaming"] = False
+    exact = forecast_portfolio(payload)
+    assert exact["inputs"]["forecast"]["streaming"] is False
+    assert out["terminal"]["probability_of_loss"] == exact["terminal"]["probability_of_loss"]
+
+    for bad in ("false", 0, "yes"):
+        payload["forecast"]["streaming"] = bad
+        with pytest.raises(ValueError, match="forecast.streaming must be true or false"):
+            forecast_portfolio(payload)
+
+
+def test_substreams_are_created_only_when_simulated(monkeypatch):
+    import engines.streaming_engine as streaming
+    from engines.stochastic_engine import stream_rng
+
+    children = np.random.SeedSequence(3).spawn(4)
+    for i, child in enumerate(children):
+        np.testing.assert_array_equal(stream_rng(3, i).random(5), np.random.default_rng(child).random(5))
+
+    created = []
+
+    def recording(seed, i):
+        created.append(i)
+        return stream_rng(seed, i)
+
+    monkeypatch.setattr(streaming, "stream_rng", recording)
+    simulate_into_sketch(**ARGS, n=1000 * PATHS_PER_STREAM, seed=3, streams=range(7, 9))
+    assert created == [7, 8]
+
+
+def test_parallel_workers_merge_to_serial_sketch():
+    n = 5 * PATHS_PER_STREAM + 100
+    assert [len(s) for s in shard_streams(n, 4)] == [1, 2, 1, 2]
+    assert shard_streams(n, 64)[-1] == range(5, 6)
+
+    serial = simulate_into_sketch(**ARGS, n=n, seed=21)
+    parallel = simulate_into_sketch_parallel(**ARGS, n=n, seed=21, workers=2)
+
+    np.testing.assert_array_equal(parallel.counts, serial.counts)
+    np.testing.assert_array_equal(parallel.dd_counts, serial.dd_counts)
+    np.testing.assert_array_equal(parallel.dur_counts, serial.dur_counts)
+    assert parallel.n_loss == serial.n_loss and parallel.n == n
+    assert parallel.terminal_sum == pytest.approx(serial.terminal_sum, rel=1e-12)
+
+
+def test_parallel_forecasts_of_different_sizes_share_one_pool():
+    import engines.streaming_engine as streaming
+
+    sizes = (2 * PATHS_PER_STREAM, 5 * PATHS_PER_STREAM + 7, 3 * PATHS_PER_STREAM)
+    serial = [run_streaming_forecast(**ARGS, n=n, seed=5)["terminal"] for n in sizes]
+
+    first = run_streaming_forecast(**ARGS, n=sizes[0], seed=5, workers=2)["terminal"]
+    pool = streaming._pool
+    with ThreadPoolExecutor(max_workers=3) as threads:
+        outs = list(threads.map(lambda n: run_streaming_forecast(**ARGS, n=n, seed=5, workers=4)["terminal"], sizes))
+
+    assert streaming._pool is pool  # never torn down and rebuilt per request
+    assert first["probability_of_loss"] == serial[0]["probability_of_loss"]
+    for out, expected in zip(outs, serial):
+        assert out["probability_of_loss"] == expected["probability_of_loss"]
+        assert out["median_terminal_value"] == pytest.approx(expected["median_terminal_value"])
+
+
+def test_broken_pool_is_replaced_and_run_finishes_in_process():
+    import os
+    from concurrent.futures.process import BrokenProcessPool
+
+    import engines.streaming_engine as streaming
+
+    n = 3 * PATHS_PER_STREAM
+    serial = simulate_into_sketch(**ARGS, n=n, seed=8)
+
+    broken = streaming._get_pool(2)
+    assert isinstance(broken.submit(os._exit, 1).exception(), BrokenProcessPool)  # a worker dies
+
+    recovered = simulate_into_sketch_parallel(**ARGS, n=n, seed=8, workers=2)
+    np.testing.assert_array_equal(recovered.counts, serial.counts)
+    assert streaming._pool is not broken
+
+    again = simulate_into_sketch_parallel(**ARGS, n=n, seed=8, workers=2)  # on the fresh pool
+    np.testing.assert_array_equal(again.counts, serial.counts)
+    assert streaming._pool is not None and streaming._pool is not broken
@@ -0,0 +1,105 @@
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from engines.tail_engine import tail_metrics_matrix
+from services.analysis_service import analyze_portfolio
+from services.stress_service import analyze_with_shock
+
+
+class DummyPH:
+    def __init__(self, prices: pd.DataFrame):
+        self.prices = prices
+
+
+def test_tail_metrics_match_reference_per_series():
+    rng = np.random.default_rng(20)
+    r = np.column_stack([rng.normal(0.0005, 0.01, 1000), rng.standard_t(3, 1000) * 0.01, rng.normal(0.0, 0.02, 1000)])
+
+    out = tail_metrics_matrix(r, annualized_return=np.array([0.1, 0.05, -0.02]), max_drawdown=np.array([-0.2, -0.1, 0.0]))
+
+    for k in range(3):
+        s = pd.Series(r[:, k])
+        ordered = np.sort(r[:, k])
+        assert out["var_95"][k] == pytest.approx(-ordered[49])  # ceil(0.05 * 1000) - 1
+        assert out["cvar_95"][k] == pytest.approx(-ordered[:50].mean())
+        assert out["var_99"][k] == pytest.approx(-ordered[9])
+        assert out["cvar_99"][k] == pytest.approx(-ordered[:10].mean())
+        assert out["skewness"][k] == pytest.approx(s.skew(), rel=1e-9)
+        assert out["excess_kurtosis"][k] == pytest.approx(s.kurt(), rel=1e-9)
+
+        mean, std = s.mean(), s.std(ddof=1)
+        assert out["parametric_var_95"][k] == pytest.approx(-(mean - 1.6448536269514722 * std), rel=1e-9)
+
+        downside = math.sqrt((np.minimum(r[:, k], 0.0) ** 2).mean())
+        assert out["sortino_ratio"][k] == pytest.approx(mean / downside * math.sqrt(252), rel=1e-9)
+
+    np.testing.assert_allclose(out["calmar_ratio"], [0.5, 0.5, 0.0])
+
+
+def test_tail_metrics_parametric_cvar_exceeds_var():
+    out = tail_metrics_matrix(np.random.default_rng(1).normal(0.0, 0.01, 5000))
+    assert out["parametric_cvar_99"][0] > out["parametric_var_99"][0] > out["parametric_var_95"][0] > 0
+    assert out["calmar_ratio"][0] == 0.0  # no headline metrics given
+
+
+def test_tail_metrics_in_analyze_and_stress_outputs(monkeypatch):
+    import services.analysis_service as svc
+    import services.stress_service as stress
+
+    rng = np.random.default_rng(2)
+    idx = pd.bdate_range("2021-01-01", periods=400)
+    prices = pd.DataFrame({"SPY": 100.0 * np.cumprod(1.0 + rng.normal(0.0004, 0.011, 400))}, index=idx)
+    fetch = lambda tickers, start, end: DummyPH(prices)  # noqa: E731
+    monkeypatch.setattr(svc, "fetch_price_history", fetch)
+    monkeypatch.setattr(stress, "fetch_price_history", fetch)
+
+    payload = {
+        "portfolio": {"holdings": [{"ticker": "SPY", "weight": 1.0}]},
+        "date_range": {"start": "2021-01-01", "end": "2022-08-01"},
+    }
+    analysis = analyze_portfolio(payload)
+    assert set(analysis["metrics"]) == {"annualized_return", "annualized_volatility", "max_drawdown", "sharpe_ratio"}
+    assert analysis["tail_metrics"]["var_95"] > 0
+    assert analysis["tail_metrics"]["calmar_ratio"] == pytest.approx(
+        analysis["metrics"]["annualized_return"] / abs(analysis["metrics"]["max_drawdown"])
+    )
+
+    shocked = analyze_with_shock({**payload, "shock": {"type": "permanent", "date": "2021-09-01", "pct": -0.25}})
+    base, scen = shocked["baseline"]["tail_metrics"], shocked["scenario"]["tail_metrics"]
+    assert base == pytest.approx(analysis["tail_metrics"])
+    assert scen["var_99"] > base["var_99"]  # the shock day is in the left tail
+    assert shocked["delta"]["tail_metrics"]["var_99"] == pytest.approx(scen["var_99"] - base["var_99"])
+
+
+def test_short_window_tail_metrics_are_valid_json(monkeypatch):
+    import json
+
+    import services.analysis_service as svc
+    import services.stress_service as stress
+    from app import create_app
+
+    idx = pd.bdate_range("2024-01-01", periods=4)  # 3 daily returns
+    prices = pd.DataFrame({"SPY": [100.0, 101.0, 99.5, 100.5]}, index=idx)
+    fetch = lambda tickers, start, end: DummyPH(prices)  # noqa: E731
+    monkeypatch.setattr(svc, "fetch_price_history", fetch)
+    monkeypatch.setattr(stress, "fetch_price_history", fetch)
+
+    out = tail_metrics_matrix(np.array([0.01]))
+    assert all(np.isfinite(v).all() for v in out.values())
+
+    payload = {
+        "portfolio": {"holdings": [{"ticker": "SPY", "weight": 1.0}]},
+        "date_range": {"start": "2024-01-01", "end": "2024-01-06"},
+        "shock": {"type": "permanent", "date": "2024-01-03", "pct": -0.1},
+    }
+    res = create_app().test_client().post("/api/analyze_shock", json=payload)
+    assert res.status_code == 200
+    def reject(token):
+        raise ValueError(f"invalid JSON constant {token}")
+
+    body = json.loads(res.get_data(as_text=True), parse_constant=reject)  # strict, like JSON.parse
+    assert body["baseline"]["tail_metrics"]["excess_kurtosis"] == 0.0  # undefined for n < 4
+    assert body["delta"]["tail_metrics"]["excess_kurtosis"] == 0.0
@@ -0,0 +1,66 @@
+from datetime import date
+
+import pandas as pd
+import pytest
+
+from engines.trading_calendar import future_sessions, get_trading_calendar, nyse_holidays
+
+
+@pytest.fixture
+def cal():
+    return get_trading_calendar()
+
+
+def test_nyse_holidays_2025():
+    assert nyse_holidays(2025) == [
+        date(2025, 1, 1),
+        date(2025, 1, 20),
+        date(2025, 2, 17),
+        date(2025, 4, 18),  # Good Friday
+        date(2025, 5, 26),
+        date(2025, 6, 19),
+        date(2025, 7, 4),
+        date(2025, 9, 1),
+        date(2025, 11, 27),
+        date(2025, 12, 25),
+    ]
+
+
+def test_observed_rules():
+    # July 4th 2026 is a Saturday -> observed Friday; New Year 2022 on Saturday is not made up
+    assert date(2026, 7, 3) in nyse_holidays(2026)
+    assert date(2021, 12, 31) not in nyse_holidays(2021)
+    assert date(2022, 1, 1) not in nyse_holidays(2022)
+
+
+def test_session_counts_per_year(cal):
+    # Known NYSE session counts (2025 includes the Jan 9 national day of mourning)
+    assert len(cal.sessions_in_range("2023-01-01", "2023-12-31")) == 250
+    assert len(cal.sessions_in_range("2024-01-01", "2024-12-31")) == 252
+    assert len(cal.sessions_in_range("2025-01-01", "2025-12-31")) == 250
+
+
+def test_next_and_previous_session(cal):
+    assert cal.next_session("2025-07-04") == pd.Timestamp("2025-07-07")
+    assert cal.next_session("2025-07-07") == pd.Timestamp("2025-07-07")
+    assert cal.next_session("2025-07-07", inclusive=False) == pd.Timestamp("2025-07-08")
+    assert cal.previous_session("2025-07-06") == pd.Timestamp("2025-07-03")
+    assert cal.is_session("2025-01-09") is False
+
+
+def test_next_sessions_skips_weekends_and_holidays(cal):
+    out = cal.next_sessions("2025-12-23", 4)
+    assert list(out.strftime("%Y-%m-%d")) == ["2025-12-24", "2025-12-26", "2025-12-29", "2025-12-30"]
+
+
+def test_out_of_range_raises(cal):
+    with pytest.raises(ValueError, match="outside the trading calendar"):
+        cal.next_session("1900-01-01")
+
+
+def test_future_sessions_fall_back_to_business_days_outside_coverage(cal):
+    assert future_sessions("2025-12-23", 4).equals(cal.next_sessions("2025-12-23", 4))
+
+    late = future_sessions("2060-12-29", 5)  # runs past the calendar's last year
+    assert list(late.strftime("%Y-%m-%d")) == ["2060-12-30", "2060-12-31", "2061-01-03", "2061-01-04", "2061-01-05"]
+    assert len(future_sessions("1985-06-03", 3)) == 3
@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import providers.market_data as md
+from providers.synthetic_provider import SyntheticProvider
+from providers.universe_provider import UniverseMatrixProvider, build_universe_matrix
+
+
+@pytest.fixture
+def universe_dir(tmp_path):
+    tickers = [f"T{i:02d}" for i in range(12)]
+    return build_universe_matrix(
+        tmp_path / "universe",
+        tickers,
+        "2024-01-01",
+        "2025-01-01",
+        provider=SyntheticProvider(seed=3),
+        chunk_size=5,  # exercise multiple chunks
+    )
+
+
+def test_build_writes_aligned_matrix_over_sessions(universe_dir):
+    p = UniverseMatrixProvider(universe_dir)
+
+    assert isinstance(p.matrix, np.memmap)
+    assert p.matrix.shape == (252, 12)  # 2024 NYSE sessions x tickers
+    assert p.stats()["first_date"] == "2024-01-02"
+
+
+def test_provider_slices_match_source(universe_dir):
+    source = SyntheticProvider(seed=3)
+    p = UniverseMatrixProvider(universe_dir)
+
+    got = p.fetch_price_history(["T07", "T02"], "2024-03-01", "2024-04-01").prices
+    want = source.get_closes(["T02", "T07"], "2024-03-01", "2024-04-01").reindex(got.index)
+
+    assert list(got.columns) == ["T02", "T07"]
+    assert got.index[0] == pd.Timestamp("2024-03-01")
+    assert got.index[-1] == pd.Timestamp("2024-03-28")  # Good Friday 2024-03-29 is not a session
+    np.testing.assert_allclose(got.to_numpy(), want.to_numpy())
+
+
+def test_unknown_tickers_are_absent(universe_dir):
+    p = UniverseMatrixProvider(universe_dir)
+
+    out = p.get_closes(["T01", "NOPE"], "2024-01-01", "2024-02-01")
+    assert list(out.columns) == ["T01"]
+
+    with pytest.raises(ValueError, match="No price data returned"):
+        p.fetch_price_history(["NOPE"], "2024-01-01", "2024-02-01")
+
+
+def test_create_provider_universe_from_env(monkeypatch, universe_dir):
+    monkeypatch.setenv("UNIVERSE_DIR", str(universe_dir))
+    assert isinstance(md.create_provider("universe"), UniverseMatrixProvider)
@@ -0,0 +1,121 @@
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from engines.analytics_engine import annualized_return, annualized_volatility, equity_curve, max_drawdown, sharpe_ratio
+from engines.window_index import WindowIndex
+from services.analysis_service import analyze_portfolio
+from services.window_service import window_metrics
+
+
+class DummyPH:
+    def __init__(self, prices: pd.DataFrame):
+        self.prices = prices
+
+
+@pytest.fixture
+def returns():
+    rng = np.random.default_rng(8)
+    return pd.Series(rng.normal(0.0003, 0.015, 1500), index=pd.bdate_range("2018-01-01", periods=1500))
+
+
+def _reference(r: pd.Series) -> dict[str, float]:
+    curve = equity_curve(r, 1.0)
+    return {
+        "annualized_return": annualized_return(curve),
+        "annualized_volatility": annualized_volatility(r),
+        "max_drawdown": max_drawdown(curve),
+        "sharpe_ratio": sharpe_ratio(r),
+    }
+
+
+def test_window_metrics_match_functions_on_slices(returns):
+    index = WindowIndex(returns)
+    rng = np.random.default_rng(0)
+
+    windows = [(0, len(returns) - 1), (10, 11), (700, 700)] + [tuple(sorted(rng.integers(0, 1500, 2))) for _ in range(50)]
+    for i, j in windows:
+        got = index.metrics(i, j)
+        expected = _reference(returns.iloc[i : j + 1])
+        for k, v in expected.items():
+            if math.isnan(v):
+                assert got[k] == 0.0  # single-day window: pandas std is NaN, the index reports 0.0
+            else:
+                assert got[k] == pytest.approx(v, rel=1e-9, abs=1e-12), (i, j, k)
+
+
+def test_locate_snaps_to_stored_dates(returns):
+    index = WindowIndex(returns)
+
+    assert index.locate("2018-01-06", "2018-01-14") == (5, 9)  # weekend edges snap inward
+    assert index.locate(None, None) == (0, len(returns) - 1)
+    with pytest.raises(ValueError, match="No stored returns"):
+        index.locate("2030-01-01", None)
+
+
+def test_window_endpoint_serves_stored_analysis(monkeypatch, returns):
+    import services.analysis_service as svc
+
+    prices = pd.DataFrame({"AAPL": 100.0 * np.cumprod(1.0 + returns.to_numpy())}, index=returns.index)
+    calls = []
+
+    def fake_fetch(tickers, start, end):
+        calls.append(tuple(tickers))
+        return DummyPH(prices)
+
+    monkeypatch.setattr(svc, "fetch_price_history", fake_fetch)
+    analysis = analyze_portfolio(
+        {
+            "portfolio": {"holdings": [{"ticker": "AAPL", "weight": 1.0}]},
+            "date_range": {"start": "2018-01-01", "end": "2024-01-01"},
+        }
+    )
+
+    out = window_metrics({"analysis_id": analysis["analysis_id"], "start": "2019-01-01", "end": "2019-12-31"})
+
+    assert len(calls) == 1  # the window query never touches the provider
+    assert out["window"]["start"] == "2019-01-01"
+    assert out["window"]["end"] == "2019-12-31"
+    stored = prices["AAPL"].pct_change().dropna()
+    expected = _reference(stored.loc["2019-01-01":"2019-12-31"])
+    for k, v in expected.items():
+        assert out["metrics"][k] == pytest.approx(v, rel=1e-9)
+
+    with pytest.raises(ValueError, match="source must be 'baseline'"):
+        window_metrics({"analysis_id": analysis["analysis_id"], "source": "scenario"})
+    with pytest.raises(ValueError, match="not found"):
+        window_metrics({"analysis_id": "missing"})
+    with pytest.raises(ValueError, match="start must be YYYY-MM-DD"):
+        window_metrics({"analysis_id": analysis["analysis_id"], "start": "01/02/2019"})
+
+
+def test_one_day_window_endpoint_returns_strict_json(monkeypatch, returns):
+    import json
+
+    import services.analysis_service as svc
+    from app import create_app
+
+    prices = pd.DataFrame({"AAPL": 100.0 * np.cumprod(1.0 + returns.to_numpy())}, index=returns.index)
+    monkeypatch.setattr(svc, "fetch_price_history", lambda tickers, start, end: DummyPH(prices))
+    analysis = analyze_portfolio(
+        {
+            "portfolio": {"holdings": [{"ticker": "AAPL", "weight": 1.0}]},
+            "date_range": {"start": "2018-01-01", "end": "2024-01-01"},
+        }
+    )
+
+    resp = create_app().test_client().post(
+        "/api/analysis/window",
+        json={"analysis_id": analysis["analysis_id"], "start": "2019-03-05", "end": "2019-03-05"},
+    )
+
+    def reject(token):
+        raise AssertionError(f"non-JSON constant {token}")
+
+    assert resp.status_code == 200
+    body = json.loads(resp.get_data(as_text=True), parse_constant=reject)
+    assert body["window"] == {"start": "2019-03-05", "end": "2019-03-05", "points": 1}
+    assert body["metrics"]["annualized_volatility"] == 0.0
+    assert body["metrics"]["sharpe_ratio"] == 0.0